@@ -1,11 +1,17 @@
 import asyncio
 import sys
 from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from contextlib import AsyncExitStack
 from importlib.metadata import version
+from pathlib import Path
 from typing import Self, final
 
 from dotenv import load_dotenv
 
+from chromio.client import DEFAULT_POOL_SIZE, registry
+from chromio.ie.metrics import DEFAULT_METRICS_INTERVAL, metrics
+from chromio.tools.profiler import profiler
+
 from .cmds.check import CheckCmd
 from .cmds.coll import CollCmd
 from .cmds.cp import CpCmd
@@ -49,6 +55,59 @@ class ChromieArgParser(ArgumentParser):
     self.add_argument(
       "--version", action="version", version=f"v{version('chromie-tool')}"
     )
+    self.add_argument(
+      "--pool-size",
+      help="maximum number of connections kept alive per server",
+      type=int,
+      metavar="int",
+      default=DEFAULT_POOL_SIZE,
+    )
+    self.add_argument(
+      "--http2",
+      help="use HTTP/2 when the server supports it, requiring the http2 extra",
+      action="store_true",
+      default=False,
+    )
+    self.add_argument(
+      "--profile",
+      help=(
+        "profile the command: cpu (cProfile), mem (tracemalloc snapshots per phase) "
+        "or async (event-loop stalls)"
+      ),
+      choices=["cpu", "mem", "async"],
+    )
+    self.add_argument(
+      "--profile-out",
+      help=(
+        "file where to write the profile "
+        "(default: chromie.prof, chromie.mem.txt or chromie.async.txt)"
+      ),
+      metavar="path",
+    )
+    self.add_argument(
+      "--metrics-file",
+      help="Prometheus textfile where to write the metrics while the command runs",
+      metavar="path",
+    )
+    self.add_argument(
+      "--metrics-interval",
+      help="seconds between the writes of the metrics textfile",
+      type=float,
+      metavar="secs",
+      default=DEFAULT_METRICS_INTERVAL,
+    )
+    self.add_argument(
+      "--metrics-port",
+      help="port where to serve the metrics over HTTP while the command runs",
+      type=int,
+      metavar="int",
+    )
+    self.add_argument(
+      "--metrics-host",
+      help="address where to serve the metrics over HTTP",
+      metavar="host",
+      default="127.0.0.1",
+    )
     self.set_defaults(func=lambda _: self.print_help())
 
     # (2) define commands
@@ -69,9 +128,24 @@ class ChromieArgParser(ArgumentParser):
     """
 
     args = self.parse_args(argv)
+    registry.pool_size, registry.http2 = args.pool_size, args.http2
 
     if (co := args.func(args)) is not None:
-      await co
+      if args.profile is not None:
+        co = profiler(args.profile, args.profile_out and Path(args.profile_out)).run(co)
+
+      async with AsyncExitStack() as stack:
+        if args.metrics_file is not None:
+          await stack.enter_async_context(
+            metrics.textfile(Path(args.metrics_file), args.metrics_interval)
+          )
+
+        if args.metrics_port is not None:
+          await stack.enter_async_context(
+            metrics.serve(args.metrics_host, args.metrics_port)
+          )
+
+        await co
 
 
 async def main() -> None:
@@ -87,6 +161,9 @@ async def main() -> None:
   except Exception as e:
     print(e, file=sys.stderr)
     code = 1
+  finally:
+    # (3) close the connections of the process
+    await registry.close()
 
   exit(code)
 
@@ -0,0 +1,31 @@
+import json
+from dataclasses import asdict
+from typing import Any
+
+# Bytes per mebibyte.
+_MIB = 1024**2
+
+
+def print_json(rpt: Any) -> None:
+  """Prints a report as JSON."""
+
+  print(json.dumps(asdict(rpt), indent=2))
+
+
+def perf_lines(rpt: Any) -> str:
+  """Returns the text lines of the performance measures of a collection report."""
+
+  phases = ", ".join(f"{p} {s:.3f}" for p, s in rpt.phases.items())
+  latency = "; ".join(
+    f"{p} p50 {lat.p50 * 1000:.1f}, p95 {lat.p95 * 1000:.1f}, "
+    f"p99 {lat.p99 * 1000:.1f}, max {lat.max * 1000:.1f}"
+    for p, lat in rpt.latency.items()
+  )
+
+  return (
+    f"Records/s: {rpt.records_per_sec:.1f}\n"
+    f"Bytes/s (MiB): {rpt.bytes_per_sec / _MIB:.2f}\n"
+    f"Phases (s): {phases or '-'}\n"
+    f"Batch latency (ms): {latency or '-'}\n"
+    f"Peak RSS (MiB): {rpt.peak_rss / _MIB:.1f}"
+  )
@@ -1,26 +1,44 @@
+import asyncio
 import os
 import sys
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from functools import partial
+from pathlib import Path
 from typing import Any, override
 
-from chromio.client import client
+from chromadb.api import AsyncClientAPI
+
+from chromio.client import admin_client, client
 from chromio.filter.metadata import MetafilterParser
 from chromio.ie import Field
-from chromio.ie.consts import DEFAULT_BATCH_SIZE
-from chromio.ie.cp.copier import CollCopier
+from chromio.ie.consts import (
+  DEFAULT_BATCH_BYTES,
+  DEFAULT_CONCURRENCY,
+  DEFAULT_PREFETCH,
+  DEFAULT_REQUESTS,
+  DEFAULT_RETRIES,
+  DEFAULT_WORKERS,
+)
+from chromio.ie.cp import DbCopier, DbCopyRpt, DbRef
+from chromio.ie.cp.copier import CollCopier, cp_journal_path
+from chromio.ie.limit import AimdLimit
 from chromio.tools import Cmd
-from chromio.uri import parse_uri
+from chromio.tools.db import DbTool
+from chromio.uri import ChromioUri, default_database, parse_uri
+
+from ._rpt import perf_lines, print_json
 
 
 @dataclass(frozen=True)
 class CpCmd(Cmd):
-  """Copy one collection."""
+  """Copy one collection, or all the collections of a database or a tenant."""
 
   # @override
   name: str = "cp"
 
   # @override
-  help: str = "Copy a collection."
+  help: str = "Copy a collection, a database or a tenant."
 
   @property
   @override
@@ -28,12 +46,12 @@ class CpCmd(Cmd):
     return [
       {
         "names": ["src"],
-        "help": "source URI",
+        "help": "source URI, w/o collection for copying the whole database",
         "required": True,
       },
       {
         "names": ["dst"],
-        "help": "destination URI",
+        "help": "destination URI, w/o collection when the source has none",
         "required": True,
       },
       {
@@ -60,11 +78,34 @@ class CpCmd(Cmd):
       },
       {
         "names": ["--batch", "-b"],
-        "help": "batch size",
+        "help": "maximum number of records per batch (default: the server maximum)",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+      },
+      {
+        "names": ["--batch-bytes"],
+        "help": "estimated bytes per batch, cut before --batch records when reached",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_BATCH_BYTES,
+      },
+      {
+        "names": ["--concurrency", "-c"],
+        "help": "maximum number of batches to write at the same time",
         "type": int,
         "metavar": "int",
         "required": False,
-        "default": DEFAULT_BATCH_SIZE,
+        "default": DEFAULT_CONCURRENCY,
+      },
+      {
+        "names": ["--retries", "-r"],
+        "help": "number of times to retry a batch write on transient errors",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_RETRIES,
       },
       {
         "names": ["--limit", "-l"],
@@ -73,6 +114,109 @@ class CpCmd(Cmd):
         "metavar": "int",
         "required": False,
       },
+      {
+        "names": ["--mode"],
+        "help": (
+          "how to write the records: add (fail on existing ids), upsert (overwrite "
+          "them) or skip-existing (look up the ids of every batch first, adding only "
+          "the missing records)"
+        ),
+        "choices": ["add", "upsert", "skip-existing"],
+        "default": "add",
+      },
+      {
+        "names": ["--resume", "-R"],
+        "help": (
+          "make the copy resumable: record its progress in a journal "
+          "(src-dst.hash.cp.journal in the working directory, the hash this of the "
+          "source and destination) and resume the interrupted copy from the journal, "
+          "upserting the records not committed, or from the first record if no "
+          "journal, such as after a failed run w/o --resume"
+        ),
+        "action": "store_true",
+        "default": False,
+      },
+      {
+        "names": ["--journal-dir"],
+        "help": (
+          "directory where to write the journals of --resume, instead of the working "
+          "directory, such as when this is read-only"
+        ),
+        "metavar": "dir",
+        "type": Path,
+        "required": False,
+      },
+      {
+        "names": ["--tenant", "-T"],
+        "help": (
+          "copy all the databases of the source tenant into the destination one, "
+          "creating the missing databases, the databases of the URIs ignored"
+        ),
+        "action": "store_true",
+        "default": False,
+      },
+      {
+        "names": ["--workers", "-w"],
+        "help": (
+          "number of collections to copy at the same time, in the database and "
+          "tenant copies"
+        ),
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_WORKERS,
+      },
+      {
+        "names": ["--requests"],
+        "help": (
+          "maximum number of requests in flight to every server, shared by all the "
+          "collections copied at the same time, starting from a few and grown while "
+          "healthy, halved on throttling or server errors; unlimited by default"
+        ),
+        "type": int,
+        "metavar": "int",
+        "required": False,
+      },
+      {
+        "names": ["--latency-target"],
+        "help": (
+          "p95 latency, in seconds, above which the requests in flight are reduced, "
+          "these growing back while below"
+        ),
+        "type": float,
+        "metavar": "secs",
+        "required": False,
+      },
+      {
+        "names": ["--max-rps"],
+        "help": "maximum number of requests per second to every server",
+        "type": float,
+        "metavar": "float",
+        "required": False,
+      },
+      {
+        "names": ["--report"],
+        "help": "how to show the report: text or json, the latter for the tools",
+        "choices": ["text", "json"],
+        "default": "text",
+      },
+      {
+        "names": ["--prefetch", "-P"],
+        "help": "number of pages to read ahead while the current one is processed",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_PREFETCH,
+      },
+      {
+        "names": ["--paging", "-p"],
+        "help": (
+          "how to walk the source collection: "
+          "offset (offset/limit pages) or ids (pages by id, flat cost per page)"
+        ),
+        "choices": ["offset", "ids"],
+        "default": "offset",
+      },
       {
         "names": ["--metafilter", "-f"],
         "help": "metadata filter for selecting the records to copy",
@@ -98,39 +242,217 @@ class CpCmd(Cmd):
       print("Expected API key for destination Chroma Cloud connection.", file=sys.stderr)
       exit(1)
 
-    # (2) precondition: collection expected in the URI
-    if (src_coll_name := src_uri.coll) is None:
-      print(f"Expected collection in the source URI: '{src_uri}'.", file=sys.stderr)
+    # (2) precondition: collection in both URIs or, for copying the whole database
+    # or tenant, in none
+    if ((src_coll_name := src_uri.coll) is None) != (
+      (dst_coll_name := dst_uri.coll) is None
+    ):
+      print(
+        "Expected collection in both URIs or, for copying a database, in none.",
+        file=sys.stderr,
+      )
+      exit(1)
+
+    if src_coll_name is None and args.limit is not None:
+      print("--limit not supported by the database copies.", file=sys.stderr)
+      exit(1)
+
+    if src_coll_name is not None and args.tenant:
+      print("Expected no collection in the URIs with --tenant.", file=sys.stderr)
       exit(1)
 
-    if (dst_coll_name := dst_uri.coll) is None:
-      print(f"Expected collection in the destination URI: '{dst_uri}'.", file=sys.stderr)
+    if args.tenant and "path" in (src_uri.schema, dst_uri.schema):
+      print("--tenant not supported by the path URIs.", file=sys.stderr)
       exit(1)
 
     # (3) args
-    batch_size, limit = args.batch, args.limit
+    limit, paging = args.limit, args.paging
+    prefetch, concurrency, retries = args.prefetch, args.concurrency, args.retries
     fields = [Field[args.fields[i]] for i in range(len(args.fields))]
     metafilter = (
       MetafilterParser().parse(exp).to_chroma() if (exp := args.metafilter) else None
     )
 
+    req_limit = (
+      AimdLimit(args.requests or DEFAULT_REQUESTS, args.latency_target, args.max_rps)
+      if (args.requests, args.latency_target, args.max_rps) != (None, None, None)
+      else None
+    )
+
+    # copier factory, its batch size worked out from the servers once connected
+    copier = partial(
+      CollCopier,
+      fields=fields,
+      paging=paging,
+      prefetch=prefetch,
+      concurrency=concurrency,
+      retries=retries,
+      mode=args.mode,
+      batch_bytes=args.batch_bytes,
+      limit=req_limit,
+    )
+
+    if src_coll_name is None or dst_coll_name is None:
+      rpt = await self._copy_dbs(
+        copier,
+        args,
+        src=(src_uri, src_api_key),
+        dst=(dst_uri, dst_api_key),
+        metafilter=metafilter,
+      )
+
+      if args.report == "json":
+        print_json(rpt)
+      else:
+        for r in rpt.colls:
+          print(
+            f"Collection: {r.db}.{r.coll} (count: {r.count}, "
+            f"duration (s): {r.duration:.3f}, records/s: {r.records_per_sec:.1f}, "
+            f"batches failed: {r.batches_failed}, records skipped: {r.skipped})"
+          )
+
+        print(f"Count: {rpt.count}\nDuration (s): {rpt.duration:.3f}")
+
+      if rpt.batches_failed > 0:
+        exit(1)
+
+      return
+
     # (4) create clients
     src_cli = await client(src_uri, src_api_key)
     src_coll = await src_cli.get_collection(src_coll_name)
 
     dst_cli = await client(dst_uri, dst_api_key)
     dst_coll = await dst_cli.get_or_create_collection(dst_coll_name)
+    coll_copier = copier(await CpCmd._batch_size(args.batch, src_cli, dst_cli))
 
-    # (5) copy
-    copier = CollCopier(batch_size, fields)
-    rpt = await copier.copy_coll(src_coll, dst_coll, limit=limit, metafilter=metafilter)
+    # (5) copy, recording the progress for resuming it if interrupted and resumable
+    endpoints, journals = (src_uri.endpoint(), dst_uri.endpoint()), self._journals(args)
+    journal = (
+      None
+      if journals is None
+      else cp_journal_path(journals, f"{src_coll_name}-{dst_coll_name}", endpoints)
+    )
+
+    try:
+      rpt = await coll_copier.copy_coll(
+        src_coll,
+        dst_coll,
+        limit=limit,
+        metafilter=metafilter,
+        journal=journal,
+        resume=args.resume,
+        endpoints=endpoints,
+      )
+    except ValueError as e:
+      print(e, file=sys.stderr)
+      exit(1)
 
     # (6) show report
-    print(
-      (
+    if args.report == "json":
+      print_json(rpt)
+    else:
+      print(
         f"Source collection: {rpt.coll}\n"
         f"Destination collection: {rpt.dst_coll}\n"
         f"Count: {rpt.count}\n"
-        f"Duration (s): {rpt.duration}\n"
+        f"Duration (s): {rpt.duration:.3f}\n"
+        f"{perf_lines(rpt)}\n"
+        f"Batches retried: {rpt.batches_retried}\n"
+        f"Batches failed: {rpt.batches_failed}\n"
+        f"Records skipped: {rpt.skipped}\n"
       )
+
+    if rpt.batches_failed > 0:
+      exit(1)
+
+  @staticmethod
+  def _journals(args: Any) -> Path | None:
+    """Returns the directory of the copy journals: None if not resumable, otherwise
+    the given one or the working directory.
+    """
+
+    return (args.journal_dir or Path(".")) if args.resume else None
+
+  @staticmethod
+  async def _batch_size(size: int | None, *clis: AsyncClientAPI) -> int:
+    """Returns the number of records per batch to use between the given servers: the
+    given one capped by the maximums reported by the servers or, if not given, the
+    least of these.
+    """
+
+    return min([await DbTool(cli).batch_size(size) for cli in clis])
+
+  @staticmethod
+  async def _copy_dbs(
+    copier: Callable[[int], CollCopier],
+    args: Any,
+    *,
+    src: tuple[ChromioUri, str | None],
+    dst: tuple[ChromioUri, str | None],
+    metafilter: dict | None,
+  ) -> DbCopyRpt:
+    """Copies the database of the source URI, or all the databases of its tenant,
+    into the destination.
+
+    Args:
+      copier: Factory of the copier to use for every collection, given its batch
+        size.
+      args: Command arguments.
+      src: Source URI and API key.
+      dst: Destination URI and API key.
+      metafilter: Filter by metadata.
+
+    Returns:
+      The copy report.
+    """
+
+    # (1) databases to copy, creating the destination ones of the tenant if needed
+    names = [(src[0].db, dst[0].db)]
+
+    if args.tenant:
+      src_admin = await admin_client(*src)
+      dst_admin = await admin_client(*dst)
+      src_tenant, dst_tenant = str(src[0].tenant), str(dst[0].tenant)
+
+      dbs = await asyncio.to_thread(src_admin.list_databases, tenant=src_tenant)
+      existing = {
+        db["name"]
+        for db in await asyncio.to_thread(dst_admin.list_databases, tenant=dst_tenant)
+      }
+
+      for db in dbs:
+        if (name := db["name"]) not in existing:
+          await asyncio.to_thread(dst_admin.create_database, name, dst_tenant)
+
+      names = [(db["name"], db["name"]) for db in dbs]
+
+    # (2) copy, recording the progress of every collection if resumable
+    async def ref(end: tuple[ChromioUri, str | None], db: str | None) -> DbRef:
+      uri, api_key = replace(end[0], db=db), end[1]
+      return DbRef(
+        await client(uri, api_key),
+        db or default_database,
+        str(uri.path) if uri.schema == "path" else f"{uri.host}:{uri.port}",
+        uri,
+      )
+
+    refs = [(await ref(src, s), await ref(dst, d)) for s, d in names]
+
+    if len(refs) == 0:
+      return DbCopyRpt(0, 0.0)
+
+    coll_copier = copier(
+      await CpCmd._batch_size(args.batch, refs[0][0].db, refs[0][1].db)
     )
+
+    try:
+      return await DbCopier(coll_copier, args.workers, args.requests).copy_dbs(
+        refs,
+        metafilter=metafilter,
+        journals=CpCmd._journals(args),
+        resume=args.resume,
+      )
+    except ValueError as e:
+      print(e, file=sys.stderr)
+      exit(1)
@@ -1,16 +1,27 @@
 import os
 import sys
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, override
 
 from chromio.client import client
 from chromio.filter.metadata import MetafilterParser
 from chromio.ie import Field
-from chromio.ie.consts import DEFAULT_BATCH_SIZE
-from chromio.ie.exp import CollExporter
+from chromio.ie.chain import CHAIN_SUFFIX, is_chain
+from chromio.ie.consts import (
+  DEFAULT_BATCH_BYTES,
+  DEFAULT_PREFETCH,
+  DEFAULT_REQUESTS,
+  DEFAULT_WORKERS,
+)
+from chromio.ie.exp import CollExporter, DbExporter
+from chromio.ie.limit import AimdLimit
 from chromio.tools import Cmd
+from chromio.tools.db import DbTool
 from chromio.uri import parse_uri
 
+from ._rpt import perf_lines, print_json
+
 
 @dataclass(frozen=True)
 class ExpCmd(Cmd):
@@ -28,12 +39,12 @@ class ExpCmd(Cmd):
     return [
       {
         "names": ["src"],
-        "help": "source URI",
+        "help": "source URI, w/o collection for exporting all of them",
         "required": True,
       },
       {
         "names": ["out"],
-        "help": "file path where to export",
+        "help": "file path where to export or, for a whole database, directory",
         "required": True,
       },
       {
@@ -51,13 +62,29 @@ class ExpCmd(Cmd):
         "choices": ["meta", "doc", "embedding"],
         "default": ["meta", "doc"],
       },
+      {
+        "names": ["--embedding-encoding", "-E"],
+        "help": (
+          "how to store the embeddings: "
+          "json (arrays of numbers), float32 or float16 (base64 binary arrays)"
+        ),
+        "choices": ["json", "float32", "float16"],
+        "default": "json",
+      },
       {
         "names": ["--batch", "-b"],
-        "help": "batch size",
+        "help": "maximum number of records per batch (default: the server maximum)",
         "type": int,
         "metavar": "int",
         "required": False,
-        "default": DEFAULT_BATCH_SIZE,
+      },
+      {
+        "names": ["--batch-bytes"],
+        "help": "estimated bytes per batch, cut before --batch records when reached",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_BATCH_BYTES,
       },
       {
         "names": ["--limit", "-l"],
@@ -66,6 +93,108 @@ class ExpCmd(Cmd):
         "metavar": "int",
         "required": False,
       },
+      {
+        "names": ["--prefetch", "-P"],
+        "help": "number of pages to read ahead while the current one is processed",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_PREFETCH,
+      },
+      {
+        "names": ["--requests"],
+        "help": (
+          "maximum number of requests in flight, starting from a few and grown "
+          "while healthy, halved on throttling or server errors; unlimited by default"
+        ),
+        "type": int,
+        "metavar": "int",
+        "required": False,
+      },
+      {
+        "names": ["--latency-target"],
+        "help": (
+          "p95 latency, in seconds, above which the requests in flight are reduced, "
+          "these growing back while below"
+        ),
+        "type": float,
+        "metavar": "secs",
+        "required": False,
+      },
+      {
+        "names": ["--max-rps"],
+        "help": "maximum number of requests per second to every server",
+        "type": float,
+        "metavar": "float",
+        "required": False,
+      },
+      {
+        "names": ["--report"],
+        "help": "how to show the report: text or json, the latter for the tools",
+        "choices": ["text", "json"],
+        "default": "text",
+      },
+      {
+        "names": ["--paging", "-p"],
+        "help": (
+          "how to walk the source collection: offset (offset/limit pages), ids "
+          "(pages by id, flat cost per page) or store (path URIs only: read the "
+          "files of the persistent directory straight, w/o the Chroma API, while "
+          "this is not written)"
+        ),
+        "choices": ["offset", "ids", "store"],
+        "default": "offset",
+      },
+      {
+        "names": ["--workers", "-w"],
+        "help": (
+          "number of collections to export at the same time, when the URI has no "
+          "collection and the whole database is exported"
+        ),
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_WORKERS,
+      },
+      {
+        "names": ["--ext"],
+        "help": (
+          "extension of the collection files when the whole database is exported, "
+          "choosing their format and compression"
+        ),
+        "choices": [".json", ".json.gz", ".json.zst", ".parquet", ".arrow", ".feather"],
+        "default": ".json",
+      },
+      {
+        "names": ["--shards", "-S"],
+        "help": (
+          "number of part files to export concurrently, listed in a manifest "
+          "(out.manifest.json)"
+        ),
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": 1,
+      },
+      {
+        "names": ["--incremental", "-I"],
+        "help": (
+          "export to a backup chain (out.chain.json): all the records the first "
+          "time, only these added, changed or deleted since the previous export the "
+          "next ones"
+        ),
+        "action": "store_true",
+        "default": False,
+      },
+      {
+        "names": ["--resume", "-R"],
+        "help": (
+          "resume an interrupted export from its journal (out.json.journal), "
+          "only for uncompressed JSON files"
+        ),
+        "action": "store_true",
+        "default": False,
+      },
       {
         "names": ["--metafilter", "-f"],
         "help": "metadata filter for selecting the records to export",
@@ -83,14 +212,38 @@ class ExpCmd(Cmd):
       print("Expected API key for Chroma Cloud connection.", file=sys.stderr)
       exit(1)
 
-    # (2) precondition: collection expected in the URI
-    if (coll_name := uri.coll) is None:
-      print(f"Expected collection in the URI: '{uri}'.", file=sys.stderr)
+    # (2) precondition: w/o collection in the URI, the whole database is exported
+    if (coll_name := uri.coll) is None and (
+      args.incremental or args.shards > 1 or args.resume or args.limit is not None
+    ):
+      print(
+        "--incremental, --shards, --resume and --limit not supported by the database "
+        "exports.",
+        file=sys.stderr,
+      )
+      exit(1)
+
+    if coll_name is not None and args.ext != ".json":
+      print(
+        "--ext only supported by the database exports, the extension of the file "
+        "choosing the format otherwise.",
+        file=sys.stderr,
+      )
+      exit(1)
+
+    if args.paging == "store" and uri.schema != "path":
+      print("--paging store only supported by the path URIs.", file=sys.stderr)
       exit(1)
 
     # (3) args
     file = args.out
-    batch_size, limit = args.batch, args.limit
+    limit, paging, batch_bytes = args.limit, args.paging, args.batch_bytes
+    prefetch, encoding = args.prefetch, args.embedding_encoding
+    req_limit = (
+      AimdLimit(args.requests or DEFAULT_REQUESTS, args.latency_target, args.max_rps)
+      if (args.requests, args.latency_target, args.max_rps) != (None, None, None)
+      else None
+    )
     fields = [Field[args.fields[i]] for i in range(len(args.fields))]
     metafilter = (
       MetafilterParser().parse(exp).to_chroma() if (exp := args.metafilter) else None
@@ -99,18 +252,101 @@ class ExpCmd(Cmd):
     # (4) create client
     cli = await client(uri, api_key)
     v = await cli.get_version()
-    coll = await cli.get_collection(coll_name)
+    batch_size = await DbTool(cli).batch_size(args.batch)
 
     # (5) export
-    exporter = CollExporter(batch_size, fields)
-    rpt = await exporter.export_coll(coll, file, v=v, limit=limit, metafilter=metafilter)
+    exporter = (
+      CollExporter(
+        batch_size,
+        fields,
+        paging,
+        prefetch,
+        batch_bytes=batch_bytes,
+        limit=req_limit,
+        encoding=encoding,
+      )
+      if paging != "store"
+      else CollExporter(
+        batch_size,
+        fields,
+        prefetch=prefetch,
+        batch_bytes=batch_bytes,
+        limit=req_limit,
+        encoding=encoding,
+        store=Path(str(uri.path)),
+      )
+    )
+
+    if coll_name is None:
+      db_rpt = await DbExporter(exporter, args.workers).export_db(
+        cli, Path(file), v=v, ext=args.ext, metafilter=metafilter
+      )
+
+      if args.report == "json":
+        print_json(db_rpt)
+        return
+
+      for r in db_rpt.colls:
+        print(
+          f"Collection: {r.coll} (count: {r.count}, duration (s): {r.duration:.3f}, "
+          f"records/s: {r.records_per_sec:.1f})"
+        )
+
+      print(
+        f"Count: {db_rpt.count}\n"
+        f"Duration (s): {db_rpt.duration:.3f}\n"
+        f"File: {db_rpt.file_path}"
+      )
+
+      return
+
+    coll = await cli.get_collection(coll_name)
+
+    if args.incremental:
+      if not is_chain(file):
+        print(f"Expected a chain file (*{CHAIN_SUFFIX}): '{file}'.", file=sys.stderr)
+        exit(1)
+
+      if args.shards > 1 or args.resume or limit is not None:
+        print(
+          "--shards, --resume and --limit not supported by --incremental.",
+          file=sys.stderr,
+        )
+        exit(1)
+
+      try:
+        rpt = await exporter.export_coll_incremental(
+          coll, Path(file), v=v, metafilter=metafilter
+        )
+      except ValueError as e:
+        print(e, file=sys.stderr)
+        exit(1)
+    elif (shards := args.shards) > 1:
+      if args.resume:
+        print("The sharded exports can't be resumed.", file=sys.stderr)
+        exit(1)
+
+      rpt = await exporter.export_coll_shards(
+        coll, file, shards=shards, v=v, limit=limit, metafilter=metafilter
+      )
+    else:
+      try:
+        rpt = await exporter.export_coll(
+          coll, file, v=v, limit=limit, metafilter=metafilter, resume=args.resume
+        )
+      except ValueError as e:
+        print(e, file=sys.stderr)
+        exit(1)
 
     # (6) show report
+    if args.report == "json":
+      print_json(rpt)
+      return
+
     print(
-      (
-        f"Collection: {rpt.coll}\n"
-        f"Count: {rpt.count}\n"
-        f"Duration (s): {rpt.duration}\n"
-        f"File: {rpt.file_path}"
-      )
+      f"Collection: {rpt.coll}\n"
+      f"Count: {rpt.count}\n"
+      f"Duration (s): {rpt.duration:.3f}\n"
+      f"{perf_lines(rpt)}\n"
+      f"File: {rpt.file_path}"
     )
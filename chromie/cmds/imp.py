@@ -1,21 +1,36 @@
-import json
 import os
 import sys
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, override
 
-from aiofiles import open, ospath
+from aiofiles import ospath
 from chromadb.errors import NotFoundError
 
 from chromio.client import client
 from chromio.ie import Field
-from chromio.ie.consts import DEFAULT_BATCH_SIZE
+from chromio.ie.chain import Chain, is_chain
+from chromio.ie.consts import (
+  DEFAULT_BATCH_BYTES,
+  DEFAULT_CONCURRENCY,
+  DEFAULT_REQUESTS,
+  DEFAULT_RETRIES,
+  DEFAULT_WORKERS,
+)
 from chromio.ie.imp.importer import CollImporter
+from chromio.ie.imp.journal import journal_path
+from chromio.ie.imp.reader import reader_for
+from chromio.ie.limit import AimdLimit
+from chromio.ie.manifest import Manifest, export_path, is_manifest
 from chromio.tools import Cmd
 from chromio.tools.db import DbTool
 from chromio.uri import parse_uri
 
 from ._consts import EMBEDDING_FNS, SPACES
+from ._rpt import perf_lines, print_json
+
+# Extensions of the files next to the parts that aren't parts.
+_NOT_PARTS = (".journal", ".partial", ".tmp")
 
 
 @dataclass(frozen=True)
@@ -32,7 +47,10 @@ class ImpCmd(Cmd):
     return [
       {
         "names": ["input"],
-        "help": "file path to import",
+        "help": (
+          "file path to import: an export file, the manifest of a sharded export, "
+          "a directory with its part files or a backup chain"
+        ),
         "required": True,
       },
       {
@@ -92,11 +110,106 @@ class ImpCmd(Cmd):
       },
       {
         "names": ["--batch", "-b"],
-        "help": "batch size",
+        "help": "maximum number of records per batch (default: the server maximum)",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+      },
+      {
+        "names": ["--batch-bytes"],
+        "help": "estimated bytes per batch, cut before --batch records when reached",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_BATCH_BYTES,
+      },
+      {
+        "names": ["--concurrency", "-c"],
+        "help": "maximum number of batches to write at the same time",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_CONCURRENCY,
+      },
+      {
+        "names": ["--retries", "-r"],
+        "help": "number of times to retry a batch write on transient errors",
+        "type": int,
+        "metavar": "int",
+        "required": False,
+        "default": DEFAULT_RETRIES,
+      },
+      {
+        "names": ["--requests"],
+        "help": (
+          "maximum number of requests in flight, starting from a few and grown "
+          "while healthy, halved on throttling or server errors; unlimited by default"
+        ),
+        "type": int,
+        "metavar": "int",
+        "required": False,
+      },
+      {
+        "names": ["--latency-target"],
+        "help": (
+          "p95 latency, in seconds, above which the requests in flight are reduced, "
+          "these growing back while below"
+        ),
+        "type": float,
+        "metavar": "secs",
+        "required": False,
+      },
+      {
+        "names": ["--max-rps"],
+        "help": "maximum number of requests per second to every server",
+        "type": float,
+        "metavar": "float",
+        "required": False,
+      },
+      {
+        "names": ["--report"],
+        "help": "how to show the report: text or json, the latter for the tools",
+        "choices": ["text", "json"],
+        "default": "text",
+      },
+      {
+        "names": ["--workers", "-w"],
+        "help": "maximum number of part files to import at the same time",
         "type": int,
         "metavar": "int",
         "required": False,
-        "default": DEFAULT_BATCH_SIZE,
+        "default": DEFAULT_WORKERS,
+      },
+      {
+        "names": ["--mode"],
+        "help": (
+          "how to write the records: add (fail on existing ids), upsert (overwrite "
+          "them) or skip-existing (look up the ids of every batch first, adding only "
+          "the missing records)"
+        ),
+        "choices": ["add", "upsert", "skip-existing"],
+        "default": "add",
+      },
+      {
+        "names": ["--resume", "-R"],
+        "help": (
+          "make the import resumable: record its progress in a journal "
+          "(file.imp.journal, one per part file) and resume the interrupted import "
+          "from the journal, upserting the records not committed, or from the "
+          "first record if no journal, such as after a failed run w/o --resume"
+        ),
+        "action": "store_true",
+        "default": False,
+      },
+      {
+        "names": ["--journal-dir"],
+        "help": (
+          "directory where to write the journals of --resume, instead of next to the "
+          "file, such as when this is read-only"
+        ),
+        "metavar": "dir",
+        "type": Path,
+        "required": False,
       },
       {
         "names": ["--limit", "-l"],
@@ -111,10 +224,56 @@ class ImpCmd(Cmd):
   async def _handle(self, args: Any) -> None:
     # (1) preconditions
     # source file must exist
-    if not await ospath.isfile(file := args.input):
+    if not await ospath.exists(file := args.input):
       print(f"File '{file}' not found.", file=sys.stderr)
       exit(1)
 
+    # part files if a sharded export
+    parts = None
+
+    if await ospath.isdir(file):
+      # the journals and the temporary files of the parts aren't parts
+      exps: dict[Path, list[Path]] = {}
+
+      for p in sorted(Path(file).glob("*.part-*")):
+        if not p.name.endswith(_NOT_PARTS):
+          exps.setdefault(export_path(p), []).append(p)
+
+      if len(exps) == 0:
+        print(f"No part files found in '{file}'.", file=sys.stderr)
+        exit(1)
+
+      # the parts of other exports mustn't be mixed
+      if len(exps) > 1:
+        names = ", ".join(e.name for e in exps)
+        print(
+          f"Several sharded exports in '{file}' ({names}), import its manifest.",
+          file=sys.stderr,
+        )
+        exit(1)
+
+      [parts] = exps.values()
+    elif is_chain(file):
+      if args.resume:
+        print("--resume not supported when importing a chain.", file=sys.stderr)
+        exit(1)
+
+      chain = await Chain.load(Path(file))
+      parts = [Path(file).parent / lnk.file for lnk in chain.links]
+    elif is_manifest(file):
+      try:
+        manifest = await Manifest.load(Path(file))
+      except ValueError as e:
+        # such as the manifest of a database export, imported collection by collection
+        print(f"{e} Import its collection files one by one.", file=sys.stderr)
+        exit(1)
+
+      parts = [Path(file).parent / p.file for p in manifest.parts]
+
+    if parts is not None and args.limit is not None:
+      print("--limit not supported when importing part or chain files.", file=sys.stderr)
+      exit(1)
+
     # API key if needed
     api_key = None
 
@@ -128,24 +287,31 @@ class ImpCmd(Cmd):
       exit(1)
 
     # (2) args
-    batch_size, limit = args.batch, args.limit
+    limit, batch_bytes = args.limit, args.batch_bytes
+    req_limit = (
+      AimdLimit(args.requests or DEFAULT_REQUESTS, args.latency_target, args.max_rps)
+      if (args.requests, args.latency_target, args.max_rps) != (None, None, None)
+      else None
+    )
+    concurrency, retries, workers = args.concurrency, args.retries, args.workers
     fields = [Field[args.fields[i]] for i in range(len(args.fields))]
     remove = md if (md := args.metadata_to_remove) is not None else []
     set = md if (md := args.metadata_to_set) is not None else {}
     efn, model, space = args.embedding, args.model, args.space
 
-    # (3) read file
-    async with open(file, "r") as f:
-      c = json.loads(await f.read())
+    # (3) read file header, the records are streamed in the import
+    reader = reader_for(src := parts[0] if parts is not None else file)
+    hdr = await reader.read_metadata(src)
 
     # (4) get collection creating it if not exists
     cli = await client(uri, api_key)
+    batch_size = await DbTool(cli).batch_size(args.batch)
 
     try:
       coll = await cli.get_collection(coll_name)
     except NotFoundError:
       # configuration to use
-      conf = c["metadata"]["coll"].get("configuration", {})
+      conf = hdr["metadata"]["coll"].get("configuration", {})
 
       if efn is not None:
         efn_conf = conf.setdefault("embedding_function", {})
@@ -169,15 +335,72 @@ class ImpCmd(Cmd):
       coll = await DbTool(cli).create_coll_with_conf(coll_name, conf)
 
     # (5) import
-    importer = CollImporter(batch_size, fields)
-    rpt = await importer.import_coll(coll, c["data"], limit=limit, remove=remove, set=set)
+    importer = CollImporter(
+      batch_size,
+      fields,
+      concurrency=concurrency,
+      retries=retries,
+      mode=args.mode,
+      batch_bytes=batch_bytes,
+      limit=req_limit,
+    )
+
+    # journals only if resumable, next to the file unless a directory given
+    resume, endpoint = args.resume, uri.endpoint()
+    journals = (
+      (args.journal_dir or Path(parts[0] if parts is not None else file).parent)
+      if resume
+      else None
+    )
+
+    try:
+      if is_chain(file):
+        rpt = await importer.import_chain(coll, Path(file), remove=remove, set=set)
+      elif parts is not None:
+        rpt = await importer.import_parts(
+          coll,
+          parts,
+          workers=workers,
+          remove=remove,
+          set=set,
+          journals=journals,
+          resume=resume,
+          endpoint=endpoint,
+        )
+      else:
+        rpt = await importer.import_coll(
+          coll,
+          reader.read(file, batch_size, limit),
+          limit=limit,
+          remove=remove,
+          set=set,
+          journal=None if journals is None else journals / journal_path(Path(file).name),
+          resume=resume,
+          endpoints=(os.path.abspath(file), endpoint),
+        )
+    except ValueError as e:
+      print(e, file=sys.stderr)
+      exit(1)
 
     # (6) show report
-    print(
-      (
+    if args.report == "json":
+      print_json(rpt)
+    else:
+      print(
         f"Collection: {rpt.coll}\n"
         f"Count: {rpt.count}\n"
-        f"Duration (s): {rpt.duration}\n"
+        f"Duration (s): {rpt.duration:.3f}\n"
+        f"{perf_lines(rpt)}\n"
+        f"Batches retried: {rpt.batches_retried}\n"
+        f"Batches failed: {rpt.batches_failed}\n"
+        f"Records skipped: {rpt.skipped}\n"
         f"File: {file}"
       )
-    )
+
+      for part in rpt.parts:
+        print(
+          f"Part: {part.file} (count: {part.count}, duration (s): {part.duration:.3f})"
+        )
+
+    if rpt.batches_failed > 0:
+      exit(1)
@@ -43,7 +43,7 @@ class PingCmd(Cmd):
 
     # (2) ping
     match uri.schema:
-      case "server":
+      case "server" | "path":
         await _ping(uri)
 
       case "cloud":
@@ -58,7 +58,7 @@ async def _ping(uri: ChromioUri, api_key: str | None = None) -> None:
     api_key: API key to use.
   """
 
-  # (1) create cloud client
+  # (1) create client
   cli = await client(uri, api_key)
 
   # (2) ping
@@ -33,7 +33,11 @@ class UriCmd(Cmd):
 
     # (2) print segments
     print("Schema:", uri.schema)
-    print("Host:", uri.host)
-    print("Port:", uri.port)
-    print("Tenant:", uri.tenant)
-    print("Database:", uri.db)
+
+    if uri.schema == "path":
+      print("Path:", uri.path)
+    else:
+      print("Host:", uri.host)
+      print("Port:", uri.port)
+      print("Tenant:", uri.tenant)
+      print("Database:", uri.db)
@@ -1,3 +1,4 @@
-from ._client import client
+from ._client import admin_client, client
+from ._registry import DEFAULT_POOL_SIZE, ClientRegistry, registry
 
-__all__ = ["client"]
+__all__ = ["DEFAULT_POOL_SIZE", "ClientRegistry", "admin_client", "client", "registry"]
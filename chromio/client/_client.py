@@ -1,14 +1,18 @@
-from typing import cast
+import asyncio
 
-from chromadb import AsyncHttpClient
-from chromadb.api import AsyncClientAPI
+from chromadb import AdminClient
+from chromadb.api import AdminAPI, AsyncClientAPI
 from chromadb.config import Settings
 
 from chromio.uri import ChromioUri
 
+from ._registry import headers, registry
+
 
 async def client(uri: ChromioUri, api_key: str | None = None) -> AsyncClientAPI:
-  """Creates an asynchronous Chroma client for the given URI.
+  """Returns an asynchronous Chroma client for the given URI, reusing the client
+  and the connections of the process registry: an HTTP client for the server and
+  cloud URIs, an embedded one for the path URIs.
 
   Args:
     uri: URI to use for creating the client.
@@ -18,12 +22,31 @@ async def client(uri: ChromioUri, api_key: str | None = None) -> AsyncClientAPI:
     An asynchronous client.
   """
 
-  return await AsyncHttpClient(
-    host=cast(str, uri.host),
-    port=cast(int, uri.port),
-    tenant=cast(str, uri.tenant),
-    database=cast(str, uri.db),
-    ssl=uri.schema == "cloud",
-    headers={"x-chroma-token": api_key} if api_key is not None else {},
-    settings=Settings(anonymized_telemetry=False),
+  return await registry.client(uri, api_key)
+
+
+async def admin_client(uri: ChromioUri, api_key: str | None = None) -> AdminAPI:
+  """Creates a Chroma admin client for the server of the given URI, for managing
+  its tenants and databases.
+
+  Chroma has no asynchronous admin client, so its methods must be run in a thread
+  such as, for example, with asyncio.to_thread().
+
+  Args:
+    uri: URI to use for creating the client.
+    api_key: API key to use.
+
+  Returns:
+    A synchronous admin client.
+  """
+
+  settings = Settings(
+    chroma_api_impl="chromadb.api.fastapi.FastAPI",
+    chroma_server_host=uri.host,
+    chroma_server_http_port=uri.port,
+    chroma_server_ssl_enabled=uri.schema == "cloud",
+    chroma_server_headers=headers(api_key),
+    anonymized_telemetry=False,
   )
+
+  return await asyncio.to_thread(AdminClient, settings)
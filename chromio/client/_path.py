@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, cast
+
+import chromadb
+from chromadb.api import AsyncClientAPI
+from chromadb.api.models.Collection import Collection
+from chromadb.config import Settings
+
+
+async def path_client(path: str) -> AsyncClientAPI:
+  """Creates an asynchronous client for a persistent directory, embedding the
+  database in the process instead of connecting to a server.
+
+  Args:
+    path: Persistent directory, created if not existing.
+
+  Returns:
+    An asynchronous adapter of the persistent client.
+  """
+
+  cli = await asyncio.to_thread(
+    chromadb.PersistentClient, path, Settings(anonymized_telemetry=False)
+  )
+
+  return cast(AsyncClientAPI, ThreadedAdapter(cli))
+
+
+@dataclass
+class ThreadedAdapter:
+  """An asynchronous adapter of a synchronous Chroma client or collection, for
+  using it where the asynchronous ones are expected.
+
+  Every method is run in a thread of the default executor, so the event loop
+  keeps running while the database reads or writes the disk. The collections
+  returned are adapted too; the rest of attributes are these of the object.
+  """
+
+  obj: Any
+  """Client or collection to adapt."""
+
+  def __getattr__(self, name: str) -> Any:
+    if not callable(attr := getattr(self.obj, name)):
+      return attr
+
+    async def call(*args, **kwargs) -> Any:
+      return _adapt(await asyncio.to_thread(attr, *args, **kwargs))
+
+    return call
+
+
+def _adapt(value: Any) -> Any:
+  """Adapts the collections returned by a synchronous method."""
+
+  if isinstance(value, Collection):
+    return ThreadedAdapter(value)
+
+  if isinstance(value, Sequence) and any(isinstance(v, Collection) for v in value):
+    return [_adapt(v) for v in value]
+
+  return value
@@ -0,0 +1,210 @@
+import asyncio
+from collections.abc import Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import cast
+
+import chromadb
+import httpx
+from chromadb.api import AsyncClientAPI
+from chromadb.api.async_api import AsyncServerAPI
+from chromadb.api.async_client import AsyncClient
+from chromadb.auth import ClientAuthProvider
+from chromadb.config import Settings, System
+
+from chromio.errors import ChromieInternalError
+from chromio.uri import ChromioUri
+
+from ._path import path_client
+
+DEFAULT_POOL_SIZE = 100
+"""Default maximum number of connections per server, these kept alive for reuse."""
+
+KEEPALIVE_EXPIRY = 40.0
+"""Seconds an idle connection is kept alive, the same as the Chroma client."""
+
+# Pool of the client being created, for _PooledClient.__init__().
+_pool: ContextVar[httpx.AsyncClient] = ContextVar("pool")
+
+
+class _PooledClient(AsyncClient):
+  """A Chroma client sending its requests through a pool of the registry.
+
+  The Chroma HTTP API shares a connection pool per event loop among all the
+  clients of the process, created with the headers of the first one, so the
+  clients of other servers or credentials would send them too. This pool is
+  private, so the chromadb versions are capped to these checked to have it.
+  """
+
+  def __init__(self, settings: Settings | None = None) -> None:
+    super().__init__(settings or Settings())
+
+    # the requests validating the tenant and database already through the pool,
+    # installed in the private pools of the Chroma HTTP API, keyed by event loop
+    server = self._system.instance(AsyncServerAPI)
+
+    if not isinstance(getattr(server, "_clients", None), dict):
+      raise ChromieInternalError(
+        f"Unsupported chromadb {chromadb.__version__}: "
+        "AsyncFastAPI._clients not found for sharing the connection pools."
+      )
+
+    server._clients = {hash(asyncio.get_running_loop()): _pool.get()}  # type: ignore
+
+
+@dataclass
+class ClientRegistry:
+  """The Chroma clients and the HTTP connection pools of the process, reused by
+  all the commands and components: a client per URI and credentials, and a pool
+  per server and headers.
+
+  The pools keep their connections alive between requests, so the TCP and TLS
+  handshakes are paid once per connection instead of once per client or download.
+  All the clients and pools must be used from the same event loop, closing them
+  with close() at the end.
+  """
+
+  pool_size: int = DEFAULT_POOL_SIZE
+  """Maximum number of connections per pool."""
+
+  http2: bool = False
+  """Whether to use HTTP/2 if the server supports it, requiring the h2 package."""
+
+  _clients: dict[tuple, AsyncClientAPI] = field(
+    default_factory=dict, init=False, repr=False
+  )
+
+  _pools: dict[tuple, httpx.AsyncClient] = field(
+    default_factory=dict, init=False, repr=False
+  )
+
+  async def client(self, uri: ChromioUri, api_key: str | None = None) -> AsyncClientAPI:
+    """Returns the asynchronous Chroma client for the given URI and API key,
+    creating it the first time.
+
+    The path URIs get an embedded persistent client, w/o HTTP, running its
+    methods in threads.
+
+    Args:
+      uri: URI to use for creating the client.
+      api_key: API key to use.
+
+    Returns:
+      An asynchronous client.
+    """
+
+    key = (uri.schema, uri.host, uri.port, uri.tenant, uri.db, api_key)
+
+    if uri.schema == "path":
+      if (cli := self._clients.get(key := ("path", uri.path))) is None:
+        cli = self._clients[key] = await path_client(cast(str, uri.path))
+
+      return cli
+
+    if (cli := self._clients.get(key)) is None:
+      ssl = uri.schema == "cloud"
+      settings = Settings(
+        chroma_api_impl="chromadb.api.async_fastapi.AsyncFastAPI",
+        chroma_server_host=uri.host,
+        chroma_server_http_port=uri.port,
+        chroma_server_ssl_enabled=ssl,
+        chroma_server_headers=headers(api_key),
+        anonymized_telemetry=False,
+      )
+
+      hdrs, verify = _pool_args(settings)
+      pool = self.pool(
+        f"{'https' if ssl else 'http'}://{uri.host}:{uri.port}", hdrs, verify=verify
+      )
+
+      token = _pool.set(pool)
+
+      try:
+        cli = self._clients[key] = await _PooledClient.create(
+          tenant=cast(str, uri.tenant), database=cast(str, uri.db), settings=settings
+        )
+      finally:
+        _pool.reset(token)
+
+    return cli
+
+  def pool(
+    self,
+    base: str,
+    headers: Mapping[str, str] | None = None,
+    *,
+    verify: bool | str = True,
+  ) -> httpx.AsyncClient:
+    """Returns the connection pool for a server and headers, creating it the first
+    time.
+
+    Args:
+      base: Base URL of the server such as, for example, https://github.com.
+      headers: Headers to send in every request.
+      verify: Whether to verify the TLS certificates or the CA bundle to verify
+        them with.
+
+    Returns:
+      An HTTP client, not to be closed by the caller.
+
+    Raises:
+      ImportError: if HTTP/2 enabled w/o the h2 package.
+    """
+
+    key = (base, tuple(sorted((headers or {}).items())), verify)
+
+    if (pool := self._pools.get(key)) is None:
+      try:
+        pool = self._pools[key] = httpx.AsyncClient(
+          timeout=None,
+          headers=headers,
+          verify=verify,
+          limits=httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+          ),
+          http2=self.http2,
+        )
+      except ImportError as e:
+        raise ImportError("HTTP/2 requires h2: pip install 'chromie-tool[http2]'.") from e
+
+    return pool
+
+  async def close(self) -> None:
+    """Closes the connection pools, forgetting the clients."""
+
+    while len(self._pools) > 0:
+      await self._pools.popitem()[1].aclose()
+
+    self._clients.clear()
+
+
+def _pool_args(settings: Settings) -> tuple[dict[str, str], bool | str]:
+  """Returns the headers and the TLS verification of the requests of a client, as
+  the Chroma HTTP clients set them: the server headers, the user agent and the
+  headers of the auth provider, if any, the certificates only verified if set.
+  """
+
+  hdrs = dict(settings.chroma_server_headers or {})
+  hdrs["Content-Type"] = "application/json"
+  hdrs["User-Agent"] = (
+    f"Chroma Python Client v{chromadb.__version__} "
+    "(https://github.com/chroma-core/chroma)"
+  )
+
+  if settings.chroma_client_auth_provider:
+    auth = System(settings).require(ClientAuthProvider)
+    hdrs |= {k: v.get_secret_value() for k, v in auth.authenticate().items()}
+
+  return hdrs, settings.chroma_server_ssl_verify or False
+
+
+def headers(api_key: str | None) -> dict[str, str]:
+  """Returns the HTTP headers for authenticating with an API key, if any."""
+
+  return {"x-chroma-token": api_key} if api_key is not None else {}
+
+
+registry = ClientRegistry()
+"""Registry of the process."""
@@ -0,0 +1,200 @@
+from collections.abc import AsyncGenerator, AsyncIterable
+from dataclasses import dataclass
+from typing import Any
+
+from .consts import DEFAULT_BATCH_SIZE
+
+# Estimated bytes of every embedding dimension in the requests and responses: a JSON
+# number, or a base64 float32 in the writes to the servers supporting it.
+_DIM_BYTES = 12
+
+type Records = list[dict[str, Any]] | AsyncIterable[list[dict[str, Any]]]
+"""Records to process: an in-memory list or an asynchronous stream of batches."""
+
+
+async def batched[T](
+  recs: list[T] | AsyncIterable[list[T]],
+  size: int,
+  limit: int | None = None,
+  budget: int | None = None,
+) -> AsyncGenerator[list[T]]:
+  """Iterates the given records batch by batch.
+
+  When a stream is given, this is consumed incrementally and rebatched, so only
+  one pending batch is kept in memory.
+
+  Args:
+    recs: Records to iterate such as, for example, record dicts or ids.
+    size: Maximum number of records per batch.
+    limit: Maximum number of records to return. If None, all of them.
+    budget: Maximum estimated bytes per batch, for record dicts, a batch being
+      cut before size when reaching it. If None, only size cuts the batches.
+
+  Returns:
+    The record batches.
+  """
+
+  # (1) byte budget, record by record
+  if budget is not None:
+    async for batch in _budgeted(recs, size, budget, limit):
+      yield batch
+
+    return
+
+  # (2) in-memory records
+  if isinstance(recs, list):
+    end = len(recs) if limit is None else min(limit, len(recs))
+
+    for i in range(0, end, size):
+      yield recs[i : min(i + size, end)]
+
+    return
+
+  # (3) stream of batches
+  pending: list[T] = []
+  left = limit
+
+  async for batch in recs:
+    if left is not None:
+      batch, left = batch[:left], left - min(left, len(batch))
+
+    pending.extend(batch)
+
+    while len(pending) >= size:
+      yield pending[:size]
+      pending = pending[size:]
+
+    if left == 0:
+      break
+
+  if len(pending) > 0:
+    yield pending
+
+
+async def _budgeted[T](
+  recs: list[T] | AsyncIterable[list[T]], size: int, budget: int, limit: int | None
+) -> AsyncGenerator[list[T]]:
+  """Iterates the given records in batches of up to size records and budget bytes,
+  these estimated with record_size(). A record exceeding the budget alone is
+  returned in its own batch.
+  """
+
+  pending: list[T] = []
+  left, used = limit, 0
+
+  async for batch in _stream(recs):
+    for rec in batch if left is None else batch[:left]:
+      n = record_size(rec)
+
+      if len(pending) > 0 and used + n > budget:
+        yield pending
+        pending, used = [], 0
+
+      pending.append(rec)
+      used += n
+
+      if len(pending) == size:
+        yield pending
+        pending, used = [], 0
+
+    if left is not None and (left := left - min(left, len(batch))) == 0:
+      break
+
+  if len(pending) > 0:
+    yield pending
+
+
+async def _stream[T](recs: list[T] | AsyncIterable[list[T]]) -> AsyncGenerator[list[T]]:
+  """Iterates the given records as a stream of batches."""
+
+  if isinstance(recs, list):
+    yield recs
+    return
+
+  async for batch in recs:
+    yield batch
+
+
+def record_size(rec: Any) -> int:
+  """Estimates the bytes of a record dict in the requests to or responses of Chroma:
+  its id, document, metadata and embedding.
+  """
+
+  size = len(rec["id"])
+
+  if (doc := rec.get("document")) is not None:
+    size += len(doc)
+
+  if (md := rec.get("metadata")) is not None:
+    size += sum(len(k) + len(str(v)) for k, v in md.items())
+
+  if (emb := rec.get("embedding")) is not None:
+    size += len(emb) * _DIM_BYTES
+
+  return size
+
+
+@dataclass
+class PageSizer:
+  """The number of records to read in every page, so the pages are about the byte
+  budget, estimated from the records read so far.
+
+  The first page is read with the default batch size, if less than the cap.
+  """
+
+  cap: int
+  """Maximum number of records per page."""
+
+  budget: int | None = None
+  """Estimated bytes per page. If None, the pages are read with cap records."""
+
+  _count: int = 0
+  _bytes: int = 0
+
+  def size(self) -> int:
+    """Returns the number of records to read in the next page."""
+
+    if self.budget is None:
+      return self.cap
+
+    if self._count == 0:
+      return min(self.cap, DEFAULT_BATCH_SIZE)
+
+    return max(1, min(self.cap, self.budget * self._count // max(self._bytes, 1)))
+
+  def seen(self, batch: list[dict[str, Any]]) -> None:
+    """Records the size of a page read."""
+
+    if self.budget is not None:
+      self._count += len(batch)
+      self._bytes += sum(record_size(r) for r in batch)
+
+
+async def skipped[T](
+  recs: list[T] | AsyncIterable[list[T]], n: int
+) -> AsyncGenerator[list[T]]:
+  """Iterates the given records, skipping the first ones.
+
+  Args:
+    recs: Records to iterate.
+    n: Number of records to skip.
+
+  Returns:
+    The remaining records, in the batches given.
+  """
+
+  # (1) in-memory records
+  if isinstance(recs, list):
+    if len(rest := recs[n:]) > 0:
+      yield rest
+
+    return
+
+  # (2) stream of batches
+  async for batch in recs:
+    if n >= len(batch):
+      n -= len(batch)
+      continue
+
+    yield batch[n:]
+    n = 0
@@ -1,7 +1,9 @@
 from abc import ABC
 from dataclasses import dataclass
 
+from .consts import DEFAULT_RETRIES, Paging, WriteMode
 from .field import Field
+from .limit import AimdLimit
 
 
 @dataclass
@@ -13,3 +15,28 @@ class CollIEBase(ABC):
 
   fields: list[Field]
   """Record fields to import or export."""
+
+  paging: Paging = "offset"
+  """Pagination mode to use when reading a collection."""
+
+  prefetch: int = 0
+  """Maximum number of pages to read ahead when reading a collection."""
+
+  concurrency: int = 1
+  """Maximum number of batches to write at the same time."""
+
+  retries: int = DEFAULT_RETRIES
+  """Number of times to retry a batch write when a transient error occurs."""
+
+  mode: WriteMode = "add"
+  """How the records are written in an import/copy: add, upsert or skip-existing."""
+
+  batch_bytes: int | None = None
+  """Maximum estimated bytes of a batch, this cut before batch_size records when
+  reaching it. If None, the batches are of batch_size records.
+  """
+
+  limit: AimdLimit | None = None
+  """Adaptive limit of the requests in flight, shared by the reads and writes of
+  the collections. If None, only bounded by the concurrency and the prefetch.
+  """
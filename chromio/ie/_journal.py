@@ -0,0 +1,55 @@
+import asyncio
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Self
+
+
+@dataclass
+class Journal:
+  """Base for the checkpoint journals, saved as JSON files and replaced atomically,
+  so a crash leaves either the previous checkpoint or the new one.
+  """
+
+  async def save(self, file: Path) -> None:
+    """Writes the journal, replacing the previous one atomically.
+
+    Args:
+      file: Journal file path.
+    """
+
+    await asyncio.to_thread(self._save, file)
+
+  def _save(self, file: Path) -> None:
+    tmp = file.with_name(file.name + ".tmp")
+    tmp.write_text(json.dumps(asdict(self)))
+    os.replace(tmp, file)
+
+  @classmethod
+  async def load(cls, file: Path) -> Self | None:
+    """Reads a journal.
+
+    Args:
+      file: Journal file path.
+
+    Returns:
+      The journal or None if not found.
+    """
+
+    try:
+      c = await asyncio.to_thread(file.read_text)
+    except FileNotFoundError:
+      return None
+
+    return cls(**json.loads(c))
+
+  @staticmethod
+  async def remove(file: Path) -> None:
+    """Removes a journal, if it exists.
+
+    Args:
+      file: Journal file path.
+    """
+
+    await asyncio.to_thread(file.unlink, missing_ok=True)
@@ -0,0 +1,31 @@
+import httpx
+from chromadb.errors import InternalError, RateLimitError
+
+# HTTP statuses of the throttling and gateway errors, such as these sent by the
+# proxies and load balancers in front of the servers.
+_TRANSIENT_STATUSES = frozenset((408, 429, 502, 503, 504))
+
+
+def is_transient(e: BaseException) -> bool:
+  """Checks whether an error is transient, that is, the request can succeed if retried.
+
+  chromadb raises a plain Exception, w/ the response body as message, for the error
+  responses whose body isn't a Chroma error, the HTTP status only available in the
+  httpx error from which it is raised.
+
+  Args:
+    e: Error to check.
+
+  Returns:
+    True for throttling, server-side and network errors; False otherwise.
+  """
+
+  if isinstance(e, (RateLimitError, InternalError, httpx.TransportError)):
+    return True
+
+  # the error or this from which it was raised, for the plain errors of chromadb
+  for err in (e, e.__cause__ or e.__context__):
+    if isinstance(err, httpx.HTTPStatusError):
+      return err.response.status_code in _TRANSIENT_STATUSES
+
+  return False
@@ -1,5 +1,7 @@
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from .perf import Latencies
 
 
 @dataclass
@@ -12,5 +14,27 @@ class CollIERpt(ABC):
   count: int
   """Number of records imported, exported or copied."""
 
-  duration: int
-  """Operation duration in ms."""
+  duration: float
+  """Operation duration in seconds, measured with the monotonic clock."""
+
+  phases: dict[str, float] = field(default_factory=dict, kw_only=True)
+  """Seconds spent in every phase: read, encode and write."""
+
+  bytes: int = field(default=0, kw_only=True)
+  """Estimated bytes of the records processed."""
+
+  latency: dict[str, Latencies] = field(default_factory=dict, kw_only=True)
+  """Percentiles of the latencies of the server requests of the batches, by phase."""
+
+  peak_rss: int = field(default=0, kw_only=True)
+  """Peak resident set size of the process at the end of the operation, in bytes."""
+
+  records_per_sec: float = field(init=False)
+  """Records processed per second."""
+
+  bytes_per_sec: float = field(init=False)
+  """Estimated bytes processed per second."""
+
+  def __post_init__(self) -> None:
+    self.records_per_sec = self.count / self.duration if self.duration > 0 else 0.0
+    self.bytes_per_sec = self.bytes / self.duration if self.duration > 0 else 0.0
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from typing import Any, cast
+
+from chromadb.api.models.AsyncCollection import AsyncCollection
+
+from .limit import AimdLimit
+
+# Collection methods sending a request to the server.
+_REQUESTS = frozenset(
+  ("add", "count", "delete", "get", "modify", "peek", "query", "update", "upsert")
+)
+
+
+@dataclass
+class ThrottledColl:
+  """A collection proxy limiting the requests in flight to its server, the limit
+  shared with the other collections of the same server.
+
+  Every request waits for a free slot of the limit; the rest of attributes are
+  these of the collection.
+  """
+
+  coll: AsyncCollection
+  """Collection to proxy."""
+
+  limit: AimdLimit
+  """Requests in flight allowed, shared by all the collections of the server."""
+
+  def __getattr__(self, name: str) -> Any:
+    attr = getattr(self.coll, name)
+
+    if name not in _REQUESTS:
+      return attr
+
+    async def request(*args, **kwargs) -> Any:
+      return await self.limit.run(attr, *args, **kwargs)
+
+    return request
+
+
+def throttled(coll: AsyncCollection, limit: AimdLimit | None) -> AsyncCollection:
+  """Returns a collection with its requests limited by the given limit, if any and
+  if not limited yet.
+  """
+
+  if limit is None or isinstance(coll, ThrottledColl):
+    return coll
+
+  return cast(AsyncCollection, ThrottledColl(coll, limit))
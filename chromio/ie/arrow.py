@@ -0,0 +1,267 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator, AsyncIterable, Generator
+from contextlib import aclosing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+try:
+  import pyarrow as pa
+  import pyarrow.parquet as pq
+except ImportError as e:  # pragma: no cover
+  raise ImportError(
+    "The columnar export files require pyarrow: pip install 'chromie-tool[arrow]'."
+  ) from e
+
+from ._batch import batched
+from .consts import DEFAULT_BATCH_SIZE, EmbeddingEncoding
+from .field import Field
+from .metrics import metrics
+
+HEADER_KEY = b"chromie"
+"""Schema metadata key where the export header (version and metadata) is saved."""
+
+# Parquet columns to dictionary-encode, the embeddings not benefiting from it.
+_DICT_COLUMNS = ["id", "document", "metadata"]
+
+
+def _is_parquet(file: Path) -> bool:
+  """Checks whether a columnar file is Parquet; Arrow IPC otherwise."""
+
+  return file.suffix == ".parquet"
+
+
+@dataclass
+class ArrowFileWriter:
+  """A component for writing export files in a columnar format: Parquet (.parquet)
+  or Arrow IPC (.arrow, .feather), chosen by the file extension.
+
+  Every batch is written as it arrives, as a Parquet row group or an IPC record
+  batch. The metadata are saved as JSON strings and the embeddings as a fixed-size
+  list column.
+  """
+
+  encoding: EmbeddingEncoding = "float32"
+  """Embedding value type: float16 or float32, json meaning float32."""
+
+  async def write(
+    self,
+    file: Path,
+    hdr: dict[str, Any],
+    batches: AsyncIterable[list[dict[str, Any]]],
+    fields: list[Field],
+  ) -> int:
+    """Writes the given record batches in a file.
+
+    Args:
+      file: File path where to write.
+      hdr: Export header, that is, the version and metadata members.
+      batches: Record batches to write.
+      fields: Fields of the records.
+
+    Returns:
+      Number of records written.
+    """
+
+    count, writer = 0, None
+
+    try:
+      async for batch in batches:
+        rb = self._to_record_batch(batch, fields)
+
+        # the schema is known with the first batch, when the embedding dim is
+        if writer is None:
+          writer = await asyncio.to_thread(self._open, file, hdr, rb.schema)
+
+        await asyncio.to_thread(writer.write_batch, rb)
+        count += len(batch)
+        metrics.records_written.inc(len(batch))
+        metrics.bytes_written.inc(rb.nbytes)
+
+      # empty export
+      if writer is None:
+        rb = self._to_record_batch([], fields)
+        writer = await asyncio.to_thread(self._open, file, hdr, rb.schema)
+    finally:
+      if writer is not None:  # pragma: no branch
+        await asyncio.to_thread(writer.close)
+
+    return count
+
+  @staticmethod
+  def _open(file: Path, hdr: dict[str, Any], schema: pa.Schema) -> Any:
+    """Opens a columnar writer, attaching the export header to its schema."""
+
+    schema = schema.with_metadata({HEADER_KEY: json.dumps(hdr)})
+
+    return (
+      pq.ParquetWriter(file, schema, use_dictionary=_DICT_COLUMNS)  # type: ignore
+      if _is_parquet(file)
+      else pa.ipc.new_file(str(file), schema)
+    )
+
+  def _to_record_batch(
+    self, batch: list[dict[str, Any]], fields: list[Field]
+  ) -> pa.RecordBatch:
+    """Converts a batch of records to an Arrow record batch.
+
+    Args:
+      batch: Records to convert.
+      fields: Fields of the records.
+
+    Returns:
+      The record batch.
+    """
+
+    cols = {"id": pa.array([r["id"] for r in batch], pa.string())}
+
+    if Field.doc in fields:
+      cols["document"] = pa.array([r["document"] for r in batch], pa.string())
+
+    if Field.meta in fields:
+      cols["metadata"] = pa.array(
+        [None if (md := r["metadata"]) is None else json.dumps(md) for r in batch],
+        pa.string(),
+      )
+
+    if Field.embedding in fields:
+      vtype = pa.float16() if self.encoding == "float16" else pa.float32()
+
+      if len(batch) == 0:  # the dimension is unknown w/o records
+        cols["embedding"] = pa.array([], pa.list_(vtype, 0))
+      else:
+        embs = np.asarray([r["embedding"] for r in batch], dtype=np.float32)
+        values = pa.array(embs.ravel(), pa.float32()).cast(vtype)
+        cols["embedding"] = pa.FixedSizeListArray.from_arrays(
+          values, embs.size // len(batch)
+        )
+
+    return pa.RecordBatch.from_pydict(cols)
+
+
+@dataclass
+class ArrowFileReader:
+  """A component for reading columnar export files, with memory-mapped access.
+
+  The embeddings are returned as NumPy arrays, views of the file content when
+  possible, instead of lists of floats.
+  """
+
+  async def read_metadata(self, file: Path) -> dict[str, Any]:
+    """Reads the header of a columnar export file.
+
+    Args:
+      file: Export file path.
+
+    Returns:
+      The header members such as, for example, version and metadata.
+
+    Raises:
+      FileNotFoundError: if the file not found.
+    """
+
+    schema = await asyncio.to_thread(self._read_schema, file)
+    return json.loads((schema.metadata or {}).get(HEADER_KEY, b"{}"))
+
+  @staticmethod
+  def _read_schema(file: Path) -> pa.Schema:
+    """Reads the schema of a columnar file."""
+
+    if _is_parquet(file):
+      return pq.read_schema(file, memory_map=True)
+
+    with pa.memory_map(str(file)) as src:
+      return pa.ipc.open_file(src).schema
+
+  async def read(
+    self,
+    file: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: int | None = None,
+  ) -> AsyncGenerator[list[dict[str, Any]]]:
+    """Reads the records of a columnar export file.
+
+    Args:
+      file: Export file path.
+      batch_size: Number of records to return in every batch.
+      limit: Maximum number of records to read. If None, all of them.
+
+    Returns:
+      The record batches.
+
+    Raises:
+      FileNotFoundError: if the file not found.
+    """
+
+    # closed on the limit too, closing the file
+    async with aclosing(self._read_batches(file, batch_size)) as batches:
+      async for batch in batched(batches, batch_size, limit):
+        yield batch
+
+  async def _read_batches(
+    self, file: Path, batch_size: int
+  ) -> AsyncGenerator[list[dict[str, Any]]]:
+    """Reads the record batches as stored in the file, up to batch size records
+    each.
+    """
+
+    batches = self._open(file, batch_size)
+
+    try:
+      while (rb := await asyncio.to_thread(next, batches, None)) is not None:
+        yield _to_records(rb)
+    finally:
+      batches.close()
+
+  @staticmethod
+  def _open(file: Path, batch_size: int) -> Generator[pa.RecordBatch]:
+    """Opens a columnar file, returning its record batches, the file closed when
+    these are exhausted or closed.
+    """
+
+    if _is_parquet(file):
+      with pq.ParquetFile(file, memory_map=True) as f:
+        yield from f.iter_batches(batch_size)
+
+      return
+
+    # the IPC tables are read zero-copy from the mapped file, their buffers keeping
+    # the mapping alive once closed
+    with pa.memory_map(str(file)) as src:
+      yield from pa.ipc.open_file(src).read_all().to_batches(max_chunksize=batch_size)
+
+
+def _to_records(rb: pa.RecordBatch) -> list[dict[str, Any]]:
+  """Converts an Arrow record batch to a list of records.
+
+  Args:
+    rb: Record batch to convert.
+
+  Returns:
+    The records.
+  """
+
+  # (1) columns
+  n, names = rb.num_rows, rb.schema.names
+  cols: dict[str, list] = {"id": rb.column("id").to_pylist()}
+
+  if "document" in names:
+    cols["document"] = rb.column("document").to_pylist()
+
+  if "metadata" in names:
+    cols["metadata"] = [
+      None if md is None else json.loads(md) for md in rb.column("metadata").to_pylist()
+    ]
+
+  if "embedding" in names:
+    embs = rb.column("embedding")
+    values = embs.flatten().to_numpy(zero_copy_only=False)
+    cols["embedding"] = list(
+      values.reshape(n, embs.type.list_size).astype(np.float32, copy=False)
+    )
+
+  # (2) records
+  return [{k: v[i] for k, v in cols.items()} for i in range(n)]
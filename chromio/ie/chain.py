@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Literal, Self
+
+import numpy as np
+
+from ._io import open
+
+CHAIN_SUFFIX = ".chain.json"
+"""Extension of the backup chain files."""
+
+HASH_SIZE = 16
+"""Size in bytes of the content hashes, enough for telling the changes apart."""
+
+
+@dataclass
+class ChainLink:
+  """An export file of a backup chain."""
+
+  file: str
+  """File name, relative to the chain directory."""
+
+  kind: Literal["full", "delta"]
+  """full for the first export, with all the records, delta for the next ones."""
+
+  count: int
+  """Number of records in the file: all of them or these added or changed."""
+
+  deleted: list[str] = field(default_factory=list)
+  """Ids of the records deleted since the previous export."""
+
+
+@dataclass
+class Chain:
+  """The index of a backup chain: a full export and the deltas following it, every
+  one with the records added or changed since the previous export and the ids of
+  the records deleted.
+
+  The content hashes of the records in the last export are saved in a file next to
+  the chain (out.hashes.json for out.chain.json), for computing the next delta.
+  """
+
+  coll: str
+  """Collection name."""
+
+  fields: list[str]
+  """Fields exported, the same in all the links."""
+
+  links: list[ChainLink] = field(default_factory=list)
+  """Export files, from the oldest to the newest."""
+
+  version: str = "1.0"
+  """Chain version."""
+
+  async def save(self, file: Path) -> None:
+    """Writes the chain in a file, replacing the previous one atomically.
+
+    Args:
+      file: File path where to write.
+    """
+
+    await _save_json(file, asdict(self), indent=2)
+
+  @classmethod
+  async def load(cls, file: Path) -> Self:
+    """Reads a chain file.
+
+    Args:
+      file: Chain file path.
+
+    Returns:
+      The chain.
+
+    Raises:
+      FileNotFoundError: if the file not found.
+      KeyError: if a required member is missing.
+    """
+
+    async with open(file) as f:
+      c = json.loads(await f.read())
+
+    return cls(
+      coll=c["coll"],
+      fields=c["fields"],
+      links=[ChainLink(**lnk) for lnk in c["links"]],
+      version=c.get("version", "1.0"),
+    )
+
+
+def content_hash(rec: dict[str, Any]) -> str:
+  """Computes the content hash of a record: its document, metadata and embedding,
+  these present.
+
+  The metadata are hashed with their keys sorted and the embedding as float32, so
+  the hash doesn't depend on how these were serialized.
+
+  Args:
+    rec: Record to hash.
+
+  Returns:
+    The hash as an hexadecimal string.
+  """
+
+  h = blake2b(digest_size=HASH_SIZE)
+  h.update(
+    json.dumps([rec.get("document"), rec.get("metadata")], sort_keys=True).encode()
+  )
+
+  if (emb := rec.get("embedding")) is not None:
+    h.update(np.asarray(emb, dtype="<f4").tobytes())
+
+  return h.hexdigest()
+
+
+async def load_hashes(file: Path) -> dict[str, str]:
+  """Reads the content hashes of a backup chain, by record id.
+
+  Args:
+    file: Hash file path.
+
+  Returns:
+    The hashes or an empty dict if the file not found.
+  """
+
+  try:
+    async with open(file) as f:
+      return json.loads(await f.read())
+  except FileNotFoundError:
+    return {}
+
+
+async def save_hashes(file: Path, hashes: dict[str, str]) -> None:
+  """Writes the content hashes of a backup chain, replacing the previous ones
+  atomically.
+
+  Args:
+    file: Hash file path.
+    hashes: Hashes to save, by record id.
+  """
+
+  await _save_json(file, hashes)
+
+
+async def _save_json(file: Path, c: Any, indent: int | None = None) -> None:
+  """Writes a JSON file through a temporary one, replaced atomically."""
+
+  tmp = file.with_name(file.name + ".tmp")
+
+  async with open(tmp, "w") as f:
+    await f.write(json.dumps(c, indent=indent) + "\n")
+
+  await asyncio.to_thread(os.replace, tmp, file)
+
+
+def is_chain(file: Path | str) -> bool:
+  """Checks whether a file is a backup chain, attending to its name."""
+
+  return str(file).endswith(CHAIN_SUFFIX)
+
+
+def link_path(file: Path | str, i: int) -> Path:
+  """Returns the path of an export file of a backup chain such as, for example,
+  out.0001.json for out.chain.json and i=1.
+  """
+
+  return _with_suffix(file, f".{i:04d}.json")
+
+
+def hashes_path(file: Path | str) -> Path:
+  """Returns the path of the content hashes of a backup chain such as, for example,
+  out.hashes.json for out.chain.json.
+  """
+
+  return _with_suffix(file, ".hashes.json")
+
+
+def _with_suffix(file: Path | str, suffix: str) -> Path:
+  """Replaces the chain extension of a file path with another one."""
+
+  file = Path(file)
+  return file.with_name(file.name.removesuffix(CHAIN_SUFFIX) + suffix)
@@ -3,10 +3,13 @@ from dataclasses import dataclass
 from importlib import resources
 from pathlib import Path
 
-from aiofiles import open
 from jsonschema import ValidationError as Error
 from jsonschema import validate
 
+from ._io import open
+from .consts import COLUMNAR_SUFFIXES
+from .emb import decode
+
 # JSON Schema file path.
 JSONSCHEMA_ASSET_PATH = "assets/schemas/exp-file.json"
 
@@ -35,8 +38,35 @@ class ExpFileChecker:
     # (1) read schema and content to validate
     schema = json.loads(resources.read_text("chromio", JSONSCHEMA_ASSET_PATH))
 
+    if Path(file_path).suffix in COLUMNAR_SUFFIXES:
+      return await self._check_columnar(file_path, schema)
+
     async with open(file_path) as f:
       c = json.loads(await f.read())
 
     # (2) check the syntax
     validate(c, schema)
+
+    # (3) check the binary embeddings can be decoded
+    if (enc := c["metadata"].get("encoding", {}).get("embedding", "json")) != "json":
+      for i, rec in enumerate(c["data"]):
+        try:
+          if "embedding" in rec:
+            decode(rec["embedding"], enc)
+        except ValueError as e:
+          raise ValidationError(f"data[{i}].embedding: {e}") from e
+
+  async def _check_columnar(self, file_path: Path, schema: dict) -> None:
+    """Verifies the header of a columnar export file, the records being typed by
+    the file format itself.
+
+    Args:
+      file_path: File path to check.
+      schema: JSON Schema to comply.
+    """
+
+    # pyarrow is optional, so only imported when needed
+    from .arrow import ArrowFileReader
+
+    hdr = await ArrowFileReader().read_metadata(file_path)
+    validate(hdr | {"data": []}, schema)
@@ -1,7 +1,71 @@
+from typing import Literal
+
 from .field import Field
 
+type Paging = Literal["offset", "ids"]
+"""How a collection is walked when read:
+
+- offset: every batch is read with offset/limit, so its cost grows with the offset.
+- ids: the ids are enumerated first, w/o payload, and the batches are read by id,
+  so the cost of every batch is flat.
+"""
+
+type EmbeddingEncoding = Literal["json", "float32", "float16"]
+"""How the embeddings are stored in the export files:
+
+- json: arrays of JSON numbers.
+- float32: base64-encoded arrays of little-endian float32, lossless.
+- float16: base64-encoded arrays of little-endian float16, half the size of float32
+  but with less precision.
+"""
+
+type WriteMode = Literal["add", "upsert", "skip-existing"]
+"""How the records are written into a collection:
+
+- add: the records with existing ids are rejected.
+- upsert: the records with existing ids are overwritten, so rewriting is idempotent.
+- skip-existing: the ids of every batch are looked up first, w/o payload, and only
+  the missing records are added, so topping up a collection almost in sync only
+  sends the new records.
+"""
+
+COLUMNAR_SUFFIXES = (".parquet", ".arrow", ".feather")
+"""File extensions of the columnar export files: Parquet and Arrow IPC."""
+
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+"""File extensions of the compressed export files: gzip and Zstandard."""
+
 DEFAULT_BATCH_SIZE = 200
 """Default size for the R/W batches."""
 
+DEFAULT_BATCH_BYTES = 4 * 1024**2
+"""Default estimated bytes of the R/W batches, these cut before reaching the batch
+size when their records are large.
+"""
+
+DEFAULT_PREFETCH = 4
+"""Default number of pages to read ahead in the exports and copies."""
+
+DEFAULT_CONCURRENCY = 4
+"""Default number of batches to write at the same time in the imports and copies."""
+
+DEFAULT_WORKERS = 4
+"""Default number of part files or collections to import/export at the same time."""
+
+DEFAULT_REQUESTS = 32
+"""Default maximum number of requests in flight to a server with an adaptive limit."""
+
+INITIAL_REQUESTS = 4
+"""Number of requests in flight to a server with an adaptive limit, at the start."""
+
+DEFAULT_RETRIES = 3
+"""Default number of times a batch write is retried on transient errors."""
+
+DEFAULT_BACKOFF = 0.5
+"""Default seconds to wait before the first retry, doubled in every next one."""
+
 DEFAULT_FIELDS: list[Field] = [Field.id, Field.meta, Field.doc]
 """Default fields to import/export."""
+
+DEFAULT_ID_PAGE_SIZE = 10_000
+"""Default number of ids to enumerate per request when reading by ids."""
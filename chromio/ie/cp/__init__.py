@@ -1,7 +1,11 @@
 from .copier import CollCopier
-from .rpt import CollCopyRpt
+from .db_copier import DbCopier, DbRef
+from .rpt import CollCopyRpt, DbCopyRpt
 
 __all__ = [
   "CollCopier",
   "CollCopyRpt",
+  "DbCopier",
+  "DbCopyRpt",
+  "DbRef",
 ]
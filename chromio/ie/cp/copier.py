@@ -1,12 +1,37 @@
-from dataclasses import dataclass
-from time import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+from hashlib import sha256
+from pathlib import Path
+from time import perf_counter
 
 from chromadb.api.models.AsyncCollection import AsyncCollection
 
 from .._db import CollIEBase
+from .._throttle import throttled
 from ..exp.reader import CollReader
+from ..imp.journal import WriteJournal
+from ..imp.writer import CollWriter
+from ..perf import WRITE, Perf
 from .rpt import CollCopyRpt
 
+CP_JOURNAL_SUFFIX = ".cp.journal"
+"""Extension of the copy journals, named after the source and destination."""
+
+
+def cp_journal_path(dir: Path, name: str, endpoints: tuple[str, str]) -> Path:
+  """Returns the journal path of a copy: name.hash.cp.journal, the hash this of the
+  source and destination endpoints, so the copies between collections of the same
+  names in other servers, tenants or databases have their own journals.
+
+  Args:
+    dir: Directory of the journal.
+    name: Name of the copy such as, for example, src-dst.
+    endpoints: Canonical URIs of the source and destination collections.
+  """
+
+  digest = sha256("\n".join(endpoints).encode()).hexdigest()[:12]
+  return dir / f"{name}.{digest}{CP_JOURNAL_SUFFIX}"
+
 
 @dataclass
 class CollCopier(CollIEBase):
@@ -19,6 +44,9 @@ class CollCopier(CollIEBase):
     *,
     limit: int | None = None,
     metafilter: dict | None = None,
+    journal: Path | None = None,
+    resume: bool = False,
+    endpoints: tuple[str, str] | None = None,
   ) -> CollCopyRpt:
     """Copy a collection from an instance to another.
 
@@ -27,32 +55,82 @@ class CollCopier(CollIEBase):
       dst_coll: Collection where to copy.
       limit: Maximum number of records to export.
       metafilter: Filter by metadata.
+      journal: Journal file where to record the progress, removed when the copy
+        completes w/o failed batches.
+      resume: Resume the copy of the journal, if any, reading from the first record
+        not committed and upserting in add mode, the next ones possibly written
+        before.
+      endpoints: Canonical URIs of the source and destination collections,
+        identifying the copy in the journal.
 
     Returns:
-      A copy report.
+      A copy report, the records skipped not counted.
+
+    Raises:
+      ValueError: if the journal is of other collection or arguments.
     """
 
-    # (1) pre
-    reader = CollReader()
+    # (1) pre, every server with its own limit like this of the copier, so the
+    # throttling of the destination doesn't slow down the reads from the source
+    src_coll = throttled(src_coll, self.limit)
+    dst_coll = throttled(dst_coll, None if self.limit is None else replace(self.limit))
+    perf = Perf()
+    reader = CollReader(self.paging, prefetch=self.prefetch, perf=perf)
+    writer = CollWriter(self.concurrency, self.retries, mode=self.mode, perf=perf)
+    start, skip = perf_counter(), 0
+    committed: Callable[[int], Awaitable[None]] | None = None
 
-    # (2) copy
-    count, start = 0, time()
+    # (2) journal, resuming the previous one if requested
+    if journal is not None:
+      fields, (src, dst) = [str(fld) for fld in self.fields], endpoints or (None, None)
+      jnl, resumed = await WriteJournal(
+        dst_coll.name, fields, limit, metafilter, src, dst
+      ).begin(journal, resume)
+
+      async def commit(count: int) -> None:
+        jnl.count = skip + count
+        await jnl.save(journal)
+
+      committed = commit
+
+      if resumed:
+        writer.mode = "upsert" if self.mode == "add" else self.mode
+        skip = jnl.count
+
+    # (3) copy, writing the batches as these are read
+    stats = await writer.write(
+      perf.reads(
+        reader.read(
+          src_coll,
+          self.fields,
+          self.batch_size,
+          None if limit is None else limit - skip,
+          metafilter,
+          offset=skip,
+          batch_bytes=self.batch_bytes,
+        )
+      ),
+      dst_coll,
+      fields=self.fields,
+      batch_size=self.batch_size,
+      batch_bytes=self.batch_bytes,
+      committed=committed,
+    )
 
-    async for batch in reader.read(
-      src_coll, self.fields, self.batch_size, limit, metafilter
-    ):
-      await dst_coll.add(
-        documents=[r["document"] for r in batch],
-        metadatas=[r["metadata"] for r in batch],
-        ids=[r["id"] for r in batch],
-      )
+    if journal is not None and stats.failed == 0:
+      await WriteJournal.remove(journal)
 
-      count += len(batch)
+    duration = perf_counter() - start
+    perf.rest(WRITE, duration)
 
-    # (3) return report
+    # (4) return report
     return CollCopyRpt(
       coll=src_coll.name,
       dst_coll=dst_coll.name,
-      count=count,
-      duration=int(time() - start),
+      count=stats.count,
+      duration=duration,
+      batches_retried=stats.retried,
+      batches_failed=stats.failed,
+      skipped=stats.skipped,
+      **perf.measures(),
     )
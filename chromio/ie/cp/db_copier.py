@@ -0,0 +1,197 @@
+import asyncio
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from time import perf_counter
+from typing import cast
+
+from chromadb.api import AsyncClientAPI
+from chromadb.api.models.AsyncCollection import AsyncCollection
+
+from ...errors import CollAlreadyExistsError
+from ...tools.db import DbTool
+from ...uri import ChromioUri
+from .._throttle import throttled
+from ..consts import DEFAULT_WORKERS
+from ..limit import AimdLimit
+from .copier import CollCopier, cp_journal_path
+from .rpt import CollCopyRpt, DbCopyRpt
+
+
+@dataclass
+class DbRef:
+  """A database to copy from or into."""
+
+  db: AsyncClientAPI
+  """Client of the database."""
+
+  name: str
+  """Database name."""
+
+  endpoint: str
+  """Server of the database such as, for example, localhost:8000, the requests
+  being limited per server.
+  """
+
+  uri: ChromioUri
+  """URI of the database, identifying its collections in the journals."""
+
+
+@dataclass
+class DbCopier:
+  """Copies all the collections of databases into other ones, several at the same
+  time.
+  """
+
+  copier: CollCopier
+  """Copier to use for every collection."""
+
+  workers: int = DEFAULT_WORKERS
+  """Maximum number of collections to copy at the same time, in all the databases."""
+
+  requests: int | None = None
+  """Maximum number of requests in flight to every server, shared by all the
+  collections read from or written into it. If None, these of the copier limit,
+  if any, or only bounded by the workers and the copier concurrency and prefetch.
+  """
+
+  _limits: dict[str, AimdLimit] = field(default_factory=dict, init=False, repr=False)
+
+  async def copy_db(
+    self,
+    src: DbRef,
+    dst: DbRef,
+    *,
+    metafilter: dict | None = None,
+    journals: Path | None = None,
+    resume: bool = False,
+  ) -> DbCopyRpt:
+    """Copies the collections of a database into another one.
+
+    Args:
+      src: Database to copy.
+      dst: Database where to copy.
+      metafilter: Filter by metadata, applied to all the collections.
+      journals: Directory where to save the journals of the collection copies.
+      resume: Resume the collection copies from their journals, if any.
+
+    Returns:
+      A copy report, with a report per collection.
+    """
+
+    return await self.copy_dbs(
+      [(src, dst)], metafilter=metafilter, journals=journals, resume=resume
+    )
+
+  async def copy_dbs(
+    self,
+    dbs: list[tuple[DbRef, DbRef]],
+    *,
+    metafilter: dict | None = None,
+    journals: Path | None = None,
+    resume: bool = False,
+  ) -> DbCopyRpt:
+    """Copies the collections of several databases into other ones such as, for
+    example, all the databases of a tenant.
+
+    The destination collections are created with the configuration of the source
+    ones, if not existing. The collections of all the databases are copied by a
+    pool of workers, the largest ones first, so the longest copies don't start last,
+    leaving the other workers idle.
+
+    Args:
+      dbs: Databases to copy and where to copy them.
+      metafilter: Filter by metadata, applied to all the collections.
+      journals: Directory where to save the journals of the collection copies
+        (srcdb.coll-dstdb.coll.hash.cp.journal). If None, no journal is kept.
+      resume: Resume the collection copies from their journals, if any.
+
+    Returns:
+      A copy report, with a report per collection.
+
+    Raises:
+      ValueError: if the embedding function of a collection is not supported.
+    """
+
+    start = perf_counter()
+
+    # (1) collections to copy, the largest first
+    colls: list[tuple[DbRef, DbRef, str, int]] = []
+
+    for src, dst in dbs:
+      for info in await DbTool(src.db).list_colls(count=True):
+        colls.append((src, dst, info["name"], info["count"]))
+
+    pending = iter(sorted(colls, key=lambda c: c[3], reverse=True))
+    rpts: list[CollCopyRpt] = []
+
+    # (2) copy, every worker taking the next collection when done with one
+    async def worker() -> None:
+      for src, dst, name, _ in pending:
+        rpt = await self._copy_coll(src, dst, name, metafilter, journals, resume)
+        rpts.append(replace(rpt, db=src.name))
+
+    await asyncio.gather(*(worker() for _ in range(min(self.workers, len(colls)))))
+
+    # (3) return report
+    rpts.sort(key=lambda r: (r.db or "", r.coll))
+
+    return DbCopyRpt(
+      count=sum(r.count for r in rpts),
+      duration=perf_counter() - start,
+      colls=rpts,
+    )
+
+  async def _copy_coll(
+    self,
+    src: DbRef,
+    dst: DbRef,
+    name: str,
+    metafilter: dict | None,
+    journals: Path | None,
+    resume: bool,
+  ) -> CollCopyRpt:
+    """Copies a collection, creating it in the destination if not existing."""
+
+    # (1) collections, the destination with the configuration of the source
+    src_coll = await src.db.get_collection(name)
+
+    try:
+      dst_coll = await DbTool(dst.db).create_coll_with_conf(
+        name, src_coll.configuration_json
+      )
+    except CollAlreadyExistsError:
+      dst_coll = await dst.db.get_collection(name)
+
+    # (2) copy, limiting the requests to every server
+    endpoints = (src.uri.endpoint(name), dst.uri.endpoint(name))
+    journal = (
+      None
+      if journals is None
+      else cp_journal_path(journals, f"{src.name}.{name}-{dst.name}.{name}", endpoints)
+    )
+
+    return await self.copier.copy_coll(
+      self._throttled(src_coll, src.endpoint),
+      self._throttled(dst_coll, dst.endpoint),
+      metafilter=metafilter,
+      journal=journal,
+      resume=resume,
+      endpoints=endpoints,
+    )
+
+  def _throttled(self, coll: AsyncCollection, endpoint: str) -> AsyncCollection:
+    """Returns a collection with the requests limited by these of its server, every
+    server with its own limit like this of the copier.
+    """
+
+    if (conf := self.copier.limit) is None and self.requests is None:
+      return coll
+
+    if (limit := self._limits.get(endpoint)) is None:
+      limit = self._limits[endpoint] = (
+        AimdLimit(cast(int, self.requests))
+        if conf is None
+        else replace(conf, max=self.requests or conf.max)
+      )
+
+    return throttled(coll, limit)
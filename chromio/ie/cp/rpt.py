@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .._rpt import CollIERpt
 
@@ -9,3 +9,35 @@ class CollCopyRpt(CollIERpt):
 
   dst_coll: str
   """Collection where the data copied."""
+
+  batches_retried: int = 0
+  """Number of batches retried at least once."""
+
+  batches_failed: int = 0
+  """Number of batches not copied after all the retries."""
+
+  skipped: int = 0
+  """Number of records not copied because existing, in skip-existing mode."""
+
+  db: str | None = None
+  """Source database, in the database and tenant copies."""
+
+
+@dataclass
+class DbCopyRpt:
+  """Report associated to a database or tenant copy."""
+
+  count: int
+  """Number of records copied, in all the collections."""
+
+  duration: float
+  """Copy duration in seconds."""
+
+  colls: list[CollCopyRpt] = field(default_factory=list)
+  """Reports of the collections copied, by database and collection name."""
+
+  @property
+  def batches_failed(self) -> int:
+    """Number of batches not copied, in all the collections."""
+
+    return sum(r.batches_failed for r in self.colls)
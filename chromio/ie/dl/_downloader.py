@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import AsyncIterator
 
-from aiofiles import open
+from .._io import open
 
 
 @dataclass
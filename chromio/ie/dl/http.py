@@ -1,8 +1,7 @@
 from dataclasses import dataclass
 from typing import AsyncIterator, override
 
-import httpx
-
+from ...client import registry
 from ._downloader import Downloader
 
 FILE_NAME = "data"
@@ -29,8 +28,8 @@ class HttpDownloader(Downloader):
     # (1) build URL to request
     url = self._build_url(name, lang)
 
-    # (2) request URL and return content stream
-    if not (resp := await httpx.AsyncClient().request("GET", url)).is_success:
+    # (2) request URL and return content stream, through the pool of the base
+    if not (resp := await registry.pool(self.base).request("GET", url)).is_success:
       raise FileNotFoundError(f"'{url}' not found.")
 
     return resp.aiter_bytes()
@@ -0,0 +1,60 @@
+import base64
+from typing import Any
+
+import numpy as np
+
+from .consts import EmbeddingEncoding
+
+# NumPy data types of the binary encodings, always little-endian.
+_DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
+
+
+def encode(embedding: Any, encoding: EmbeddingEncoding) -> list[float] | str:
+  """Encodes an embedding to be written in an export file.
+
+  Args:
+    embedding: Embedding to encode, a list of floats or a NumPy array.
+    encoding: Encoding to use.
+
+  Returns:
+    A list of floats for json; a base64 string for the binary encodings.
+  """
+
+  if encoding == "json":
+    return embedding.tolist() if isinstance(embedding, np.ndarray) else embedding
+
+  return base64.b64encode(
+    np.asarray(embedding, dtype=_DTYPES[encoding]).tobytes()
+  ).decode("ascii")
+
+
+def decode(
+  value: list[float] | str, encoding: EmbeddingEncoding
+) -> list[float] | np.ndarray:
+  """Decodes an embedding read from an export file.
+
+  Args:
+    value: Embedding as written in the file.
+    encoding: Encoding of the file.
+
+  Returns:
+    The embedding: a list of floats for JSON arrays; a float32 NumPy array for
+    the binary encodings, written as is into Chroma.
+
+  Raises:
+    ValueError: if the value doesn't comply with the encoding.
+  """
+
+  # (1) JSON arrays
+  if isinstance(value, list):
+    return value
+
+  # (2) base64 arrays
+  if (dtype := _DTYPES.get(encoding)) is None:
+    raise ValueError(f"Unexpected encoded embedding for the encoding '{encoding}'.")
+
+  try:
+    buf = base64.b64decode(value, validate=True)
+    return np.frombuffer(buf, dtype=dtype).astype(np.float32, copy=False)
+  except ValueError as e:
+    raise ValueError(f"Invalid {encoding} embedding: {e}.") from e
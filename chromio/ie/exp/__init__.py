@@ -1,7 +1,10 @@
+from .db_exporter import DbExporter
 from .exporter import CollExporter
-from .rpt import CollExportRpt
+from .rpt import CollExportRpt, DbExportRpt
 
 __all__ = [
   "CollExporter",
   "CollExportRpt",
+  "DbExporter",
+  "DbExportRpt",
 ]
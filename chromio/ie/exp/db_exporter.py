@@ -0,0 +1,97 @@
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+
+from chromadb.api import AsyncClientAPI
+
+from ...tools.db import DbTool
+from ..consts import DEFAULT_WORKERS
+from ..manifest import DB_MANIFEST, DbManifest, DbManifestColl
+from .exporter import CollExporter
+from .rpt import CollExportRpt, DbExportRpt
+
+
+@dataclass
+class DbExporter:
+  """Exports all the collections of a database to a directory, several at the
+  same time.
+  """
+
+  exporter: CollExporter
+  """Exporter to use for every collection."""
+
+  workers: int = DEFAULT_WORKERS
+  """Maximum number of collections to export at the same time."""
+
+  async def export_db(
+    self,
+    db: AsyncClientAPI,
+    dir: Path,
+    *,
+    v: str,
+    ext: str = ".json",
+    metafilter: dict | None = None,
+  ) -> DbExportRpt:
+    """Exports the collections of a database, one file per collection, and a
+    manifest listing them (db.manifest.json).
+
+    The collections are exported by a pool of workers, the largest ones first,
+    so the longest exports don't start last, leaving the other workers idle.
+
+    Args:
+      db: Database to export.
+      dir: Directory where to save the files, created if not existing.
+      v: Chroma instance version.
+      ext: Extension of the collection files, choosing their format.
+      metafilter: Filter by metadata, applied to all the collections.
+
+    Returns:
+      An export report, with a report per collection.
+
+    Raises:
+      Exception: the error of the first collection failed, the others being
+        cancelled and no manifest saved.
+    """
+
+    start = perf_counter()
+
+    # (1) collections to export, the largest first
+    infos = await DbTool(db).list_colls(count=True)
+    pending = iter(sorted(infos, key=lambda i: i["count"], reverse=True))
+    rpts: dict[str, CollExportRpt] = {}
+
+    await asyncio.to_thread(dir.mkdir, parents=True, exist_ok=True)
+
+    # (2) export, every worker taking the next collection when done with one
+    async def worker() -> None:
+      for info in pending:
+        coll = await db.get_collection(name := info["name"])
+        rpts[name] = await self.exporter.export_coll(
+          coll, dir / f"{name}{ext}", v=v, metafilter=metafilter
+        )
+
+    try:
+      async with asyncio.TaskGroup() as tg:
+        for _ in range(min(self.workers, len(infos))):
+          tg.create_task(worker())
+    except ExceptionGroup as e:
+      raise e.exceptions[0] from None
+
+    # (3) manifest, the collections by name
+    manifest = DbManifest(
+      [
+        DbManifestColl(coll=name, file=Path(r.file_path).name, count=r.count)
+        for name, r in sorted(rpts.items())
+      ]
+    )
+
+    await manifest.save(file := dir / DB_MANIFEST)
+
+    # (4) return report
+    return DbExportRpt(
+      count=manifest.count,
+      duration=perf_counter() - start,
+      file_path=str(file),
+      colls=[rpts[c.coll] for c in manifest.colls],
+    )
@@ -1,21 +1,54 @@
+import asyncio
 import json
+import os
+from collections.abc import AsyncGenerator, AsyncIterable
 from dataclasses import dataclass
+from math import ceil
 from pathlib import Path
-from time import time
+from time import perf_counter
+from typing import Any, cast
 
-from aiofiles import open
+from aiofiles import ospath
 from chromadb.api.models.AsyncCollection import AsyncCollection
 
 from .._db import CollIEBase
+from .._io import open
+from .._throttle import throttled
+from ..chain import (
+  Chain,
+  ChainLink,
+  content_hash,
+  hashes_path,
+  link_path,
+  load_hashes,
+  save_hashes,
+)
+from ..consts import COLUMNAR_SUFFIXES, COMPRESSION_SUFFIXES, EmbeddingEncoding
+from ..emb import encode
+from ..field import Field
+from ..manifest import Manifest, ManifestPart, manifest_path, part_path
+from ..metrics import metrics
+from ..perf import ENCODE, WRITE, Perf
 from . import jsonl
+from .journal import ExpJournal, journal_path, partial_path
 from .reader import CollReader
 from .rpt import CollExportRpt
+from .store import StoreReader
 
 
 @dataclass
 class CollExporter(CollIEBase):
   """Exports collections to files."""
 
+  encoding: EmbeddingEncoding = "json"
+  """How to store the embeddings in the file."""
+
+  store: Path | None = None
+  """Persistent directory of the collections, for reading them straight from its
+  files instead of through the Chroma API. The exports with metadata filter are
+  read through the API anyway.
+  """
+
   async def export_coll(
     self,
     coll: AsyncCollection,
@@ -24,68 +57,393 @@ class CollExporter(CollIEBase):
     v: str,
     limit: int | None = None,
     metafilter: dict | None = None,
+    resume: bool = False,
   ) -> CollExportRpt:
     """Exports a collection to a file.
 
+    The file format is chosen by its extension: Parquet for .parquet, Arrow IPC for
+    .arrow and .feather, JSON otherwise.
+
+    The JSON exports are written into a partial file (out.json.partial), renamed
+    to the file path when complete. For the uncompressed ones, a journal
+    (out.json.journal) is updated after every batch, so these can be resumed
+    from the last batch written if interrupted.
+
     Args:
       coll: Collection to export.
       file: File path where to save the export.
       v: Chroma instance version.
       limit: Maximum number of records to export.
       metafilter: Filter by metadata.
+      resume: Resume the export from its journal, if any, instead of starting over.
 
     Returns:
       An export report.
+
+    Raises:
+      ValueError: if the export can't be resumed: not an uncompressed JSON file or
+        the journal is of other collection or arguments, such as the encoding.
     """
 
-    # (1) pre
-    reader = CollReader()
+    # (1) journal, resuming the previous one if requested
+    coll, jnl = throttled(coll, self.limit), None
 
-    # (2) export
-    count, start = 0, time()
+    if (ext := Path(file).suffix) not in COLUMNAR_SUFFIXES + COMPRESSION_SUFFIXES:
+      fields = [str(fld) for fld in self.fields]
+      store = None if self.store is None else str(self.store)
+      jnl = ExpJournal(
+        coll.name, limit, metafilter, fields, self.encoding, self.paging, store
+      )
 
-    async with open(file, mode="w") as f:
-      # start
-      await f.write('{\n  "version": "1.0",\n')
+    if resume:
+      if jnl is None:
+        raise ValueError(f"Only the uncompressed JSON exports can be resumed: '{ext}'.")
 
-      # metadata
-      await f.writelines(
-        [
-          '  "metadata": {\n',
-          f'    "chroma": {{"version": "{v}"}},\n',
-          f'    "coll": {_build_coll_repr(coll)}\n',
-          "  },\n",
-        ]
-      )
+      if (prev := await ExpJournal.load(journal_path(file))) is not None:
+        if not prev.matches(jnl):
+          raise ValueError(
+            f"The journal of '{file}' is of other collection or export arguments."
+          )
 
-      # data
-      await f.write('  "data": [\n')
+        # the partial file removed or truncated since, the export starts over
+        partial = partial_path(file)
 
-      async for batch in reader.read(
-        coll, self.fields, self.batch_size, limit, metafilter
-      ):
-        await f.writelines(
-          [
-            ",\n" if count > 0 else "",
-            jsonl.dumps(batch, indent=4, sep=",\n"),
-            "",
-          ]
-        )
-        count += len(batch)
+        if await ospath.exists(partial) and await ospath.getsize(partial) >= prev.bytes:
+          jnl = prev
 
-      await f.write("\n  ]\n")
+    # (2) export, from the last batch committed if resuming
+    start, offset, perf = perf_counter(), 0 if jnl is None else jnl.count, Perf()
+    recs = self._reader(metafilter, perf).read(
+      coll,
+      self.fields,
+      self.batch_size,
+      None if limit is None else limit - offset,
+      metafilter,
+      offset=offset,
+      batch_bytes=self.batch_bytes,
+    )
 
-      # end
-      await f.write("}\n")
+    count = await self._write(coll, file, v, recs, perf, jnl)
 
     # (3) return report
     return CollExportRpt(
       coll=coll.name,
       count=count,
-      duration=int(time() - start),
+      duration=perf_counter() - start,
       file_path=str(file),
+      **perf.measures(),
+    )
+
+  async def export_coll_incremental(
+    self,
+    coll: AsyncCollection,
+    file: Path,
+    *,
+    v: str,
+    metafilter: dict | None = None,
+  ) -> CollExportRpt:
+    """Exports a collection to a backup chain: a full export the first time and,
+    the next ones, a delta with the records added or changed since the previous
+    export, these detected by their content hashes, and the ids deleted.
+
+    The whole collection is read every time, for hashing the records, but only the
+    changes are written.
+
+    Args:
+      coll: Collection to export.
+      file: Chain file path such as, for example, out.chain.json, whence the export
+        files (out.0000.json...) and the content hashes (out.hashes.json).
+      v: Chroma instance version.
+      metafilter: Filter by metadata.
+
+    Returns:
+      An export report, whose count is this of the records written.
+
+    Raises:
+      ValueError: if the chain is of other collection or fields.
+    """
+
+    start, fields, perf = perf_counter(), [str(fld) for fld in self.fields], Perf()
+    coll = throttled(coll, self.limit)
+
+    # (1) chain and hashes of the previous export, if any
+    if await ospath.exists(file):
+      chain = await Chain.load(file)
+
+      if (chain.coll, chain.fields) != (coll.name, fields):
+        raise ValueError(f"The chain '{file}' is of other collection or fields.")
+    else:
+      chain = Chain(coll.name, fields)
+
+    prev = await load_hashes(hashes_path(file)) if len(chain.links) > 0 else {}
+
+    # (2) export the records added or changed
+    hashes: dict[str, str] = {}
+
+    async def changed() -> AsyncGenerator[list[dict]]:
+      async for batch in self._reader(metafilter, perf).read(
+        coll, self.fields, self.batch_size, None, metafilter, batch_bytes=self.batch_bytes
+      ):
+        for rec in batch:
+          hashes[rec["id"]] = content_hash(rec)
+
+        if len(out := [r for r in batch if prev.get(r["id"]) != hashes[r["id"]]]) > 0:
+          yield out
+
+    link = link_path(file, i := len(chain.links))
+    count = await self._write(coll, link, v, changed(), perf)
+
+    # (3) add the export to the chain, before saving the hashes: if interrupted in
+    # between, the next delta repeats the changes instead of missing them
+    chain.links.append(
+      ChainLink(
+        file=link.name,
+        kind="full" if i == 0 else "delta",
+        count=count,
+        deleted=[k for k in prev if k not in hashes],
+      )
+    )
+
+    await chain.save(file)
+    await save_hashes(hashes_path(file), hashes)
+
+    # (4) return report
+    return CollExportRpt(
+      coll=coll.name,
+      count=count,
+      duration=perf_counter() - start,
+      file_path=str(link),
+      **perf.measures(),
+    )
+
+  async def export_coll_shards(
+    self,
+    coll: AsyncCollection,
+    file: Path,
+    *,
+    shards: int,
+    v: str,
+    limit: int | None = None,
+    metafilter: dict | None = None,
+  ) -> CollExportRpt:
+    """Exports a collection to several part files, read and written concurrently.
+
+    The collection is split into disjoint offset windows, one per part file,
+    each of them exported by its own reader. A manifest lists the part files,
+    every one of them being a complete export file too.
+
+    Args:
+      coll: Collection to export.
+      file: File path of the export such as, for example, out.json, whence the
+        part files (out.part-0000.json...) and the manifest (out.manifest.json).
+      shards: Number of part files.
+      v: Chroma instance version.
+      limit: Maximum number of records to export.
+      metafilter: Filter by metadata.
+
+    Returns:
+      An export report, whose file path is this of the manifest.
+    """
+
+    start, coll, perf = perf_counter(), throttled(coll, self.limit), Perf()
+
+    # (1) determine the windows, enumerating the ids matching the filter page by page
+    if metafilter is None:
+      total = await coll.count()
+    else:
+      total = await CollReader().count(coll, metafilter, limit)
+
+    if limit is not None:
+      total = min(total, limit)
+
+    size = max(ceil(total / shards), 1)
+    windows = [(o, min(size, total - o)) for o in range(0, total, size)] or [(0, 0)]
+
+    # (2) export the parts concurrently
+    async def export_part(i: int, offset: int, count: int) -> ManifestPart:
+      part_perf = Perf()
+      recs = self._reader(metafilter, part_perf).read(
+        coll,
+        self.fields,
+        self.batch_size,
+        count,
+        metafilter,
+        offset=offset,
+        batch_bytes=self.batch_bytes,
+      )
+
+      n = await self._write(coll, part := part_path(file, i), v, recs, part_perf)
+      perf.merge(part_perf)
+
+      return ManifestPart(file=part.name, offset=offset, count=n)
+
+    parts = await asyncio.gather(
+      *(export_part(i, offset, count) for i, (offset, count) in enumerate(windows))
+    )
+
+    # (3) write the manifest
+    manifest = Manifest(coll=coll.name, parts=list(parts))
+    await manifest.save(mf := manifest_path(file))
+
+    # (4) return report
+    return CollExportRpt(
+      coll=coll.name,
+      count=manifest.count,
+      duration=perf_counter() - start,
+      file_path=str(mf),
+      **perf.measures(),
+    )
+
+  def _reader(self, metafilter: dict | None, perf: Perf) -> CollReader | StoreReader:
+    """Returns the reader to use: the store one for the persistent directories,
+    w/o metadata filter, the Chroma API one otherwise, recording its page latencies.
+    """
+
+    if self.store is not None and metafilter is None:
+      return StoreReader(self.store)
+
+    return CollReader(self.paging, prefetch=self.prefetch, perf=perf)
+
+  async def _write(
+    self,
+    coll: AsyncCollection,
+    file: Path,
+    v: str,
+    recs: AsyncIterable[list[dict]],
+    perf: Perf,
+    jnl: ExpJournal | None = None,
+  ) -> int:
+    """Writes the records in an export file, attending to its extension.
+
+    Args:
+      perf: Measures where to add the time of every phase.
+
+    Returns:
+      Number of records written.
+    """
+
+    start, recs = perf_counter(), perf.reads(recs)
+
+    if Path(file).suffix in COLUMNAR_SUFFIXES:
+      count = await self._write_columnar(coll, file, v, recs)
+    else:
+      count = await self._write_json(coll, file, v, recs, perf, jnl)
+
+    perf.rest(WRITE, perf_counter() - start)
+    return count
+
+  async def _write_json(
+    self,
+    coll: AsyncCollection,
+    file: Path,
+    v: str,
+    recs: AsyncIterable[list[dict]],
+    perf: Perf,
+    jnl: ExpJournal | None,
+  ) -> int:
+    """Writes the records in a JSON export file, through its partial file.
+
+    Args:
+      perf: Measures where to add the time encoding the records.
+      jnl: Journal to update after every batch. When resuming, the partial file is
+        truncated to its last batch committed and continued.
+
+    Returns:
+      Number of records in the file.
+    """
+
+    enc, count = self.encoding, 0 if jnl is None else jnl.count
+    partial, resumed = partial_path(file), jnl is not None and jnl.bytes > 0
+
+    async def commit(f: Any) -> None:
+      if jnl is not None:
+        await f.flush()
+        jnl.count, jnl.bytes = count, await f.tell()
+        await jnl.save(journal_path(file))
+
+    async with open(partial, "r+" if resumed else "w", suffix=Path(file).suffix) as f:
+      if resumed:
+        # discard what was written after the last batch committed
+        await f.truncate(cast(ExpJournal, jnl).bytes)
+        await f.seek(cast(ExpJournal, jnl).bytes)
+      else:
+        await self._write_json_header(f, coll, v)
+        await commit(f)
+
+      # data
+      async for batch in recs:
+        with perf.phase(ENCODE):
+          if enc != "json" and Field.embedding in self.fields:
+            for rec in batch:
+              rec["embedding"] = encode(rec["embedding"], enc)
+
+          data = jsonl.dumps(batch, indent=4, sep=",\n")
+
+        await f.writelines([",\n" if count > 0 else "", data, ""])
+        count += len(batch)
+        metrics.records_written.inc(len(batch))
+        metrics.bytes_written.inc(len(data))
+        await commit(f)
+
+      # end
+      await f.write("\n  ]\n}\n")
+
+    # finalize: the file only exists when complete
+    await asyncio.to_thread(os.replace, partial, file)
+
+    if jnl is not None:
+      await jnl.remove(journal_path(file))
+
+    return count
+
+  async def _write_json_header(self, f: Any, coll: AsyncCollection, v: str) -> None:
+    """Writes the members of a JSON export file before its records."""
+
+    enc = self.encoding
+
+    # start, the binary encodings requiring the schema 1.1
+    await f.write(f'{{\n  "version": "{"1.0" if enc == "json" else "1.1"}",\n')
+
+    # metadata
+    await f.writelines(
+      [
+        '  "metadata": {\n',
+        f'    "chroma": {{"version": "{v}"}},\n',
+        f'    "coll": {_build_coll_repr(coll)}',
+        f',\n    "encoding": {{"embedding": "{enc}"}}\n' if enc != "json" else "\n",
+        "  },\n",
+      ]
     )
 
+    # data start
+    await f.write('  "data": [\n')
+
+  async def _write_columnar(
+    self,
+    coll: AsyncCollection,
+    file: Path,
+    v: str,
+    recs: AsyncIterable[list[dict]],
+  ) -> int:
+    """Writes the records in a columnar export file, Parquet or Arrow IPC.
+
+    Returns:
+      Number of records written.
+    """
+
+    # pyarrow is optional, so only imported when needed
+    from ..arrow import ArrowFileWriter
+
+    hdr = {
+      "version": "1.0",
+      "metadata": {
+        "chroma": {"version": v},
+        "coll": {"name": coll.name, "configuration": coll.configuration_json},
+      },
+    }
+
+    return await ArrowFileWriter(self.encoding).write(Path(file), hdr, recs, self.fields)
+
 
 def _build_coll_repr(coll: AsyncCollection) -> str:
   """Gets the configuration of a collection and builds its textual representation
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from .._journal import Journal
+
+JOURNAL_SUFFIX = ".journal"
+"""Extension appended to the export file path for its checkpoint journal."""
+
+PARTIAL_SUFFIX = ".partial"
+"""Extension appended to the export file path while this is being written."""
+
+
+@dataclass
+class ExpJournal(Journal):
+  """The checkpoint journal of an export in progress, updated after every batch
+  written, for resuming the export if interrupted.
+  """
+
+  coll: str
+  """Collection name."""
+
+  limit: int | None
+  """Maximum number of records to export."""
+
+  metafilter: dict | None
+  """Record filter by metadata."""
+
+  fields: list[str]
+  """Fields exported."""
+
+  encoding: str = "json"
+  """How the embeddings are stored in the file."""
+
+  paging: str = "offset"
+  """Pagination mode reading the collection, this determining the record order."""
+
+  store: str | None = None
+  """Persistent directory read instead of the Chroma API, if any."""
+
+  count: int = 0
+  """Number of records committed, that is, read and written into the file."""
+
+  bytes: int = 0
+  """Size of the partial file when the last batch was committed."""
+
+  def matches(self, other: "ExpJournal") -> bool:
+    """Checks whether the journal is of the same export as another one, that is,
+    with the same collection and arguments: these selecting the records, their
+    order and their encoding in the file.
+    """
+
+    def args(j: ExpJournal) -> tuple:
+      return (j.coll, j.limit, j.metafilter, j.fields, j.encoding, j.paging, j.store)
+
+    return args(self) == args(other)
+
+
+def journal_path(file: Path | str) -> Path:
+  """Returns the journal path of an export file: out.json.journal for out.json."""
+
+  return Path(str(file) + JOURNAL_SUFFIX)
+
+
+def partial_path(file: Path | str) -> Path:
+  """Returns the path of an export file while being written: out.json.partial."""
+
+  return Path(str(file) + PARTIAL_SUFFIX)
@@ -1,18 +1,37 @@
-from collections.abc import AsyncGenerator
+import asyncio
+from collections import deque
+from collections.abc import AsyncGenerator, Coroutine
 from dataclasses import dataclass
 from typing import Any, cast
 
 from chromadb.api.models.AsyncCollection import AsyncCollection
-from chromadb.api.types import Include
+from chromadb.api.types import GetResult, Include
 
-from ..consts import DEFAULT_BATCH_SIZE, DEFAULT_FIELDS
+from .._batch import PageSizer
+from ..consts import DEFAULT_BATCH_SIZE, DEFAULT_FIELDS, DEFAULT_ID_PAGE_SIZE, Paging
 from ..field import Field
+from ..metrics import metrics
+from ..perf import READ, Perf
 
 
 @dataclass
 class CollReader:
   """A component for reading records from collections."""
 
+  paging: Paging = "offset"
+  """Pagination mode to use."""
+
+  id_page_size: int = DEFAULT_ID_PAGE_SIZE
+  """Number of ids to enumerate in every request when paging by ids."""
+
+  prefetch: int = 0
+  """Maximum number of pages to read ahead of this being processed by the consumer.
+  0 reads the pages one after another.
+  """
+
+  perf: Perf | None = None
+  """Measures where to record the latencies of the page requests, if any."""
+
   async def read(
     self,
     coll: AsyncCollection,
@@ -21,15 +40,22 @@ class CollReader:
     batch_size=DEFAULT_BATCH_SIZE,
     limit: int | None = None,
     metafilter: dict | None = None,
+    offset: int = 0,
+    *,
+    batch_bytes: int | None = None,
   ) -> AsyncGenerator[list[dict]]:
     """Reads data from a collection.
 
     Args:
       coll: Collection to read.
       fields: Fields to read.
-      batch_size: Number of records to read in every batch.
+      batch_size: Maximum number of records to read in every batch.
       limit: Maximum number of records to read. If None, all of them.
       metafilter: Record filter by metadata.
+      offset: Number of records to skip, for reading a window of the collection.
+      batch_bytes: Estimated bytes of every batch, the number of records of the next
+        ones computed from the size of these read. If None, the batches are of
+        batch_size records.
 
     Returns:
       The record batches.
@@ -38,34 +64,20 @@ class CollReader:
     # (1) pre
     include = cast(Include, [str(fld) for fld in fields if fld != Field.id])
 
-    # (2) read
-    start, ended = 0, False
-
-    while not ended:
-      # set offset and batch size (the last one can be less than this passed)
-      offset = start * batch_size
-
-      if limit is not None and offset + batch_size >= limit:
-        ended, batch_size = True, limit - offset
-
-      # read next batch, exiting if no more records
-      if (
-        size := len(
-          (
-            res := await coll.get(
-              include=include, where=metafilter, offset=offset, limit=batch_size
-            )
-          )["ids"]
-        )
-      ) == 0:
-        break
-
-      start += 1
+    end = None if limit is None else offset + limit
+    pages = PageSizer(batch_size, batch_bytes)
+    reqs = (
+      self._offset_reqs(coll, include, pages, offset, end, metafilter)
+      if self.paging == "offset"
+      else self._ids_reqs(coll, include, pages, offset, end, metafilter)
+    )
 
+    # (2) read
+    async for res in self._fetch(reqs):
       # prepare batch to yield
       batch = []
 
-      for i in range(size):
+      for i in range(len(res["ids"])):
         rec: dict[str, Any] = {"id": res["ids"][i]}
 
         if Field.meta in fields:
@@ -74,7 +86,174 @@ class CollReader:
         if Field.doc in fields:
           rec["document"] = cast(list[str], res["documents"])[i]
 
+        if Field.embedding in fields:
+          rec["embedding"] = _to_list(cast(list, res["embeddings"])[i])
+
         batch.append(rec)
 
       # yield batch
+      pages.seen(batch)
       yield batch
+
+  async def count(
+    self, coll: AsyncCollection, metafilter: dict | None, limit: int | None = None
+  ) -> int:
+    """Counts the records of a collection matching a filter, enumerating their ids
+    page by page, so no request returns more than id_page_size of them.
+
+    Args:
+      coll: Collection to count.
+      metafilter: Record filter by metadata.
+      limit: Maximum number to count. If None, all of them.
+
+    Returns:
+      The number of records.
+    """
+
+    return sum([len(ids) async for ids in self._read_ids(coll, 0, limit, metafilter)])
+
+  async def _fetch(
+    self, reqs: AsyncGenerator[Coroutine[Any, Any, GetResult]]
+  ) -> AsyncGenerator[GetResult]:
+    """Runs the page requests in order, reading up to prefetch pages ahead of
+    this consumed, so the network latency overlaps the processing of the batches.
+
+    Args:
+      reqs: Page requests to run.
+
+    Returns:
+      The pages: with offset paging, until the first empty one; with ids paging,
+      these of all the requests, w/o the empty ones, whose records were deleted
+      after their ids were enumerated.
+    """
+
+    pending: deque[asyncio.Task[GetResult]] = deque()
+
+    async def fill(n: int) -> None:
+      while len(pending) < n and (req := await anext(reqs, None)) is not None:
+        pending.append(task := asyncio.ensure_future(req))
+        metrics.queue_depth.inc(phase=READ)
+
+        if self.perf is not None:
+          self.perf.track(READ, task)
+
+    try:
+      while True:
+        # next page, exiting if no more records
+        await fill(max(self.prefetch, 1))
+
+        if len(pending) == 0:
+          break
+
+        metrics.queue_depth.dec(phase=READ)
+
+        if len((res := await pending.popleft())["ids"]) == 0:
+          if self.paging == "offset":
+            break
+
+          continue
+
+        # request the next pages while this is processed
+        await fill(self.prefetch)
+        yield res
+    finally:
+      metrics.queue_depth.dec(len(pending), phase=READ)
+
+      # the pages read ahead cancelled and awaited, so their errors are retrieved
+      for task in pending:
+        task.cancel()
+
+      await asyncio.gather(*pending, return_exceptions=True)
+      await reqs.aclose()
+
+  async def _offset_reqs(
+    self,
+    coll: AsyncCollection,
+    include: Include,
+    pages: PageSizer,
+    offset: int,
+    end: int | None,
+    metafilter: dict | None,
+  ) -> AsyncGenerator[Coroutine[Any, Any, GetResult]]:
+    """Builds the page requests for reading with offset/limit.
+
+    Returns:
+      The requests. When no end, these don't end.
+    """
+
+    while end is None or offset < end:
+      # the last one can be less than the page size
+      size = pages.size() if end is None else min(pages.size(), end - offset)
+
+      yield coll.get(include=include, where=metafilter, offset=offset, limit=size)
+
+      offset += size
+
+  async def _ids_reqs(
+    self,
+    coll: AsyncCollection,
+    include: Include,
+    pages: PageSizer,
+    offset: int,
+    end: int | None,
+    metafilter: dict | None,
+  ) -> AsyncGenerator[Coroutine[Any, Any, GetResult]]:
+    """Builds the page requests for reading by ids: these are enumerated w/o payload
+    and, then, the records are read batch by batch with their ids.
+
+    Returns:
+      The requests.
+    """
+
+    pending: list[str] = []
+
+    async for ids in self._read_ids(coll, offset, end, metafilter):
+      pending.extend(ids)
+
+      while len(pending) >= (size := pages.size()):
+        yield coll.get(ids=pending[:size], include=include)
+        pending = pending[size:]
+
+    while len(pending) > 0:
+      yield coll.get(ids=pending[: (size := pages.size())], include=include)
+      pending = pending[size:]
+
+  async def _read_ids(
+    self,
+    coll: AsyncCollection,
+    offset: int,
+    end: int | None,
+    metafilter: dict | None,
+  ) -> AsyncGenerator[list[str]]:
+    """Enumerates the ids of the records to read, w/o reading their payload.
+
+    Returns:
+      The id pages.
+    """
+
+    while end is None or offset < end:
+      # read next page
+      size = self.id_page_size if end is None else min(self.id_page_size, end - offset)
+
+      if (
+        n := len(
+          ids := (
+            await coll.get(include=[], where=metafilter, offset=offset, limit=size)
+          )["ids"]
+        )
+      ) > 0:
+        yield ids
+
+      # last page?
+      if n < size:
+        break
+
+      offset += n
+
+
+def _to_list(embedding: Any) -> list[float]:
+  """Converts an embedding returned by Chroma, usually a NumPy array, to a list of
+  floats, serializable to JSON.
+  """
+
+  return embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
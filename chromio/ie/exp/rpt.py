@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .._rpt import CollIERpt
 
@@ -9,3 +9,20 @@ class CollExportRpt(CollIERpt):
 
   file_path: str
   """File path where the data saved."""
+
+
+@dataclass
+class DbExportRpt:
+  """Report associated to a database export."""
+
+  count: int
+  """Number of records exported, in all the collections."""
+
+  duration: float
+  """Export duration in seconds."""
+
+  file_path: str
+  """Path of the database manifest."""
+
+  colls: list[CollExportRpt] = field(default_factory=list)
+  """Reports of the collections exported, in manifest order."""
@@ -1,7 +1,8 @@
 from .importer import CollImporter
-from .rpt import CollImportRpt
+from .rpt import CollImportPartRpt, CollImportRpt
 
 __all__ = [
   "CollImporter",
+  "CollImportPartRpt",
   "CollImportRpt",
 ]
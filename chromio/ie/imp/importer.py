@@ -1,11 +1,23 @@
+import asyncio
+import builtins
+import os
+from collections.abc import AsyncGenerator, AsyncIterable, Awaitable, Callable
 from dataclasses import dataclass
-from time import time
+from pathlib import Path
+from time import perf_counter
 from typing import Any
 
 from chromadb.api.models.AsyncCollection import AsyncCollection
 
+from .._batch import Records, batched, skipped
 from .._db import CollIEBase
-from .rpt import CollImportRpt
+from .._throttle import throttled
+from ..chain import Chain
+from ..consts import DEFAULT_WORKERS
+from ..perf import WRITE, Perf
+from .journal import WriteJournal, journal_path
+from .reader import reader_for
+from .rpt import CollImportPartRpt, CollImportRpt
 from .writer import CollWriter
 
 
@@ -16,30 +28,271 @@ class CollImporter(CollIEBase):
   async def import_coll(
     self,
     coll: AsyncCollection,
-    recs: list[dict[str, Any]],
+    recs: Records,
     *,
     limit: int | None = None,
     remove: list[str] = [],
     set: dict = {},
+    journal: Path | None = None,
+    resume: bool = False,
+    endpoints: tuple[str, str] | None = None,
+    perf: Perf | None = None,
   ) -> CollImportRpt:
     """Imports the given records in a collection.
 
     Args:
       coll: Collection to import.
-      recs: Records to import.
+      recs: Records to import, in memory or as an asynchronous stream of batches
+        such as, for example, this returned by ExpFileReader.read().
       limit: Maximum number of records to import.
       remove: Metadata to remove in the import.
       set: Metadata to set/override in the import.
+      journal: Journal file where to record the progress, removed when the import
+        completes w/o failed batches.
+      resume: Resume the import of the journal, if any, skipping the records
+        already committed and upserting the rest in add mode, these possibly
+        written before.
+      endpoints: Absolute path of the import file and canonical URI of the
+        collection, identifying the import in the journal.
+      perf: Measures where to add these of the import, for aggregating several
+        imports. If None, new ones.
 
     Returns:
-      An import report.
+      An import report, the records skipped not counted, with the measures of this
+      import only.
+
+    Raises:
+      ValueError: if the journal is of other collection or arguments.
     """
 
-    start = time()
+    start, coll, own = perf_counter(), throttled(coll, self.limit), Perf()
+
+    # (1) journal, resuming the previous one if requested
+    writer = CollWriter(self.concurrency, self.retries, mode=self.mode, perf=own)
+    committed: Callable[[int], Awaitable[None]] | None = None
+
+    if journal is not None:
+      fields, (src, dst) = [str(fld) for fld in self.fields], endpoints or (None, None)
+      jnl, resumed = await WriteJournal(coll.name, fields, limit, None, src, dst).begin(
+        journal, resume
+      )
+      skip = jnl.count
+
+      async def commit(count: int) -> None:
+        jnl.count = skip + count
+        await jnl.save(journal)
+
+      committed = commit
 
-    # (1) remove/set metafields if needed
+      if resumed:
+        writer.mode = "upsert" if self.mode == "add" else self.mode
+        recs = skipped(recs, skip)
+        limit = None if limit is None else limit - skip
+
+    # (2) remove/set metafields if needed, as the records are written
     if len(remove) > 0 or len(set) > 0:
-      for rec in recs:
+      recs = self._edit_metadata(recs, remove, set)
+
+    # (3) write
+    stats = await writer.write(
+      own.reads(recs),
+      coll,
+      fields=self.fields,
+      limit=limit,
+      batch_size=self.batch_size,
+      batch_bytes=self.batch_bytes,
+      committed=committed,
+    )
+
+    if journal is not None and stats.failed == 0:
+      await WriteJournal.remove(journal)
+
+    duration = perf_counter() - start
+    own.rest(WRITE, duration)
+
+    if perf is not None:
+      perf.merge(own)
+
+    # (4) return report
+    return CollImportRpt(
+      coll=coll.name,
+      count=stats.count,
+      duration=duration,
+      batches_retried=stats.retried,
+      batches_failed=stats.failed,
+      skipped=stats.skipped,
+      **own.measures(),
+    )
+
+  async def import_parts(
+    self,
+    coll: AsyncCollection,
+    files: list[Path],
+    *,
+    workers: int = DEFAULT_WORKERS,
+    remove: list[str] = [],
+    set: dict = {},
+    journals: Path | None = None,
+    resume: bool = False,
+    endpoint: str | None = None,
+  ) -> CollImportRpt:
+    """Imports the part files of a sharded export, several at the same time.
+
+    Every part is streamed from its file into the collection as a regular import.
+
+    Args:
+      coll: Collection to import.
+      files: Part files to import.
+      workers: Maximum number of parts to import at the same time.
+      remove: Metadata to remove in the import.
+      set: Metadata to set/override in the import.
+      journals: Directory where to record the progress of every part in a journal
+        (file.imp.journal). If None, no journal is kept.
+      resume: Resume the import of every part from its journal, if any.
+      endpoint: Canonical URI of the collection, identifying the imports in the
+        journals.
+
+    Returns:
+      An import report, with a report per part.
+
+    Raises:
+      Exception: the error of the first part failed, the others being cancelled.
+    """
+
+    start, sem, perf = perf_counter(), asyncio.Semaphore(workers), Perf()
+
+    # (1) import the parts
+    async def import_part(file: Path) -> CollImportRpt:
+      async with sem:
+        recs = reader_for(file).read(file, self.batch_size)
+        journal = None if journals is None else journals / journal_path(file.name)
+        return await self.import_coll(
+          coll,
+          recs,
+          remove=remove,
+          set=set,
+          journal=journal,
+          resume=resume,
+          endpoints=None if endpoint is None else (os.path.abspath(file), endpoint),
+          perf=perf,
+        )
+
+    try:
+      async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(import_part(file)) for file in files]
+    except ExceptionGroup as e:
+      raise e.exceptions[0] from None
+
+    rpts = [t.result() for t in tasks]
+
+    # (2) return report
+    return CollImportRpt(
+      coll=coll.name,
+      count=sum(r.count for r in rpts),
+      duration=perf_counter() - start,
+      batches_retried=sum(r.batches_retried for r in rpts),
+      batches_failed=sum(r.batches_failed for r in rpts),
+      skipped=sum(r.skipped for r in rpts),
+      **perf.measures(),
+      parts=[
+        CollImportPartRpt(file=str(file), count=r.count, duration=r.duration)
+        for file, r in zip(files, rpts, strict=True)
+      ],
+    )
+
+  async def import_chain(
+    self,
+    coll: AsyncCollection,
+    file: Path,
+    *,
+    remove: list[str] = [],
+    set: dict = {},
+  ) -> CollImportRpt:
+    """Restores a backup chain, that is, the collection as of its last export.
+
+    The export files are read once, from the newest to the oldest, every record
+    being imported from the newest file having it, unless deleted afterwards. So
+    every record is written once.
+
+    Args:
+      coll: Collection to import.
+      file: Chain file path.
+      remove: Metadata to remove in the import.
+      set: Metadata to set/override in the import.
+
+    Returns:
+      An import report, with a report per export file.
+
+    Raises:
+      FileNotFoundError: if the chain or one of its files not found.
+    """
+
+    start, chain, perf = perf_counter(), await Chain.load(file), Perf()
+
+    # (1) import the links, the ids seen in the newer ones being skipped
+    seen: builtins.set[str] = builtins.set()
+    rpts, files = [], []
+
+    for link in reversed(chain.links):
+      recs = reader_for(f := file.parent / link.file).read(f, self.batch_size)
+      rpts.append(
+        await self.import_coll(
+          coll, self._unseen(recs, seen), remove=remove, set=set, perf=perf
+        )
+      )
+      files.append(f)
+      seen.update(link.deleted)
+
+    # (2) return report, the links in chain order
+    return CollImportRpt(
+      coll=coll.name,
+      count=sum(r.count for r in rpts),
+      duration=perf_counter() - start,
+      batches_retried=sum(r.batches_retried for r in rpts),
+      batches_failed=sum(r.batches_failed for r in rpts),
+      skipped=sum(r.skipped for r in rpts),
+      **perf.measures(),
+      parts=[
+        CollImportPartRpt(file=str(f), count=r.count, duration=r.duration)
+        for f, r in zip(reversed(files), reversed(rpts), strict=True)
+      ],
+    )
+
+  @staticmethod
+  async def _unseen(
+    recs: AsyncIterable[list[dict[str, Any]]], seen: builtins.set[str]
+  ) -> AsyncGenerator[list[dict[str, Any]]]:
+    """Filters out the records whose ids were seen, adding the others to these.
+
+    Args:
+      recs: Records to filter.
+      seen: Ids seen.
+
+    Returns:
+      The record batches w/o the records seen.
+    """
+
+    async for batch in recs:
+      batch = [r for r in batch if r["id"] not in seen]
+      seen.update(r["id"] for r in batch)
+      yield batch
+
+  async def _edit_metadata(
+    self, recs: Records, remove: list[str], set: dict
+  ) -> AsyncGenerator[list[dict[str, Any]]]:
+    """Removes and sets the given metafields in the records.
+
+    Args:
+      recs: Records to edit.
+      remove: Metadata to remove.
+      set: Metadata to set/override.
+
+    Returns:
+      The edited record batches.
+    """
+
+    async for batch in batched(recs, self.batch_size):
+      for rec in batch:
         md = rec["metadata"]
 
         for key in remove:
@@ -48,10 +301,4 @@ class CollImporter(CollIEBase):
         for key, val in set.items():
           md[key] = val
 
-    # (2) write
-    count = await CollWriter().write(
-      recs, coll, fields=self.fields, limit=limit, batch_size=self.batch_size
-    )
-
-    # (3) return report
-    return CollImportRpt(coll=coll.name, count=count, duration=int(time() - start))
+      yield batch
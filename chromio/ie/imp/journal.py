@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from .._journal import Journal
+
+JOURNAL_SUFFIX = ".imp.journal"
+"""Extension appended to the import file path for its checkpoint journal."""
+
+
+@dataclass
+class WriteJournal(Journal):
+  """The checkpoint journal of an import or a copy, updated every time a batch is
+  committed, for resuming the write if interrupted.
+
+  The source and the destination are identified by their endpoints: the import
+  file or the canonical URI of the source collection, and this of the destination
+  one, so the writes between collections of the same names in other servers,
+  tenants or databases aren't mistaken for each other.
+  """
+
+  coll: str
+  """Destination collection name."""
+
+  fields: list[str]
+  """Fields written."""
+
+  limit: int | None = None
+  """Maximum number of records to write."""
+
+  metafilter: dict | None = None
+  """Record filter by metadata, when the source is a collection."""
+
+  src: str | None = None
+  """Source of the records: absolute path of the import file or canonical URI of
+  the source collection such as, for example, server://localhost:8000/t/db/coll.
+  """
+
+  dst: str | None = None
+  """Canonical URI of the destination collection."""
+
+  count: int = 0
+  """Number of records committed in order, that is, the first records of the source,
+  all of them written.
+  """
+
+  def matches(self, other: "WriteJournal") -> bool:
+    """Checks whether the journal is of the same write as another one, that is,
+    with the same source, destination and arguments.
+    """
+
+    def args(j: WriteJournal) -> tuple:
+      return (j.coll, j.fields, j.limit, j.metafilter, j.src, j.dst)
+
+    return args(self) == args(other)
+
+  async def begin(self, file: Path, resume: bool) -> tuple[Self, bool]:
+    """Starts a write with this journal or, if requested, resumes the write of the
+    journal saved in the file.
+
+    The journal is saved before writing anything, so a write interrupted before its
+    first commit can be resumed too. When resuming w/o journal, such as after a
+    write run w/o it, the write restarts from the first record, as a resumption,
+    since some records could be written already.
+
+    Args:
+      file: Journal file path.
+      resume: Whether to resume the journal in the file, if any.
+
+    Returns:
+      The journal to update and whether this is a resumption, always when resuming.
+
+    Raises:
+      ValueError: if the journal in the file is of other write.
+    """
+
+    if resume and (prev := await self.load(file)) is not None:
+      if not prev.matches(self):
+        raise ValueError(f"The journal '{file}' is of other collection or arguments.")
+
+      return prev, True
+
+    await self.save(file)
+    return self, resume
+
+
+def journal_path(file: Path | str) -> Path:
+  """Returns the journal path of an import file: out.json.imp.journal for out.json."""
+
+  return Path(str(file) + JOURNAL_SUFFIX)
@@ -0,0 +1,246 @@
+import json
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from aiofiles.threadpool.text import AsyncTextIOWrapper
+
+from .._io import open
+from ..consts import COLUMNAR_SUFFIXES, DEFAULT_BATCH_SIZE, EmbeddingEncoding
+from ..emb import decode
+
+if TYPE_CHECKING:
+  from ..arrow import ArrowFileReader
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+"""Default number of characters to read from the file every time."""
+
+# JSON whitespace characters.
+_WS = " \t\n\r"
+
+
+def reader_for(file: Path | str) -> "ExpFileReader | ArrowFileReader":
+  """Returns the reader to use for an export file, attending to its extension:
+  ArrowFileReader for the columnar files, ExpFileReader otherwise.
+  """
+
+  if Path(file).suffix in COLUMNAR_SUFFIXES:
+    # pyarrow is optional, so only imported when needed
+    from ..arrow import ArrowFileReader
+
+    return ArrowFileReader()
+
+  return ExpFileReader()
+
+
+@dataclass
+class ExpFileReader:
+  """A component for reading export files incrementally.
+
+  The data array is parsed record by record, so the memory used is bounded by
+  the batch size and not by the file size.
+  """
+
+  chunk_size: int = DEFAULT_CHUNK_SIZE
+  """Number of characters to read from the file every time."""
+
+  async def read_metadata(self, file: Path) -> dict[str, Any]:
+    """Reads the header of an export file, that is, all its members but data.
+
+    Args:
+      file: Export file path.
+
+    Returns:
+      The header members such as, for example, version and metadata.
+
+    Raises:
+      FileNotFoundError: if the file not found.
+      JSONDecodeError: if the file is not valid JSON.
+    """
+
+    hdr = {}
+
+    async with aclosing(self._members(file)) as members:
+      async for key, value in members:
+        if key != "data":
+          hdr[key] = value
+        elif "metadata" in hdr:
+          break
+
+    return hdr
+
+  async def read(
+    self,
+    file: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: int | None = None,
+  ) -> AsyncGenerator[list[dict[str, Any]]]:
+    """Reads the records of an export file.
+
+    The embeddings are returned as lists of floats, whatever their encoding in the
+    file.
+
+    Args:
+      file: Export file path.
+      batch_size: Number of records to return in every batch.
+      limit: Maximum number of records to read. If None, all of them.
+
+    Returns:
+      The record batches.
+
+    Raises:
+      FileNotFoundError: if the file not found.
+      JSONDecodeError: if the file is not valid JSON.
+      ValueError: if an embedding doesn't comply with the file encoding.
+    """
+
+    if limit == 0:
+      return
+
+    batch, count = [], 0
+    enc: EmbeddingEncoding = "json"
+
+    async with aclosing(self._members(file)) as members:
+      async for key, rec in members:
+        if key != "data":
+          if key == "metadata":
+            enc = rec.get("encoding", {}).get("embedding", "json")
+
+          continue
+
+        if "embedding" in rec:
+          rec["embedding"] = decode(rec["embedding"], enc)
+
+        batch.append(rec)
+        count += 1
+
+        if len(batch) == batch_size:
+          yield batch
+          batch = []
+
+        if count == limit:
+          break
+
+    if len(batch) > 0:
+      yield batch
+
+  async def _members(self, file: Path) -> AsyncGenerator[tuple[str, Any]]:
+    """Parses the top-level object of an export file.
+
+    Args:
+      file: Export file path.
+
+    Returns:
+      A (key, value) pair for every member, except for data, whose items are
+      returned one by one as (data, record).
+    """
+
+    async with open(file, "r") as f:
+      s = _Scanner(f, self.chunk_size)
+
+      # (1) object start
+      await s.expect("{")
+
+      if await s.peek() == "}":
+        return
+
+      # (2) members
+      while True:
+        # key
+        key = await s.value()
+        await s.expect(":")
+
+        # value
+        if key != "data":
+          yield key, await s.value()
+        else:
+          await s.expect("[")
+
+          if await s.peek() != "]":
+            while True:
+              yield key, await s.value()
+
+              if await s.peek() != ",":
+                break
+
+              s.pos += 1
+
+          await s.expect("]")
+
+        # next member or end
+        if (ch := await s.peek()) != ",":
+          break
+
+        s.pos += 1
+
+      await s.expect("}", ch)
+
+
+class _Scanner:
+  """A JSON scanner over a text file read chunk by chunk."""
+
+  def __init__(self, f: AsyncTextIOWrapper, chunk_size: int):
+    self.f = f
+    self.chunk_size = chunk_size
+    self.buf = ""
+    self.pos = 0
+    self.eof = False
+    self.decoder = json.JSONDecoder()
+
+  async def _fill(self, size: int | None = None) -> None:
+    """Reads the next chunk, discarding the content already consumed.
+
+    Args:
+      size: Number of characters to read. If None, the chunk size.
+    """
+
+    if (chunk := await self.f.read(size or self.chunk_size)) == "":
+      self.eof = True
+
+    self.buf, self.pos = self.buf[self.pos :] + chunk, 0
+
+  async def peek(self) -> str:
+    """Skips the whitespaces and returns the next character, without consuming it.
+    An empty string is returned at the end of the file.
+    """
+
+    while True:
+      buf = self.buf
+
+      while self.pos < len(buf) and buf[self.pos] in _WS:
+        self.pos += 1
+
+      if self.pos < len(buf) or self.eof:
+        return buf[self.pos : self.pos + 1]
+
+      await self._fill()
+
+  async def expect(self, ch: str, got: str | None = None) -> None:
+    """Consumes the next character, checking that it is the expected one."""
+
+    if (got if got is not None else await self.peek()) != ch:
+      raise json.JSONDecodeError(f"Expecting '{ch}'", self.buf, self.pos)
+
+    self.pos += 1
+
+  async def value(self) -> Any:
+    """Consumes and returns the next JSON value."""
+
+    await self.peek()
+
+    while True:
+      try:
+        value, end = self.decoder.raw_decode(self.buf, self.pos)
+
+        # a number at the end of the buffer could be incomplete
+        if end < len(self.buf) or self.eof:
+          self.pos = end
+          return value
+      except json.JSONDecodeError:
+        if self.eof:
+          raise
+
+      # the pending content is doubled every time so as not to reparse it too much
+      await self._fill(max(self.chunk_size, len(self.buf) - self.pos))
@@ -1,8 +1,34 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .._rpt import CollIERpt
 
 
+@dataclass
+class CollImportPartRpt:
+  """Report associated to the import of a part file of a sharded export."""
+
+  file: str
+  """Part file path."""
+
+  count: int
+  """Number of records imported."""
+
+  duration: float
+  """Import duration in seconds."""
+
+
 @dataclass
 class CollImportRpt(CollIERpt):
   """Report associated to a collection import."""
+
+  batches_retried: int = 0
+  """Number of batches retried at least once."""
+
+  batches_failed: int = 0
+  """Number of batches not imported after all the retries."""
+
+  skipped: int = 0
+  """Number of records not imported because existing, in skip-existing mode."""
+
+  parts: list[CollImportPartRpt] = field(default_factory=list)
+  """Reports of the part files imported, when a sharded export."""
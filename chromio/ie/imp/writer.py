@@ -1,56 +1,237 @@
+import asyncio
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
+from typing import Any, cast
 
 from chromadb.api.models.AsyncCollection import AsyncCollection
 
-from ..consts import DEFAULT_BATCH_SIZE, DEFAULT_FIELDS
+from .._batch import Records, batched, record_size
+from .._retry import is_transient
+from ..consts import (
+  DEFAULT_BACKOFF,
+  DEFAULT_BATCH_SIZE,
+  DEFAULT_FIELDS,
+  DEFAULT_RETRIES,
+  WriteMode,
+)
 from ..field import Field
+from ..metrics import metrics
+from ..perf import WRITE, Perf
+
+
+@dataclass
+class CollWriteStats:
+  """Outcome of a write."""
+
+  count: int = 0
+  """Number of records written."""
+
+  retried: int = 0
+  """Number of batches retried at least once."""
+
+  failed: int = 0
+  """Number of batches not written after all the retries."""
+
+  skipped: int = 0
+  """Number of records not written because existing, in skip-existing mode."""
 
 
 @dataclass
 class CollWriter:
   """A component for writing records into collections."""
 
+  concurrency: int = 1
+  """Maximum number of batches to write at the same time."""
+
+  retries: int = DEFAULT_RETRIES
+  """Number of times to retry a batch when a transient error occurs."""
+
+  backoff: float = DEFAULT_BACKOFF
+  """Seconds to wait before the first retry of a batch, doubled in every next one."""
+
+  mode: WriteMode = "add"
+  """How the records are written: add, upsert or skip-existing."""
+
+  perf: Perf | None = None
+  """Measures where to record the latencies of the batch writes, if any."""
+
+  def __post_init__(self) -> None:
+    if self.concurrency < 1:
+      raise ValueError(f"The concurrency must be at least 1: {self.concurrency}.")
+
   async def write(
     self,
-    records: list[dict],
+    records: Records,
     coll: AsyncCollection,
     *,
     fields=DEFAULT_FIELDS,
     batch_size=DEFAULT_BATCH_SIZE,
+    batch_bytes: int | None = None,
     limit: int | None = None,
-  ) -> int:
+    committed: Callable[[int], Awaitable[None]] | None = None,
+  ) -> CollWriteStats:
     """Writes data in a collection.
 
+    Up to concurrency batches are written at the same time, each of them retried
+    independently when a transient error occurs. A batch failing with a
+    non-transient error stops the write.
+
     Args:
-      records: Records to write.
+      records: Records to write, in memory or as an asynchronous stream of batches.
       coll: Collection to write.
-      fields: Fields to write. id and doc always.
-      batch_size: Number of records to write in every batch.
+      fields: Fields to write. id always and doc unless the embeddings are written,
+        these being computed from the documents otherwise.
+      batch_size: Maximum number of records to write in every batch.
+      batch_bytes: Maximum estimated bytes of every batch. If None, the batches are
+        of batch_size records.
       limit: Maximum number of records to write. If None, all of them.
+      committed: Function to call with the number of records committed in order,
+        that is, the first records all of them written, every time this grows. The
+        batches can complete out of order when written concurrently, so a batch
+        only counts once all the previous ones are written.
 
     Returns:
-      The number of records written.
+      The write outcome.
     """
 
-    # (1) determine maximum number of records to write
-    size = len(records)
-    max = size if limit is None or limit > size else limit
+    stats, sem = CollWriteStats(), asyncio.Semaphore(self.concurrency)
+    pending: set[asyncio.Task[None]] = set()
+    errors: list[BaseException] = []
+
+    # batches written, by sequence number, waiting for the previous ones
+    written: dict[int, int] = {}
+    lock, head, count = asyncio.Lock(), 0, 0
+
+    async def commit(seq: int, size: int) -> None:
+      nonlocal head, count
+
+      async with lock:
+        written[seq] = size
+
+        if head not in written:
+          return
+
+        while (size := written.pop(head, -1)) >= 0:
+          head, count = head + 1, count + size
+
+        await cast(Callable[[int], Awaitable[None]], committed)(count)
+
+    async def write_batch(seq: int, batch: list[dict[str, Any]]) -> None:
+      if await self._write_batch(coll, batch, fields, stats) and committed:
+        await commit(seq, len(batch))
+
+    def written_batch(task: asyncio.Task[None]) -> None:
+      # the error recorded before freeing the slot, so no other batch is written
+      if not task.cancelled() and (e := task.exception()) is not None:
+        errors.append(e)
+
+      pending.discard(task)
+      metrics.queue_depth.dec(phase=WRITE)
+      sem.release()
 
-    # (2) write batch by batch
-    for i in range(0, max, batch_size):
-      # determine j (batch end)
-      if (j := i + batch_size) > max:
-        j = max
+    try:
+      # (1) write batch by batch, waiting for a free slot before reading the next one
+      seq = 0
 
-      # write batch
-      batch = records[i:j]
+      async for batch in batched(records, batch_size, limit, batch_bytes):
+        await sem.acquire()
 
-      await coll.add(
-        ids=[r["id"] for r in batch],
-        documents=[r["document"] for r in batch],
-        metadatas=[r["metadata"] for r in batch] if Field.meta in fields else None,
-        embeddings=[r["embedding"] for r in batch] if Field.embedding in fields else None,
-      )
+        if len(errors) > 0:
+          break
+
+        pending.add(task := asyncio.ensure_future(write_batch(seq, batch)))
+        task.add_done_callback(written_batch)
+        metrics.queue_depth.inc(phase=WRITE)
+        seq += 1
+
+      # (2) wait for the batches in flight
+      if len(pending) > 0:
+        await asyncio.wait(pending)
+    finally:
+      for task in pending:
+        task.cancel()
 
     # (3) return
-    return max
+    if len(errors) > 0:
+      raise errors[0]
+
+    return stats
+
+  async def _write_batch(
+    self,
+    coll: AsyncCollection,
+    batch: list[dict[str, Any]],
+    fields: list[Field],
+    stats: CollWriteStats,
+  ) -> bool:
+    """Writes a batch, retrying it if a transient error occurs.
+
+    Args:
+      coll: Collection to write.
+      batch: Records to write.
+      fields: Fields to write.
+      stats: Stats to update.
+
+    Returns:
+      Whether the batch was written, False if failed after all the retries.
+    """
+
+    attempt, write = 0, coll.upsert if self.mode == "upsert" else coll.add
+
+    while True:
+      try:
+        # the records to write, the existing ones counted as skipped only when the
+        # attempt succeeds, so the retries don't count them again
+        recs = await self._missing(coll, batch) if self.mode == "skip-existing" else batch
+        skipped = len(batch) - len(recs)
+
+        if len(recs) == 0:
+          stats.skipped += skipped
+          return True
+
+        req = write(
+          ids=[r["id"] for r in recs],
+          documents=(
+            [r["document"] for r in recs]
+            if Field.doc in fields or Field.embedding not in fields
+            else None
+          ),
+          metadatas=[r["metadata"] for r in recs] if Field.meta in fields else None,
+          embeddings=(
+            [r["embedding"] for r in recs] if Field.embedding in fields else None
+          ),
+        )
+        await (req if self.perf is None else self.perf.request(WRITE, req))
+
+        stats.count, stats.skipped = stats.count + len(recs), stats.skipped + skipped
+        metrics.records_written.inc(len(recs))
+        metrics.bytes_written.inc(sum(record_size(r) for r in recs))
+        return True
+      except Exception as e:
+        if not is_transient(e):
+          raise
+
+        if attempt == self.retries:
+          stats.failed += 1
+          metrics.batches_failed.inc()
+          return False
+
+        if attempt == 0:
+          stats.retried += 1
+
+        metrics.batches_retried.inc()
+        await asyncio.sleep(self.backoff * 2**attempt)
+        attempt += 1
+
+  @staticmethod
+  async def _missing(
+    coll: AsyncCollection, batch: list[dict[str, Any]]
+  ) -> list[dict[str, Any]]:
+    """Returns the records of a batch not existing in a collection, looking up
+    their ids w/o payload.
+    """
+
+    existing = frozenset(
+      (await coll.get(ids=[r["id"] for r in batch], include=[]))["ids"]
+    )
+    return [r for r in batch if r["id"] not in existing]
@@ -0,0 +1,158 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from time import monotonic, perf_counter
+
+from ._retry import is_transient
+from .consts import DEFAULT_REQUESTS, INITIAL_REQUESTS
+
+# Latencies kept for computing the p95, and the minimum to compute it.
+_WINDOW = 50
+_MIN_SAMPLES = 10
+
+
+@dataclass
+class AimdLimit:
+  """An adaptive limit of the requests in flight to a server, shared by all the
+  collections read from or written into it.
+
+  The limit starts at a small window and is additively increased, one request per
+  round of limit requests completed, up to the maximum, while the server answers
+  within the latency target and the limit is used, and multiplicatively decreased
+  on throttling, server or network errors or when the p95 latency exceeds the
+  target. The requests failed or slow of the same round only decrease it once.
+
+  With max_rps, the requests are also spaced to never exceed that rate, so bulk
+  jobs don't degrade the production traffic of the server.
+  """
+
+  max: int = DEFAULT_REQUESTS
+  """Maximum number of requests in flight."""
+
+  latency_target: float | None = None
+  """Seconds that the p95 latency mustn't exceed. If None, only the errors decrease
+  the limit.
+  """
+
+  max_rps: float | None = None
+  """Maximum number of requests per second. If None, unlimited."""
+
+  min: int = 1
+  """Minimum number of requests in flight."""
+
+  backoff: float = 0.5
+  """Factor applied to the limit when decreased."""
+
+  initial: int = INITIAL_REQUESTS
+  """Initial number of requests in flight, within min and max."""
+
+  limit: float = field(init=False)
+  """Current number of requests in flight allowed."""
+
+  decreases: int = field(default=0, init=False)
+  """Number of times the limit was decreased."""
+
+  _inflight: int = field(default=0, init=False, repr=False)
+  _round: int = field(default=0, init=False, repr=False)
+  _done: int = field(default=0, init=False, repr=False)
+  _next: float = field(default=0.0, init=False, repr=False)
+  _latencies: deque[float] = field(
+    default_factory=lambda: deque(maxlen=_WINDOW), init=False, repr=False
+  )
+  _cond: asyncio.Condition = field(
+    default_factory=asyncio.Condition, init=False, repr=False
+  )
+
+  def __post_init__(self) -> None:
+    self.limit = max(self.min, min(self.initial, self.max))
+
+  @property
+  def p95(self) -> float | None:
+    """p95 latency of the last requests, in seconds, None if too few."""
+
+    if len(lat := sorted(self._latencies)) < _MIN_SAMPLES:
+      return None
+
+    return lat[int(0.95 * (len(lat) - 1))]
+
+  async def run[T](self, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+    """Runs a request when the limit and the rate allow it, adapting the limit to
+    its outcome.
+
+    Args:
+      fn: Request function.
+      args: Positional arguments of the request.
+      kwargs: Keyword arguments of the request.
+
+    Returns:
+      The request result.
+    """
+
+    # (1) wait for a free slot and, then, for the rate
+    async with self._cond:
+      await self._cond.wait_for(lambda: self._inflight < int(self.limit))
+      self._inflight, used, rnd = self._inflight + 1, self._inflight + 1, self._round
+
+    try:
+      await self._pace()
+
+      # (2) request
+      start = perf_counter()
+
+      try:
+        res = await fn(*args, **kwargs)
+      except Exception as e:
+        if is_transient(e):
+          self._decrease(rnd)
+
+        raise
+
+      # (3) adapt the limit to the latency
+      self._latencies.append(perf_counter() - start)
+
+      if (
+        (t := self.latency_target) is not None
+        and (p95 := self.p95) is not None
+        and p95 > t
+      ):
+        self._decrease(rnd)
+        return res
+
+      if rnd == self._round and used >= int(self.limit):
+        self._done += 1
+
+        if self._done >= int(self.limit):
+          self.limit, self._done = min(self.max, self.limit + 1), 0
+
+      return res
+    finally:
+      async with self._cond:
+        self._inflight -= 1
+        self._cond.notify_all()
+
+  async def _pace(self) -> None:
+    """Waits for the next request slot allowed by the rate, reserving it."""
+
+    if self.max_rps is None:
+      return
+
+    now = monotonic()
+    at = max(now, self._next)
+    self._next = at + 1 / self.max_rps
+
+    if at > now:
+      await asyncio.sleep(at - now)
+
+  def _decrease(self, rnd: int) -> None:
+    """Decreases the limit multiplicatively, from the requests in flight if less,
+    once per round: the requests started before the last decrease don't decrease
+    it again.
+    """
+
+    if rnd != self._round:
+      return
+
+    self.limit = max(self.min, int(min(self.limit, self._inflight) * self.backoff))
+    self._round, self._done, self.decreases = self._round + 1, 0, self.decreases + 1
+    self._latencies.clear()
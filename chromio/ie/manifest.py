@@ -0,0 +1,220 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import ClassVar, Literal, Self
+
+from ._io import open
+from .consts import COMPRESSION_SUFFIXES
+
+MANIFEST_SUFFIX = ".manifest.json"
+"""Extension of the manifest files."""
+
+DB_MANIFEST = "db.manifest.json"
+"""File name of the manifest of a database export, in its directory."""
+
+type ManifestKind = Literal["shards", "db"]
+"""Kind of export of a manifest: sharded or database."""
+
+# Description of every kind of export.
+_KINDS = {"shards": "a sharded export", "db": "a database export"}
+
+
+@dataclass
+class ManifestPart:
+  """A part file of a sharded export."""
+
+  file: str
+  """File name, relative to the manifest directory."""
+
+  offset: int
+  """Offset of the first record of the part in the collection."""
+
+  count: int
+  """Number of records in the part."""
+
+
+@dataclass
+class Manifest:
+  """The index of a sharded export, listing its part files."""
+
+  kind: ClassVar[ManifestKind] = "shards"
+  """Kind of export, saved in the file for telling apart the manifests."""
+
+  coll: str
+  """Collection name."""
+
+  parts: list[ManifestPart] = field(default_factory=list)
+  """Part files, in collection order."""
+
+  version: str = "1.0"
+  """Manifest version."""
+
+  @property
+  def count(self) -> int:
+    """Number of records in all the parts."""
+
+    return sum(p.count for p in self.parts)
+
+  async def save(self, file: Path) -> None:
+    """Writes the manifest in a file.
+
+    Args:
+      file: File path where to write.
+    """
+
+    async with open(file, "w") as f:
+      await f.write(json.dumps({"kind": self.kind} | asdict(self), indent=2) + "\n")
+
+  @classmethod
+  async def load(cls, file: Path) -> Self:
+    """Reads a manifest file.
+
+    Args:
+      file: Manifest file path.
+
+    Returns:
+      The manifest.
+
+    Raises:
+      FileNotFoundError: if the file not found.
+      KeyError: if a required member is missing.
+      ValueError: if the manifest is of other kind of export, such as a database.
+    """
+
+    c = await _load(file, cls.kind)
+
+    return cls(
+      coll=c["coll"],
+      parts=[ManifestPart(**p) for p in c["parts"]],
+      version=c.get("version", "1.0"),
+    )
+
+
+@dataclass
+class DbManifestColl:
+  """A collection file of a database export."""
+
+  coll: str
+  """Collection name."""
+
+  file: str
+  """File name, relative to the manifest directory."""
+
+  count: int
+  """Number of records exported."""
+
+
+@dataclass
+class DbManifest:
+  """The index of a database export, listing the file of every collection."""
+
+  kind: ClassVar[ManifestKind] = "db"
+  """Kind of export, saved in the file for telling apart the manifests."""
+
+  colls: list[DbManifestColl] = field(default_factory=list)
+  """Collection files, by collection name."""
+
+  version: str = "1.0"
+  """Manifest version."""
+
+  @property
+  def count(self) -> int:
+    """Number of records in all the collections."""
+
+    return sum(c.count for c in self.colls)
+
+  async def save(self, file: Path) -> None:
+    """Writes the manifest in a file.
+
+    Args:
+      file: File path where to write.
+    """
+
+    async with open(file, "w") as f:
+      await f.write(json.dumps({"kind": self.kind} | asdict(self), indent=2) + "\n")
+
+  @classmethod
+  async def load(cls, file: Path) -> Self:
+    """Reads a database manifest file.
+
+    Args:
+      file: Manifest file path.
+
+    Returns:
+      The manifest.
+
+    Raises:
+      FileNotFoundError: if the file not found.
+      KeyError: if a required member is missing.
+      ValueError: if the manifest is of other kind of export, such as a sharded one.
+    """
+
+    c = await _load(file, cls.kind)
+
+    return cls(
+      colls=[DbManifestColl(**coll) for coll in c["colls"]],
+      version=c.get("version", "1.0"),
+    )
+
+
+async def _load(file: Path, kind: ManifestKind) -> dict:
+  """Reads the content of a manifest file, checking its kind of export, this
+  inferred from the members in the files w/o it.
+  """
+
+  async with open(file) as f:
+    c = json.loads(await f.read())
+
+  if (k := c.get("kind", "shards" if "parts" in c else "db")) != kind:
+    raise ValueError(
+      f"'{file}' is the manifest of {_KINDS.get(k, k)}, not of {_KINDS[kind]}."
+    )
+
+  return c
+
+
+def is_manifest(file: Path | str) -> bool:
+  """Checks whether a file is a manifest, attending to its name: of a sharded or a
+  database export.
+  """
+
+  return str(file).endswith(MANIFEST_SUFFIX)
+
+
+def manifest_path(file: Path | str) -> Path:
+  """Returns the manifest path of a sharded export such as, for example,
+  out.manifest.json for out.json.
+  """
+
+  stem, _ = _split(Path(file))
+  return stem.with_name(stem.name + MANIFEST_SUFFIX)
+
+
+def part_path(file: Path | str, i: int) -> Path:
+  """Returns the path of a part file of a sharded export such as, for example,
+  out.part-0001.json.gz for out.json.gz and i=1.
+  """
+
+  stem, ext = _split(Path(file))
+  return stem.with_name(f"{stem.name}.part-{i:04d}{ext}")
+
+
+def export_path(part: Path | str) -> Path:
+  """Returns the path of the sharded export of a part file such as, for example,
+  out.json.gz for out.part-0001.json.gz, the inverse of part_path().
+  """
+
+  part = Path(part)
+  return part.with_name(re.sub(r"\.part-\d{4,}", "", part.name, count=1))
+
+
+def _split(file: Path) -> tuple[Path, str]:
+  """Splits a file path into its stem and its extension, compression included."""
+
+  ext = file.suffix
+
+  if ext in COMPRESSION_SUFFIXES:
+    ext = Path(file.stem).suffix + ext
+
+  return file.with_name(file.name.removesuffix(ext)), ext
@@ -0,0 +1,316 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import ClassVar
+
+DEFAULT_METRICS_INTERVAL = 10.0
+"""Default seconds between the writes of the metrics textfile."""
+
+DEFAULT_METRICS_TIMEOUT = 5.0
+"""Default seconds to wait for the request of a metrics HTTP connection."""
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+"""Upper bounds of the latency histogram buckets, in seconds."""
+
+# Content type of the Prometheus text format.
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+type _Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Metric(ABC):
+  """A metric in the Prometheus text format, w/ a value per label set."""
+
+  type: ClassVar[str]
+  """Prometheus type of the metric."""
+
+  name: str
+  """Metric name."""
+
+  help: str
+  """Metric description."""
+
+  @abstractmethod
+  def samples(self) -> list[str]:
+    """Returns the sample lines of the metric."""
+
+  def render(self) -> str:
+    """Returns the metric in the Prometheus text format."""
+
+    return "".join(
+      [
+        f"# HELP {self.name} {self.help}\n",
+        f"# TYPE {self.name} {self.type}\n",
+        *(f"{s}\n" for s in self.samples()),
+      ]
+    )
+
+
+@dataclass
+class Counter(Metric):
+  """A metric only increasing such as, for example, the records read."""
+
+  type: ClassVar[str] = "counter"
+
+  _values: dict[_Labels, float] = field(default_factory=dict, init=False)
+
+  def inc(self, n: float = 1, **labels: str) -> None:
+    """Increases the value of a label set."""
+
+    key = _key(labels)
+    self._values[key] = self._values.get(key, 0.0) + n
+
+  def value(self, **labels: str) -> float:
+    """Returns the value of a label set."""
+
+    return self._values.get(_key(labels), 0.0)
+
+  def samples(self) -> list[str]:
+    return [f"{self.name}{_fmt(k)} {_num(v)}" for k, v in self._values.items()]
+
+
+@dataclass
+class Gauge(Counter):
+  """A metric going up and down such as, for example, the requests in flight."""
+
+  type: ClassVar[str] = "gauge"
+
+  def dec(self, n: float = 1, **labels: str) -> None:
+    """Decreases the value of a label set."""
+
+    self.inc(-n, **labels)
+
+  def set(self, value: float, **labels: str) -> None:
+    """Sets the value of a label set."""
+
+    self._values[_key(labels)] = value
+
+
+@dataclass
+class Histogram(Metric):
+  """A metric counting the observations such as, for example, the latencies, by
+  buckets of values.
+  """
+
+  type: ClassVar[str] = "histogram"
+
+  buckets: tuple[float, ...] = LATENCY_BUCKETS
+  """Upper bounds of the buckets, in increasing order."""
+
+  # by label set: observations per bucket, the last one +Inf, and their sum
+  _counts: dict[_Labels, list[int]] = field(default_factory=dict, init=False)
+  _sums: dict[_Labels, float] = field(default_factory=dict, init=False)
+
+  def observe(self, value: float, **labels: str) -> None:
+    """Records an observation of a label set."""
+
+    key = _key(labels)
+    counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+    counts[bisect_left(self.buckets, value)] += 1
+    self._sums[key] = self._sums.get(key, 0.0) + value
+
+  def count(self, **labels: str) -> int:
+    """Returns the number of observations of a label set."""
+
+    return sum(self._counts.get(_key(labels), []))
+
+  def samples(self) -> list[str]:
+    lines = []
+
+    for key, counts in self._counts.items():
+      total = 0
+
+      for le, n in zip((*(f"{b:g}" for b in self.buckets), "+Inf"), counts, strict=True):
+        total += n
+        lines.append(f"{self.name}_bucket{_fmt((*key, ('le', le)))} {total}")
+
+      lines.append(f"{self.name}_sum{_fmt(key)} {_num(self._sums[key])}")
+      lines.append(f"{self.name}_count{_fmt(key)} {total}")
+
+    return lines
+
+
+@dataclass
+class Metrics:
+  """The metrics of the imports, exports and copies of the process, updated live by
+  their components and exposed in the Prometheus text format, through a textfile
+  or an HTTP endpoint, for following the long-running jobs.
+  """
+
+  records_read: Counter = field(
+    default_factory=lambda: Counter("chromie_records_read_total", "Records read.")
+  )
+
+  bytes_read: Counter = field(
+    default_factory=lambda: Counter(
+      "chromie_bytes_read_total", "Estimated bytes of the records read."
+    )
+  )
+
+  records_written: Counter = field(
+    default_factory=lambda: Counter("chromie_records_written_total", "Records written.")
+  )
+
+  bytes_written: Counter = field(
+    default_factory=lambda: Counter(
+      "chromie_bytes_written_total",
+      "Bytes written: into the export files, estimated for the servers.",
+    )
+  )
+
+  requests_inflight: Gauge = field(
+    default_factory=lambda: Gauge(
+      "chromie_requests_inflight", "Batch requests in flight to the servers, by phase."
+    )
+  )
+
+  batch_latency: Histogram = field(
+    default_factory=lambda: Histogram(
+      "chromie_batch_latency_seconds",
+      "Latency of the batch requests to the servers, by phase.",
+    )
+  )
+
+  batches_retried: Counter = field(
+    default_factory=lambda: Counter(
+      "chromie_batch_retries_total", "Retries of the batches failed transiently."
+    )
+  )
+
+  batches_failed: Counter = field(
+    default_factory=lambda: Counter(
+      "chromie_batches_failed_total", "Batches not written after all the retries."
+    )
+  )
+
+  queue_depth: Gauge = field(
+    default_factory=lambda: Gauge(
+      "chromie_queue_depth",
+      "Batches waiting: pages read ahead (read) or batches being written (write).",
+    )
+  )
+
+  def render(self) -> str:
+    """Returns the metrics in the Prometheus text format."""
+
+    return "".join(getattr(self, f.name).render() for f in fields(self))
+
+  def write(self, file: Path) -> None:
+    """Writes the metrics in a textfile, atomically, as expected by the textfile
+    collector of the node exporter.
+    """
+
+    tmp = file.with_name(f"{file.name}.tmp")
+    tmp.write_text(self.render())
+    os.replace(tmp, file)
+
+  @asynccontextmanager
+  async def textfile(
+    self, file: Path, interval: float = DEFAULT_METRICS_INTERVAL
+  ) -> AsyncIterator[None]:
+    """Writes the metrics in a textfile every interval seconds while in the
+    context, and once more at its end.
+    """
+
+    async def loop() -> None:
+      while True:
+        await asyncio.to_thread(self.write, file)
+        await asyncio.sleep(interval)
+
+    task = asyncio.create_task(loop())
+
+    try:
+      yield
+    finally:
+      task.cancel()
+
+      with suppress(asyncio.CancelledError):
+        await task
+
+      await asyncio.to_thread(self.write, file)
+
+  @asynccontextmanager
+  async def serve(
+    self, host: str, port: int, timeout: float = DEFAULT_METRICS_TIMEOUT
+  ) -> AsyncIterator[asyncio.Server]:
+    """Serves the metrics over HTTP while in the context, to every request.
+
+    The connections idle longer than timeout seconds w/o request are closed, and
+    these open when the context ends too, so they don't keep the process alive.
+
+    Yields:
+      The server, listening on the given address, port 0 for any free one.
+    """
+
+    clients: set[asyncio.StreamWriter] = set()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+      clients.add(writer)
+
+      try:
+        await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+        body = self.render().encode()
+        writer.write(
+          (
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {_CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+          ).encode()
+          + body
+        )
+        await writer.drain()
+      except (
+        TimeoutError,
+        asyncio.IncompleteReadError,
+        asyncio.LimitOverrunError,
+        ConnectionError,
+      ):
+        pass
+      finally:
+        clients.discard(writer)
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+
+    try:
+      yield server
+    finally:
+      # wait_closed() waiting for the open connections since Python 3.12
+      server.close()
+
+      for writer in clients:
+        writer.close()
+
+      await server.wait_closed()
+
+
+def _key(labels: dict[str, str]) -> _Labels:
+  """Returns the key of a label set."""
+
+  return tuple(sorted(labels.items()))
+
+
+def _num(value: float) -> str:
+  """Formats a sample value, w/o decimals if integral."""
+
+  return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _fmt(labels: _Labels) -> str:
+  """Formats a label set for a sample line."""
+
+  if len(labels) == 0:
+    return ""
+
+  return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+metrics = Metrics()
+"""The metrics of the process."""
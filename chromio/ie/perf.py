@@ -0,0 +1,185 @@
+import asyncio
+import sys
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any
+
+from ._batch import Records, _stream, record_size
+from .metrics import metrics
+
+READ = "read"
+"""Phase reading the records: from the server in the exports and copies, from the
+file in the imports.
+"""
+
+ENCODE = "encode"
+"""Phase encoding the records for the export file."""
+
+WRITE = "write"
+"""Phase writing the records: into the file in the exports, into the server in the
+imports and copies.
+"""
+
+phase_hooks: list[Callable[[str], None]] = []
+"""Functions to call with the phase every time a step of it ends such as, for
+example, a batch read or written, for profiling the phases.
+"""
+
+
+@dataclass
+class Latencies:
+  """Percentiles of the latencies of the server requests of the batches, in seconds."""
+
+  p50: float
+  p95: float
+  p99: float
+  max: float
+
+  @staticmethod
+  def of(secs: list[float]) -> "Latencies":
+    """Returns the percentiles of a non-empty list of latencies."""
+
+    lat = sorted(secs)
+
+    def pct(p: float) -> float:
+      return lat[min(len(lat) - 1, int(p * len(lat)))]
+
+    return Latencies(p50=pct(0.5), p95=pct(0.95), p99=pct(0.99), max=lat[-1])
+
+
+@dataclass
+class Perf:
+  """The performance measures of an import, export or copy, taken with the
+  monotonic high-resolution clock: the seconds spent in every phase, the bytes of
+  the records and the latencies of the server requests of the batches.
+
+  The phases are measured from the consumer of the records: read is the time
+  waiting for the next batch, encode this encoding it and write the rest.
+  """
+
+  phases: dict[str, float] = field(default_factory=dict)
+  """Seconds spent in every phase."""
+
+  bytes: int = 0
+  """Estimated bytes of the records read."""
+
+  latencies: dict[str, list[float]] = field(default_factory=dict)
+  """Seconds of every server request of the batches, by phase."""
+
+  def add(self, phase: str, secs: float) -> None:
+    """Adds time to a phase."""
+
+    self.phases[phase] = self.phases.get(phase, 0.0) + secs
+    _ended(phase)
+
+  def rest(self, phase: str, secs: float) -> None:
+    """Adds to a phase the part of a duration not spent in the other phases."""
+
+    self.add(phase, max(secs - sum(self.phases.values()), 0.0))
+
+  @contextmanager
+  def phase(self, phase: str) -> Iterator[None]:
+    """Measures the time of a block, adding it to a phase."""
+
+    start = perf_counter()
+
+    try:
+      yield
+    finally:
+      self.add(phase, perf_counter() - start)
+
+  async def request[T](self, phase: str, req: Awaitable[T]) -> T:
+    """Runs a server request of a batch, recording its latency in a phase."""
+
+    done = self._requested(phase)
+
+    try:
+      return await req
+    finally:
+      done()
+
+  def track(self, phase: str, task: asyncio.Future) -> None:
+    """Records the latency of a server request of a batch, already running in a
+    task, in a phase when it ends, unless cancelled.
+    """
+
+    done = self._requested(phase)
+    task.add_done_callback(lambda t: done(record=not t.cancelled()))
+
+  def _requested(self, phase: str) -> Callable[..., None]:
+    """Counts a request in flight, returning the function to call when it ends."""
+
+    start = perf_counter()
+    metrics.requests_inflight.inc(phase=phase)
+
+    def done(record: bool = True) -> None:
+      metrics.requests_inflight.dec(phase=phase)
+
+      if record:
+        self.latencies.setdefault(phase, []).append(secs := perf_counter() - start)
+        metrics.batch_latency.observe(secs, phase=phase)
+        _ended(phase)
+
+    return done
+
+  async def reads(self, recs: Records) -> AsyncGenerator[list[dict]]:
+    """Iterates the records to process, adding the time waiting for every batch to
+    the read phase and counting the bytes of the records.
+    """
+
+    it, start = aiter(_stream(recs)), perf_counter()
+
+    while (batch := await anext(it, None)) is not None:
+      self.add(READ, perf_counter() - start)
+      self.bytes += (size := sum(record_size(r) for r in batch))
+      metrics.records_read.inc(len(batch))
+      metrics.bytes_read.inc(size)
+
+      yield batch
+      start = perf_counter()
+
+    self.add(READ, perf_counter() - start)
+
+  def merge(self, other: "Perf") -> None:
+    """Adds the measures of other operation such as, for example, a part of this."""
+
+    for phase, secs in other.phases.items():
+      self.phases[phase] = self.phases.get(phase, 0.0) + secs
+
+    for phase, secs in other.latencies.items():
+      self.latencies.setdefault(phase, []).extend(secs)
+
+    self.bytes += other.bytes
+
+  def measures(self) -> dict[str, Any]:
+    """Returns the measures to set in a report."""
+
+    return {
+      "phases": dict(self.phases),
+      "bytes": self.bytes,
+      "latency": {p: Latencies.of(secs) for p, secs in self.latencies.items() if secs},
+      "peak_rss": peak_rss(),
+    }
+
+
+def _ended(phase: str) -> None:
+  """Calls the phase hooks, a step of the given phase ended."""
+
+  for hook in phase_hooks:
+    hook(phase)
+
+
+def peak_rss() -> int:
+  """Returns the peak resident set size of the process, in bytes, 0 if unknown."""
+
+  try:
+    import resource
+  except ImportError:  # pragma: no cover
+    return 0
+
+  rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+  # kilobytes, except macOS in bytes
+  return rss if sys.platform == "darwin" else rss * 1024
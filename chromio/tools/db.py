@@ -7,6 +7,7 @@ from chromadb.api.models.AsyncCollection import AsyncCollection
 from chromadb.errors import ChromaError
 
 from ..errors import CollAlreadyExistsError, CollNotFoundError
+from ..ie.consts import DEFAULT_BATCH_SIZE
 
 type _Space = Literal["cosine", "ip", "l2"]
 
@@ -20,6 +21,22 @@ class DbTool:
   db: AsyncClientAPI
   """DB object to use for running the operations."""
 
+  async def batch_size(self, size: int | None = None) -> int:
+    """Returns the number of records per batch to use with the server: the given
+    one capped by the maximum reported by the server or, if not given, this.
+
+    Args:
+      size: Number of records per batch requested. If None, the server maximum.
+
+    Returns:
+      The batch size.
+    """
+
+    if (cap := await self.db.get_max_batch_size()) <= 0:
+      return size or DEFAULT_BATCH_SIZE
+
+    return cap if size is None else min(size, cap)
+
   async def create_coll_with_conf(
     self,
     name: str,
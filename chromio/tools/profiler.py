@@ -0,0 +1,222 @@
+import asyncio
+import cProfile
+import logging
+import tracemalloc
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import ClassVar, Literal
+
+from ..ie import perf
+
+type ProfileKind = Literal["cpu", "mem", "async"]
+"""What to profile: the CPU time of the functions, the memory allocated in every
+phase or the event-loop stalls.
+"""
+
+# Bytes per mebibyte.
+_MIB = 1024**2
+
+# Allocations not made by the command.
+_MEM_FILTERS = (
+  tracemalloc.Filter(False, tracemalloc.__file__),
+  tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+  tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+  tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+@dataclass
+class Profiler(ABC):
+  """A profiler of a command run, writing its results in a file when it ends."""
+
+  default_file: ClassVar[str]
+  """File where to write the results, if not given."""
+
+  file: Path
+  """File where to write the results."""
+
+  async def run[T](self, co: Awaitable[T]) -> T:
+    """Runs a command, profiling it.
+
+    Args:
+      co: Command run to profile.
+
+    Returns:
+      What the command returns.
+    """
+
+    self.start()
+
+    try:
+      return await co
+    finally:
+      self.stop()
+
+  @abstractmethod
+  def start(self) -> None:
+    """Starts profiling, from the event loop."""
+
+  @abstractmethod
+  def stop(self) -> None:
+    """Stops profiling, writing the results."""
+
+
+@dataclass
+class CpuProfiler(Profiler):
+  """Profiles the CPU time of the functions with cProfile, the results written in
+  the pstats format, for python -m pstats, snakeviz and the like.
+  """
+
+  default_file: ClassVar[str] = "chromie.prof"
+
+  _prof: cProfile.Profile = field(default_factory=cProfile.Profile, init=False)
+
+  def start(self) -> None:
+    self._prof.enable()
+
+  def stop(self) -> None:
+    self._prof.disable()
+    self._prof.dump_stats(self.file)
+
+
+@dataclass
+class MemProfiler(Profiler):
+  """Profiles the memory with tracemalloc, snapshotting the allocations at the
+  memory peak of every phase: read, encode and write.
+
+  The memory is checked at the end of every step of the phases, a new snapshot
+  taken when exceeding the previous one of the phase by a margin, so the
+  snapshots don't slow down the command too much.
+  """
+
+  default_file: ClassVar[str] = "chromie.mem.txt"
+
+  frames: int = 16
+  """Number of frames to keep of every allocation."""
+
+  top: int = 25
+  """Number of lines to show of every snapshot, the largest ones."""
+
+  margin: float = 0.1
+  """Growth of the memory, over the last snapshot of the phase, for taking a new one."""
+
+  _snaps: dict[str, tuple[int, tracemalloc.Snapshot]] = field(
+    default_factory=dict, init=False
+  )
+
+  def start(self) -> None:
+    tracemalloc.start(self.frames)
+    perf.phase_hooks.append(self._snapshot)
+
+  def _snapshot(self, phase: str) -> None:
+    """Snapshots the allocations if the memory grown since the last snapshot of the
+    phase.
+    """
+
+    size, _ = tracemalloc.get_traced_memory()
+
+    if phase not in self._snaps or size > self._snaps[phase][0] * (1 + self.margin):
+      self._snaps[phase] = (size, tracemalloc.take_snapshot())
+
+  def stop(self) -> None:
+    perf.phase_hooks.remove(self._snapshot)
+    _, peak = tracemalloc.get_traced_memory()
+    end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    with open(self.file, "w") as f:
+      f.write(f"Peak traced memory (MiB): {peak / _MIB:.1f}\n")
+
+      for title, snap in [
+        *(
+          (f"Phase {p}, at {s / _MIB:.1f} MiB", snap)
+          for p, (s, snap) in self._snaps.items()
+        ),
+        ("End", end),
+      ]:
+        f.write(f"\n## {title}\n\n")
+
+        stats = snap.filter_traces(_MEM_FILTERS).statistics("lineno")[: self.top]
+        f.writelines(f"{stat}\n" for stat in stats)
+
+
+@dataclass
+class AsyncProfiler(Profiler):
+  """Profiles the event loop, detecting the stalls: the callbacks blocking the loop
+  longer than a threshold, such as CPU-bound encodings, delaying the rest of tasks.
+
+  The loop runs in debug mode, logging every slow callback with its task, and a
+  heartbeat measures how late the loop wakes it up.
+  """
+
+  default_file: ClassVar[str] = "chromie.async.txt"
+
+  threshold: float = 0.1
+  """Seconds from which a callback stalls the loop."""
+
+  interval: float = 0.01
+  """Seconds between the heartbeats."""
+
+  stalls: list[float] = field(default_factory=list, init=False)
+  """Delays of the heartbeats over the threshold."""
+
+  _handler: logging.Handler = field(init=False)
+  _task: asyncio.Task = field(init=False)
+  _debug: tuple[bool, float] = field(init=False)
+
+  def start(self) -> None:
+    # (1) log the slow callbacks into the file
+    loop = asyncio.get_running_loop()
+    self._debug = (loop.get_debug(), loop.slow_callback_duration)
+    loop.set_debug(True)
+    loop.slow_callback_duration = self.threshold
+
+    self._handler = logging.FileHandler(self.file, mode="w")
+    self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logging.getLogger("asyncio").addHandler(self._handler)
+
+    # (2) start the heartbeat
+    self._task = loop.create_task(self._heartbeat())
+
+  async def _heartbeat(self) -> None:
+    """Sleeps again and again, recording the delays of the wake-ups."""
+
+    while True:
+      start = perf_counter()
+      await asyncio.sleep(self.interval)
+
+      if (delay := perf_counter() - start - self.interval) >= self.threshold:
+        self.stalls.append(delay)
+
+  def stop(self) -> None:
+    # (1) restore the loop
+    loop = asyncio.get_running_loop()
+    loop.set_debug(self._debug[0])
+    loop.slow_callback_duration = self._debug[1]
+
+    self._task.cancel()
+    logging.getLogger("asyncio").removeHandler(self._handler)
+    self._handler.close()
+
+    # (2) summary
+    with open(self.file, "a") as f:
+      f.write(
+        f"Stalls over {self.threshold} s: {len(self.stalls)}, "
+        f"total (s): {sum(self.stalls):.3f}, max (s): {max(self.stalls, default=0):.3f}\n"
+      )
+
+
+def profiler(kind: ProfileKind, file: Path | None = None) -> Profiler:
+  """Returns the profiler of a kind.
+
+  Args:
+    kind: What to profile.
+    file: File where to write the results. If None, the default one of the profiler,
+      in the current directory.
+  """
+
+  cls = {"cpu": CpuProfiler, "mem": MemProfiler, "async": AsyncProfiler}[kind]
+  return cls(file or Path(cls.default_file))
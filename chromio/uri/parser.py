@@ -25,7 +25,7 @@ def parse_uri(uri: str) -> ChromioUri:
   """
 
   if uri.startswith("path://"):
-    return ChromioUri(schema="path", path=uri[7:])
+    return __parse_path_uri(uri)
   elif uri.startswith("server://"):
     return __parse_server_uri(uri)
   elif uri.startswith("cloud://"):
@@ -34,6 +34,23 @@ def parse_uri(uri: str) -> ChromioUri:
     raise ValueError(f"Invalid URI schema: '{uri}'.")
 
 
+def __parse_path_uri(uri: str) -> ChromioUri:
+  """Parses a path URI, to a persistent directory. It can be one of the following:
+
+  - path:///path/to/dir
+  - path:///path/to/dir#coll
+  """
+
+  # (1) parse uri
+  path, _, coll = uri[7:].partition("#")
+
+  if path == "":
+    raise ValueError(f"Expected directory in path URI: '{uri}'.")
+
+  # (2) return parsed uri
+  return ChromioUri(schema="path", path=path, coll=coll or None)
+
+
 def __parse_server_uri(uri: str) -> ChromioUri:
   """Parses a server URI. It can be one of the following:
 
@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass
 from typing import Literal, Self
 
@@ -65,3 +66,25 @@ class ChromioUri:
   @classmethod
   def cloud(cls) -> Self:
     return cls(schema="cloud", host=default_cloud_host, port=default_cloud_port)
+
+  def endpoint(self, coll: str | None = None) -> str:
+    """Returns the canonical URI of the database or of a collection, w/ the defaults
+    resolved, for identifying them such as, for example, in the journals.
+
+    Args:
+      coll: Collection name. If None, this of the URI, if any.
+
+    Returns:
+      server://host:port/tenant/db/coll, cloud:///tenant/db/coll or
+      path:///abs/path#coll, w/o collection if none.
+    """
+
+    coll = coll or self.coll
+
+    if self.schema == "path":
+      return f"path://{os.path.abspath(str(self.path))}" + (f"#{coll}" if coll else "")
+
+    host = f"{self.host}:{self.port}" if self.schema == "server" else ""
+    ep = f"{self.schema}://{host}/{self.tenant}/{self.db}"
+
+    return ep + (f"/{coll}" if coll else "")
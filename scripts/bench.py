@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import platform
+import random
+import sys
+import tempfile
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from importlib.metadata import PackageNotFoundError, version
+from itertools import product
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Literal, cast
+
+import numpy as np
+from chromadb.api import AsyncClientAPI
+from chromadb.api.models.AsyncCollection import AsyncCollection
+
+from chromio.client import client
+from chromio.ie.cp.copier import CollCopier
+from chromio.ie.exp import CollExporter
+from chromio.ie.field import Field
+from chromio.ie.imp.importer import CollImporter
+from chromio.ie.imp.reader import reader_for
+from chromio.uri import parse_uri
+
+type Op = Literal["exp", "imp", "cp"]
+
+# Operations to benchmark: export to a JSON file, import from it and copy.
+ops: tuple[Op, ...] = ("exp", "imp", "cp")
+
+# Field sets to benchmark, by name.
+field_sets = {
+  "meta-doc": [Field.meta, Field.doc],
+  "all": [Field.meta, Field.doc, Field.embedding],
+}
+
+# Seed of the synthetic records, so every run reads the same ones.
+seed = 0
+
+# Bytes per mebibyte.
+mib = 1024**2
+
+# Baseline of the stand-in collection, compared with by default.
+baseline_file = Path(__file__).parent / "bench" / "baseline.json"
+
+
+@dataclass(frozen=True)
+class Case:
+  """A benchmark case."""
+
+  op: Op
+  size: int
+  batch: int
+  fields: str
+
+  @property
+  def key(self) -> str:
+    """Key of the case in the results, for comparing with the baseline."""
+
+    return f"{self.op}/{self.size}/{self.batch}/{self.fields}"
+
+
+@dataclass
+class _MemColl:
+  """An in-process stand-in of a Chroma collection, w/o network nor storage, so
+  the benchmark measures the components: the reads slice the records in memory,
+  the embeddings returned as NumPy arrays as Chroma does, and the writes are only
+  counted.
+  """
+
+  name: str
+  ids: list[str] = field(default_factory=list)
+  documents: list[str] = field(default_factory=list)
+  metadatas: list[dict] = field(default_factory=list)
+  embeddings: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+  configuration_json: dict = field(default_factory=dict)
+  written: int = 0
+  _index: dict[str, int] = field(init=False, repr=False)
+
+  def __post_init__(self) -> None:
+    # positions by id, the records only read, so the id lookups don't add their
+    # cost to every batch
+    self._index = {id: i for i, id in enumerate(self.ids)}
+
+  async def count(self) -> int:
+    return len(self.ids)
+
+  async def get(
+    self,
+    ids: list[str] | None = None,
+    where: dict | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    include: tuple[str, ...] | list[str] = ("metadatas", "documents"),
+  ) -> dict[str, Any]:
+    # (1) positions of the records to return
+    if ids is not None:
+      pos: Any = [self._index[id] for id in ids if id in self._index]
+    else:
+      start = offset or 0
+      pos = slice(start, None if limit is None else start + limit)
+
+    # (2) result
+    rng = range(len(self.ids))[pos] if isinstance(pos, slice) else pos
+    res: dict[str, Any] = {"ids": [self.ids[i] for i in rng]}
+
+    if "metadatas" in include:
+      res["metadatas"] = [self.metadatas[i] for i in rng]
+
+    if "documents" in include:
+      res["documents"] = [self.documents[i] for i in rng]
+
+    if "embeddings" in include:
+      res["embeddings"] = self.embeddings[pos]
+
+    return res
+
+  async def add(self, ids: list[str], **_: Any) -> None:
+    self.written += len(ids)
+
+  upsert = add
+
+
+def _mem_coll(size: int, dim: int) -> _MemColl:
+  """Returns a stand-in collection with the given number of synthetic records."""
+
+  rnd = random.Random(seed)
+  ids = [f"{i:09d}" for i in range(size)]
+
+  return _MemColl(
+    "bench",
+    ids=ids,
+    documents=[f"Document {id}: {rnd.random()}." for id in ids],
+    metadatas=[{"n": i, "tag": f"t{i % 10}", "score": rnd.random()} for i in range(size)],
+    embeddings=np.random.default_rng(seed).random((size, dim), dtype=np.float32),
+  )
+
+
+async def _server_coll(cli: AsyncClientAPI, size: int, dim: int) -> AsyncCollection:
+  """Creates, if needed, a server collection with the synthetic records of the
+  stand-in one.
+  """
+
+  # (1) get or create collection
+  coll = await cli.get_or_create_collection(f"bench_{size}_{dim}")
+
+  # (2) populate if needed, with explicit embeddings for not using any model
+  if await coll.count() < size:
+    mem, step = _mem_coll(size, dim), await cli.get_max_batch_size()
+
+    for i in range(0, size, step):
+      await coll.upsert(
+        ids=mem.ids[i : i + step],
+        documents=mem.documents[i : i + step],
+        metadatas=mem.metadatas[i : i + step],  # type: ignore
+        embeddings=mem.embeddings[i : i + step],
+      )
+
+  # (3) return
+  return coll
+
+
+async def _run_case(case: Case, uri: str | None, dim: int, repeat: int) -> dict:
+  """Runs a case repeat times, returning the result of the fastest run."""
+
+  # (1) source and destination collections
+  cli = None if uri is None else await client(parse_uri(uri))
+  src: Any = (
+    _mem_coll(case.size, dim) if cli is None else await _server_coll(cli, case.size, dim)
+  )
+
+  async def dst() -> Any:
+    if cli is None:
+      return _MemColl("bench_dst")
+
+    if "bench_dst" in [c.name for c in await cli.list_collections()]:
+      await cli.delete_collection("bench_dst")
+
+    return await cli.create_collection("bench_dst")
+
+  # (2) run
+  fields, runs = field_sets[case.fields], []
+
+  with tempfile.TemporaryDirectory() as tmp:
+    file = Path(tmp) / "bench.json"
+
+    if case.op == "imp":
+      await CollExporter(case.batch, fields).export_coll(src, file, v="bench")
+
+    for _ in range(repeat):
+      match case.op:
+        case "exp":
+          rpt = await CollExporter(case.batch, fields).export_coll(src, file, v="bench")
+        case "imp":
+          rpt = await CollImporter(case.batch, fields).import_coll(
+            await dst(), reader_for(file).read(file, case.batch)
+          )
+        case "cp":
+          rpt = await CollCopier(case.batch, fields).copy_coll(src, await dst())
+
+      runs.append(rpt)
+
+  if cli is not None and case.op != "exp":
+    await cli.delete_collection("bench_dst")
+
+  # (3) return the fastest run
+  rpt = min(runs, key=lambda r: r.duration)
+
+  return asdict(case) | {
+    "key": case.key,
+    "count": rpt.count,
+    "duration": rpt.duration,
+    "records_per_sec": rpt.records_per_sec,
+    "peak_rss": rpt.peak_rss,
+  }
+
+
+def _run(case: Case, uri: str | None, dim: int, repeat: int) -> dict:
+  """Runs a case in the process of a worker."""
+
+  return asyncio.run(_run_case(case, uri, dim, repeat))
+
+
+def _compare(
+  results: list[dict], baseline: dict, tolerance: float
+) -> tuple[list[str], list[str]]:
+  """Compares the results with a baseline, returning the regressions, that is, the
+  cases whose records/s fell more than the tolerance, and the keys of the cases
+  not in the baseline.
+  """
+
+  base = {r["key"]: r for r in baseline["results"]}
+  regressions, missing = [], []
+
+  for r in results:
+    if (b := base.get(r["key"])) is None:
+      missing.append(r["key"])
+      continue
+
+    if (ratio := r["records_per_sec"] / b["records_per_sec"]) < 1 - tolerance:
+      regressions.append(
+        f"{r['key']}: {r['records_per_sec']:.0f} records/s, "
+        f"{b['records_per_sec']:.0f} in the baseline ({ratio - 1:+.1%})"
+      )
+
+  return regressions, missing
+
+
+def _version() -> str | None:
+  """Returns the version of chromie-tool, None if not installed, such as when run
+  from a checkout.
+  """
+
+  try:
+    return version("chromie-tool")
+  except PackageNotFoundError:
+    return None
+
+
+def main() -> None:
+  # (1) args
+  parser = ArgumentParser(
+    description=(
+      "Benchmark the throughput of the exports, imports and copies, against an "
+      "in-process stand-in collection or a server."
+    ),
+    formatter_class=ArgumentDefaultsHelpFormatter,
+  )
+
+  parser.add_argument(
+    "--uri",
+    "-u",
+    help="server URI such as server://// (default server), instead of the stand-in",
+  )
+  parser.add_argument("--ops", help="operations", nargs="+", choices=ops, default=ops)
+  parser.add_argument(
+    "--sizes",
+    "-s",
+    help="collection sizes",
+    type=int,
+    nargs="+",
+    default=[1_000, 10_000, 50_000],
+  )
+  parser.add_argument(
+    "--batches", "-b", help="batch sizes", type=int, nargs="+", default=[100, 1_000]
+  )
+  parser.add_argument(
+    "--fields",
+    "-F",
+    help="field sets",
+    nargs="+",
+    choices=field_sets,
+    default=list(field_sets),
+  )
+  parser.add_argument("--dim", help="embedding dimension", type=int, default=64)
+  parser.add_argument(
+    "--repeat", "-r", help="runs per case, the fastest kept", type=int, default=3
+  )
+  parser.add_argument("--out", "-o", help="JSON file where to save the results")
+  parser.add_argument(
+    "--baseline",
+    help="JSON results to compare with, the stored one of the stand-in by default",
+  )
+  parser.add_argument(
+    "--no-baseline", help="don't compare with any baseline", action="store_true"
+  )
+  parser.add_argument(
+    "--tolerance",
+    help="records/s fall from the baseline flagged as regression",
+    type=float,
+    default=0.1,
+  )
+
+  args = parser.parse_args()
+
+  # (2) run every case in a new process, for measuring its peak memory alone
+  cases = [
+    Case(op, size, batch, fields)
+    for op, fields, batch, size in product(
+      args.ops, args.fields, args.batches, args.sizes
+    )
+    # the server computes the embeddings of the records written w/o them
+    if args.uri is None or op == "exp" or Field.embedding in field_sets[fields]
+  ]
+
+  with ProcessPoolExecutor(
+    1, mp_context=get_context("spawn"), max_tasks_per_child=1
+  ) as pool:
+    results = [
+      pool.submit(_run, case, args.uri, args.dim, args.repeat).result() for case in cases
+    ]
+
+  # (3) show the scaling curves: records/s and peak memory by size
+  print(f"{'case':<22} " + " ".join(f"{s:>17}" for s in args.sizes))
+  by_key = {r["key"]: r for r in results}
+
+  for op, fields, batch in product(args.ops, args.fields, args.batches):
+    row = [by_key.get(Case(op, size, batch, fields).key) for size in args.sizes]
+
+    if any(row):
+      print(
+        f"{f'{op} b{batch} {fields}':<22} "
+        + " ".join(
+          f"{r['records_per_sec']:>9.0f}/s {r['peak_rss'] / mib:>4.0f}M"
+          if r
+          else f"{'-':>17}"
+          for r in row
+        )
+      )
+
+  # (4) save
+  run = {
+    "meta": {
+      "date": datetime.now(UTC).isoformat(timespec="seconds"),
+      "version": _version(),
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "target": args.uri or "memory",
+      "dim": args.dim,
+      "repeat": args.repeat,
+    },
+    "results": results,
+  }
+
+  if args.out is not None:
+    Path(args.out).write_text(json.dumps(run, indent=2) + "\n")
+
+  # (5) compare with the baseline, the stored one only valid for the stand-in
+  if (file := args.baseline) is None and args.uri is None:
+    file = baseline_file
+
+  if file is not None and not args.no_baseline:
+    baseline = cast(dict, json.loads(Path(file).read_text()))
+    regressions, missing = _compare(results, baseline, args.tolerance)
+
+    if len(missing) > 0:
+      print(f"\nNot in the baseline ({file}): {', '.join(missing)}")
+
+    if len(regressions) > 0:
+      print("\nRegressions:\n" + "\n".join(regressions))
+      sys.exit(1)
+
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import asyncio
+import random
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from time import perf_counter
+
+from chromadb.api import AsyncClientAPI
+from chromadb.api.models.AsyncCollection import AsyncCollection
+
+from chromio.client import client
+from chromio.ie.consts import DEFAULT_FIELDS, Paging
+from chromio.ie.exp.reader import CollReader
+from chromio.uri import parse_uri
+
+# Paging modes to compare.
+modes: tuple[Paging, ...] = ("offset", "ids")
+
+# Dimension of the synthetic embeddings.
+dim = 8
+
+
+async def _arrange_coll(cli: AsyncClientAPI, size: int) -> AsyncCollection:
+  """Creates, if needed, a collection with the given number of synthetic records.
+
+  Args:
+    cli: Client to use.
+    size: Number of records.
+
+  Returns:
+    The collection.
+  """
+
+  # (1) get or create collection
+  coll = await cli.get_or_create_collection(f"bench_paging_{size}")
+
+  # (2) populate if needed, with explicit embeddings for not using any model
+  if (count := await coll.count()) < size:
+    step = await cli.get_max_batch_size()
+
+    for i in range(count, size, step):
+      ids = [f"{j:09d}" for j in range(i, min(i + step, size))]
+
+      await coll.add(
+        ids=ids,
+        documents=[f"Document {id}." for id in ids],
+        metadatas=[{"n": int(id)} for id in ids],
+        embeddings=[[random.random() for _ in range(dim)] for _ in ids],
+      )
+
+  # (3) return
+  return coll
+
+
+async def _time_read(coll: AsyncCollection, paging: Paging, batch_size: int) -> float:
+  """Reads a collection fully, returning the seconds taken."""
+
+  reader = CollReader(paging)
+  start = perf_counter()
+
+  async for _ in reader.read(coll, DEFAULT_FIELDS, batch_size):
+    pass
+
+  return perf_counter() - start
+
+
+async def main() -> None:
+  # (1) args
+  parser = ArgumentParser(
+    description="Compare the export read time of the paging modes.",
+    formatter_class=ArgumentDefaultsHelpFormatter,
+  )
+
+  parser.add_argument("--uri", "-u", help="server URI", default="server:////")
+  parser.add_argument(
+    "--sizes",
+    "-s",
+    help="collection sizes",
+    type=int,
+    nargs="+",
+    default=[1_000, 5_000, 10_000, 25_000, 50_000],
+  )
+  parser.add_argument("--batch", "-b", help="batch size", type=int, default=100)
+  parser.add_argument(
+    "--drop", "-d", help="drop the collections at the end", action="store_true"
+  )
+
+  args = parser.parse_args()
+
+  # (2) run
+  cli = await client(parse_uri(args.uri))
+  print(f"{'size':>10} " + " ".join(f"{m + ' (s)':>12}" for m in modes))
+
+  for size in args.sizes:
+    coll = await _arrange_coll(cli, size)
+    times = [await _time_read(coll, m, args.batch) for m in modes]
+    print(f"{size:>10} " + " ".join(f"{t:>12.3f}" for t in times))
+
+    if args.drop:
+      await cli.delete_collection(coll.name)
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
@@ -1,20 +1,205 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from chromadb.api.async_api import AsyncServerAPI
+from chromadb.api.async_fastapi import AsyncFastAPI
+from chromadb.config import Settings, System
 from pytest_mock import AsyncMockType, MockerFixture
 
-from chromio.client import client
+from chromio.client import ClientRegistry, admin_client, client
+from chromio.client._registry import _pool, _pool_args, _PooledClient
+from chromio.errors import ChromieInternalError
 from chromio.uri import ChromioUri
 
 
 async def test_server_client(mocker: MockerFixture) -> None:
-  """Check that client() returns a asynchronous client."""
+  """Check that client() returns an asynchronous client, reused for the same URI
+  and API key, with its requests through the pool of the server.
+  """
 
   # (1) arrange
-  AsyncHttpClient = mocker.patch(
-    "chromio.client._client.AsyncHttpClient", new_callable=mocker.AsyncMock
+  registry = ClientRegistry(pool_size=8)
+  mocker.patch("chromio.client._client.registry", registry)
+  create = mocker.patch(
+    "chromio.client._registry._PooledClient.create", new_callable=mocker.AsyncMock
   )
 
   # (2) act
-  out = await client(ChromioUri.server())
+  out = await client(uri := ChromioUri.server(), "key")
+  again = await client(uri, "key")
+  await client(uri, "other")
 
   # (3) assessment
   assert isinstance(out, AsyncMockType)
-  assert AsyncHttpClient.await_count == 1
+  assert again is out
+  assert create.await_count == 2
+
+  hdrs, verify = _pool_args(Settings(chroma_server_headers={"x-chroma-token": "key"}))
+  pool = registry.pool("http://localhost:8000", hdrs, verify=verify)
+  assert len(registry._pools) == 2
+  assert pool.headers["x-chroma-token"] == "key"
+  assert pool.headers["User-Agent"].startswith("Chroma Python Client v")
+  assert pool._transport._pool._max_connections == 8  # type: ignore
+
+  await registry.close()
+  assert pool.is_closed
+  assert registry._pools == {} and registry._clients == {}
+
+
+async def test_server_client_ssl_verify(mocker: MockerFixture) -> None:
+  """Check that client() builds the pool of the server from the client settings,
+  w/o verifying the certificates when chroma_server_ssl_verify is false.
+  """
+
+  # (1) arrange
+  registry = ClientRegistry()
+  mocker.patch("chromio.client._client.registry", registry)
+  mocker.patch(
+    "chromio.client._registry.Settings",
+    side_effect=lambda **kw: Settings(**kw, chroma_server_ssl_verify=False),
+  )
+  mocker.patch(
+    "chromio.client._registry._PooledClient.create", new_callable=mocker.AsyncMock
+  )
+  pool = mocker.spy(registry, "pool")
+
+  # (2) act
+  await client(ChromioUri.server(), "key")
+
+  # (3) assessment
+  pool.assert_called_once()
+  assert pool.call_args.kwargs["verify"] is False
+  assert pool.call_args.args[1]["x-chroma-token"] == "key"
+  assert pool.call_args.args[1]["User-Agent"].startswith("Chroma Python Client v")
+
+  await registry.close()
+
+
+async def test_path_client(tmp_path: Path) -> None:
+  """Check that client() returns an embedded client for the path URIs, reused,
+  with its methods and collections asynchronous.
+  """
+
+  # (1) arrange
+  registry = ClientRegistry()
+  uri = ChromioUri(schema="path", path=str(tmp_path / "db"))
+
+  # (2) act
+  out = await registry.client(uri)
+  coll = await out.get_or_create_collection("test")
+  await coll.add(ids=["1", "2"], embeddings=[[1.0, 0.0], [0.0, 1.0]])
+
+  # (3) assessment
+  assert await registry.client(uri) is out
+  assert coll.name == "test"
+  assert await coll.count() == 2
+  assert [c.name for c in await out.list_collections()] == ["test"]
+  assert (await coll.get(ids=["2"], include=[]))["ids"] == ["2"]
+
+
+async def test_pooled_client(mocker: MockerFixture) -> None:
+  """Check that the clients send their requests through the pool of the registry,
+  instead of the pool shared by the Chroma clients.
+  """
+
+  # (1) arrange
+  registry = ClientRegistry()
+  pool = registry.pool("http://localhost:8000")
+  settings = Settings(
+    chroma_api_impl="chromadb.api.async_fastapi.AsyncFastAPI",
+    chroma_server_host="localhost",
+    chroma_server_http_port=8000,
+    anonymized_telemetry=False,
+  )
+
+  # (2) act
+  token = _pool.set(pool)
+
+  try:
+    out = _PooledClient(settings)
+  finally:
+    _pool.reset(token)
+
+  # (3) assessment
+  assert out._system.instance(AsyncServerAPI)._get_client() is pool  # type: ignore
+  await registry.close()
+
+
+async def test_pooled_client_chroma_layout() -> None:
+  """Check that the Chroma HTTP API keeps its connection pools in the private
+  _clients dict, keyed by the hash of the event loop, as _PooledClient expects.
+  """
+
+  # (1) arrange
+  settings = Settings(
+    chroma_server_host="localhost",
+    chroma_server_http_port=8000,
+    anonymized_telemetry=False,
+  )
+  server = AsyncFastAPI(System(settings))
+
+  # (2) act
+  out = server._get_client()
+
+  # (3) assessment
+  assert isinstance(AsyncFastAPI._clients, dict)
+  assert AsyncFastAPI._clients[hash(asyncio.get_running_loop())] is out
+  await server._cleanup()
+
+
+async def test_pooled_client_unsupported_chroma(mocker: MockerFixture) -> None:
+  """Check that the clients raise a ChromieInternalError when the Chroma HTTP API
+  has no private _clients dict where to install the pool.
+  """
+
+  # (1) arrange
+  # other port than the other tests, the Chroma systems shared by settings
+  mocker.patch.object(AsyncFastAPI, "_clients", None)
+  settings = Settings(
+    chroma_api_impl="chromadb.api.async_fastapi.AsyncFastAPI",
+    chroma_server_host="localhost",
+    chroma_server_http_port=8999,
+    anonymized_telemetry=False,
+  )
+  token = _pool.set(ClientRegistry().pool("http://localhost:8999"))
+
+  # (2) act
+  try:
+    with pytest.raises(ChromieInternalError, match="AsyncFastAPI._clients"):
+      _PooledClient(settings)
+  finally:
+    _pool.reset(token)
+
+
+async def test_pool_http2_wo_h2(mocker: MockerFixture) -> None:
+  """Check that pool() raises an ImportError naming the extra when HTTP/2 is
+  enabled w/o the h2 package.
+  """
+
+  # (1) arrange
+  mocker.patch("httpx.AsyncClient", side_effect=ImportError("h2"))
+
+  # (2) act
+  with pytest.raises(ImportError, match=r"chromie-tool\[http2\]"):
+    ClientRegistry(http2=True).pool("https://github.com")
+
+
+async def test_admin_client(mocker: MockerFixture) -> None:
+  """Check that admin_client() returns an admin client for the server of the URI,
+  authenticated with the API key.
+  """
+
+  # (1) arrange
+  AdminClient = mocker.patch("chromio.client._client.AdminClient")
+
+  # (2) act
+  out = await admin_client(ChromioUri.cloud(), "key")
+
+  # (3) assessment
+  assert out is AdminClient.return_value
+
+  settings = AdminClient.call_args.args[0]
+  assert settings.chroma_server_host == "api.trychroma.com"
+  assert settings.chroma_server_ssl_enabled is True
+  assert settings.chroma_server_headers == {"x-chroma-token": "key"}
@@ -0,0 +1,167 @@
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from chromio.ie import Field
+from chromio.ie.arrow import ArrowFileReader, ArrowFileWriter
+from chromio.ie.consts import EmbeddingEncoding
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+# Header to use in the tests.
+hdr = {"version": "1.0", "metadata": {"coll": {"name": "test"}}}
+
+
+@pytest.fixture(scope="function")
+def records() -> list[dict]:
+  """Records to use in the tests."""
+
+  return [
+    {
+      "id": str(i),
+      "metadata": {"n": i, "even": i % 2 == 0} if i != 3 else None,
+      "document": f"Document {i}.",
+      "embedding": [i / 4, -i / 2],
+    }
+    for i in range(5)
+  ]
+
+
+async def _stream(recs: list[dict], size: int) -> AsyncIterator[list[dict]]:
+  """Returns the given records as an asynchronous stream of batches."""
+
+  for i in range(0, len(recs), size):
+    yield recs[i : i + size]
+
+
+@pytest.mark.parametrize(
+  ("suffix", "encoding", "batch_size", "limit", "e"),
+  (
+    pytest.param(".parquet", "float32", 2, None, [2, 2, 1], id="parquet"),
+    pytest.param(".arrow", "float32", 2, None, [2, 2, 1], id="arrow"),
+    pytest.param(".feather", "float16", 3, None, [3, 2], id="feather, float16"),
+    pytest.param(".parquet", "float32", 2, 3, [2, 1], id="parquet, limit"),
+    pytest.param(".arrow", "float32", 5, 3, [3], id="arrow, limit"),
+  ),
+)
+async def test_write_and_read(
+  tmp_path: Path,
+  records: list[dict],
+  suffix: str,
+  encoding: EmbeddingEncoding,
+  batch_size: int,
+  limit: int | None,
+  e: list[int],
+) -> None:
+  """Check that the records written by ArrowFileWriter are read back by
+  ArrowFileReader, batch by batch.
+  """
+
+  # (1) arrange
+  fields = [Field.id, Field.meta, Field.doc, Field.embedding]
+  file = tmp_path / f"exp{suffix}"
+
+  # (2) act
+  count = await ArrowFileWriter(encoding).write(file, hdr, _stream(records, 2), fields)
+  out = [b async for b in ArrowFileReader().read(file, batch_size, limit)]
+
+  # (3) assessment
+  assert count == len(records)
+  assert [len(batch) for batch in out] == e
+  assert await ArrowFileReader().read_metadata(file) == hdr
+
+  for rec, e_rec in zip([r for batch in out for r in batch], records, strict=False):
+    assert isinstance(emb := rec.pop("embedding"), np.ndarray)
+    assert emb.dtype == np.float32
+    assert emb.tolist() == e_rec["embedding"]
+    assert rec == {k: v for k, v in e_rec.items() if k != "embedding"}
+
+
+@pytest.mark.parametrize("suffix", (".parquet", ".arrow"))
+async def test_write_and_read_without_records(tmp_path: Path, suffix: str) -> None:
+  """Check that an empty export is written and read."""
+
+  # (1) arrange
+  fields = [Field.id, Field.embedding]
+  file = tmp_path / f"exp{suffix}"
+
+  # (2) act
+  count = await ArrowFileWriter().write(file, hdr, _stream([], 2), fields)
+  out = [b async for b in ArrowFileReader().read(file)]
+
+  # (3) assessment
+  assert count == 0
+  assert out == []
+  assert await ArrowFileReader().read_metadata(file) == hdr
+
+  emb = ArrowFileReader._read_schema(file).field("embedding").type
+  assert pa.types.is_fixed_size_list(emb)
+
+
+@pytest.mark.parametrize("suffix", (".parquet", ".arrow"))
+async def test_read_closes_file(
+  mocker: MockerFixture, tmp_path: Path, records: list[dict], suffix: str
+) -> None:
+  """Check that the files are closed once read, also when stopped by the limit."""
+
+  # (1) arrange
+  file = tmp_path / f"exp{suffix}"
+  await ArrowFileWriter().write(file, hdr, _stream(records, 2), [Field.id])
+
+  opened, memory_map, parquet_file = [], pa.memory_map, pq.ParquetFile
+
+  def track(open: Any) -> Any:
+    def tracked(*args, **kwargs) -> Any:
+      opened.append(f := open(*args, **kwargs))
+      return f
+
+    return tracked
+
+  mocker.patch("pyarrow.memory_map", track(memory_map))
+  mocker.patch("pyarrow.parquet.ParquetFile", track(parquet_file))
+
+  # (2) act
+  out = [b async for b in ArrowFileReader().read(file, 2, 1)]
+
+  # (3) assessment
+  assert out == [[{"id": "0"}]]
+  assert len(opened) == 1
+  assert opened[0].closed
+
+
+async def test_write_only_ids(tmp_path: Path, records: list[dict]) -> None:
+  """Check that only the requested fields are written."""
+
+  # (1) arrange
+  file = tmp_path / "exp.parquet"
+
+  # (2) act
+  await ArrowFileWriter().write(file, hdr, _stream(records, 2), [Field.id])
+  out = [b async for b in ArrowFileReader().read(file)]
+
+  # (3) assessment
+  assert out == [[{"id": r["id"]} for r in records]]
+
+
+@pytest.mark.parametrize("fail_at", (0, 1))
+async def test_write_raises_stream_errors(
+  tmp_path: Path, records: list[dict], fail_at: int
+) -> None:
+  """Check that write() closes the file and raises when the stream fails."""
+
+  # (1) arrange
+  async def stream() -> AsyncIterator[list[dict]]:
+    for i in range(2):
+      if i == fail_at:
+        raise ConnectionError("read failed")
+
+      yield records[i : i + 1]
+
+  # (2) act and assessment
+  with pytest.raises(ConnectionError, match="read failed"):
+    await ArrowFileWriter().write(tmp_path / "exp.arrow", hdr, stream(), [Field.id])
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import numpy as np
+
+from chromio.ie.chain import (
+  Chain,
+  ChainLink,
+  content_hash,
+  hashes_path,
+  is_chain,
+  link_path,
+  load_hashes,
+  save_hashes,
+)
+
+
+def test_paths() -> None:
+  """Check that link_path() and hashes_path() derive the paths from the chain
+  file path.
+  """
+
+  # (1) act
+  link, hashes = link_path("dir/out.chain.json", 2), hashes_path("dir/out.chain.json")
+
+  # (2) assessment
+  assert link == Path("dir/out.0002.json")
+  assert hashes == Path("dir/out.hashes.json")
+  assert is_chain("dir/out.chain.json")
+  assert not is_chain("dir/out.manifest.json")
+
+
+async def test_save_and_load(tmp_path: Path) -> None:
+  """Check that a chain saved is loaded back."""
+
+  # (1) arrange
+  chain = Chain(
+    "test",
+    ["id", "document"],
+    [
+      ChainLink("out.0000.json", "full", 3),
+      ChainLink("out.0001.json", "delta", 1, ["2"]),
+    ],
+  )
+
+  # (2) act
+  await chain.save(file := tmp_path / "out.chain.json")
+  out = await Chain.load(file)
+
+  # (3) assessment
+  assert out == chain
+  assert [p.name for p in tmp_path.iterdir()] == ["out.chain.json"]
+
+
+async def test_save_and_load_hashes(tmp_path: Path) -> None:
+  """Check that the hashes saved are loaded back, none if not saved."""
+
+  # (1) arrange
+  file = tmp_path / "out.hashes.json"
+  hashes = {"1": "a1", "2": "b2"}
+
+  # (2) act
+  before = await load_hashes(file)
+  await save_hashes(file, hashes)
+  after = await load_hashes(file)
+
+  # (3) assessment
+  assert before == {}
+  assert after == hashes
+
+
+def test_content_hash() -> None:
+  """Check that content_hash() depends on the content, not on its serialization."""
+
+  # (1) arrange
+  rec = {"id": "1", "document": "a", "metadata": {"x": 1, "y": "z"}, "embedding": [0.5]}
+
+  # (2) act
+  h = content_hash(rec)
+
+  # (3) assessment
+  assert len(h) == 32
+  assert h == content_hash(rec | {"id": "2", "metadata": {"y": "z", "x": 1}})
+  assert h == content_hash(rec | {"embedding": np.array([0.5], dtype=np.float32)})
+  assert h != content_hash(rec | {"document": "b"})
+  assert h != content_hash(rec | {"metadata": {"x": 2, "y": "z"}})
+  assert h != content_hash(rec | {"embedding": [0.25]})
+  assert content_hash({"id": "1"}) != content_hash({"id": "1", "document": ""})
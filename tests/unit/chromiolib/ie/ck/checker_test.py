@@ -1,3 +1,5 @@
+import gzip
+import json
 from pathlib import Path
 
 import pytest
@@ -23,6 +25,22 @@ async def test_check_file_is_ok(data_dir: Path, checker: ExpFileChecker) -> None
   assert out is None
 
 
+async def test_check_compressed_file_is_ok(
+  tmp_path: Path, data_dir: Path, checker: ExpFileChecker
+) -> None:
+  """Check that check() decompresses the gzip files."""
+
+  # (1) arrange
+  with gzip.open(file := tmp_path / "cc-export.json.gz", "wb") as f:
+    f.write((data_dir / "cc-export.json").read_bytes())
+
+  # (2) act
+  out = await checker.check(file)
+
+  # (3) assessment
+  assert out is None
+
+
 async def test_check_raises_validation_error(
   tmp_path: Path, checker: ExpFileChecker
 ) -> None:
@@ -49,6 +67,47 @@ async def test_check_raises_validation_error(
     await checker.check(file_path)
 
 
+@pytest.mark.parametrize(
+  ("version", "encoding", "embedding", "e_msg"),
+  (
+    pytest.param("1.1", "float32", "AAAAPwAAwL8=", None, id="float32"),
+    pytest.param("1.1", "float16", "ADgAvg==", None, id="float16"),
+    pytest.param("1.1", "json", [0.5, -1.5], None, id="json"),
+    pytest.param("1.0", "float32", "AAAAPwAAwL8=", "'1.1' was expected", id="1.0"),
+    pytest.param("1.1", "json", "AAAAPwAAwL8=", "is not of type 'array'", id="string"),
+    pytest.param("1.1", "float32", "AAAAPwA=", "data\\[0\\].embedding", id="length"),
+  ),
+)
+async def test_check_embedding_encodings(
+  tmp_path: Path,
+  checker: ExpFileChecker,
+  version: str,
+  encoding: str,
+  embedding: str | list,
+  e_msg: str | None,
+) -> None:
+  """Check that check() accepts the embeddings in every encoding and rejects these
+  not complying with the file encoding.
+  """
+
+  # (1) arrange
+  c = {
+    "version": version,
+    "metadata": {"coll": {"name": "test"}, "encoding": {"embedding": encoding}},
+    "data": [{"id": "1", "embedding": embedding}, {"id": "2"}],
+  }
+
+  async with open(file_path := tmp_path / "exp.json", "w") as f:
+    await f.write(json.dumps(c))
+
+  # (2) act and assessment
+  if e_msg is None:
+    assert await checker.check(file_path) is None
+  else:
+    with pytest.raises(ValidationError, match=e_msg):
+      await checker.check(file_path)
+
+
 async def test_check_raises_file_not_found_error(
   tmp_path: Path, checker: ExpFileChecker
 ) -> None:
@@ -58,3 +117,27 @@ async def test_check_raises_file_not_found_error(
     FileNotFoundError, match="No such file or directory: 'unknown.json'"
   ):
     await checker.check(Path("unknown.json"))
+
+
+async def test_check_columnar_file(tmp_path: Path, checker: ExpFileChecker) -> None:
+  """Check that check() verifies the header of the columnar files."""
+
+  # (1) arrange
+  pytest.importorskip("pyarrow")
+  from chromio.ie import Field
+  from chromio.ie.arrow import ArrowFileWriter
+
+  async def recs():
+    yield [{"id": "1"}]
+
+  ok, ko = tmp_path / "ok.parquet", tmp_path / "ko.arrow"
+  await ArrowFileWriter().write(
+    ok, {"version": "1.0", "metadata": {"coll": {"name": "test"}}}, recs(), [Field.id]
+  )
+  await ArrowFileWriter().write(ko, {"version": "1.0"}, recs(), [Field.id])
+
+  # (2) act and assessment
+  assert await checker.check(ok) is None
+
+  with pytest.raises(ValidationError, match="'metadata' is a required property"):
+    await checker.check(ko)
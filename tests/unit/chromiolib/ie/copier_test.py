@@ -1,4 +1,6 @@
+from dataclasses import replace
 from math import ceil
+from pathlib import Path
 
 import pytest
 from chromadb.api.models.AsyncCollection import AsyncCollection
@@ -6,6 +8,10 @@ from pytest_mock import AsyncMockType, MockerFixture
 
 from chromio.ie.consts import DEFAULT_FIELDS
 from chromio.ie.cp import CollCopier
+from chromio.ie.cp import copier as copier_mod
+from chromio.ie.cp.copier import cp_journal_path
+from chromio.ie.imp.journal import WriteJournal
+from chromio.ie.limit import AimdLimit
 
 
 @pytest.fixture(scope="module")
@@ -60,6 +66,8 @@ async def test_copy_all(
   assert out.dst_coll == dst_coll.name
   assert out.count == len(cc_records)
   assert out.duration >= 0
+  assert set(out.phases) == {"read", "write"}
+  assert set(out.latency) == {"read", "write"}
 
   assert get.await_args_list == [
     mocker.call(
@@ -70,3 +78,169 @@ async def test_copy_all(
     )
     for i in range(0, ceil(out.count / default_batch_size) + 1)
   ]
+
+
+async def test_copy_resume(
+  mocker: MockerFixture,
+  copier: CollCopier,
+  coll: AsyncMockType,
+  dst_coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict],
+  cc_record_batches: list[list[dict]],
+  default_batch_size: int,
+) -> None:
+  """Check that copy_coll() w/ resume reads from the first record not committed,
+  upserting the rest.
+  """
+
+  # (1) arrange
+  fields = [str(fld) for fld in DEFAULT_FIELDS]
+  await WriteJournal("copy", fields, count=default_batch_size).save(
+    journal := tmp_path / "test-copy.cp.journal"
+  )
+
+  (get := coll.get).side_effect = [
+    {
+      "ids": [r["id"] for r in batch],
+      "metadatas": [r["metadata"] for r in batch],
+      "documents": [r["document"] for r in batch],
+    }
+    for batch in [*cc_record_batches[1:], []]
+  ]
+
+  # (2) act
+  out = await copier.copy_coll(coll, dst_coll, journal=journal, resume=True)
+
+  # (3) assessment
+  assert out.count == len(cc_records) - default_batch_size
+  assert get.await_args_list[0] == mocker.call(
+    include=["metadatas", "documents"],
+    where=None,
+    offset=default_batch_size,
+    limit=2,
+  )
+  dst_coll.add.assert_not_awaited()
+  assert dst_coll.upsert.await_count == 1
+  assert not journal.exists()
+
+
+async def test_copy_with_journal(
+  mocker: MockerFixture,
+  copier: CollCopier,
+  coll: AsyncMockType,
+  dst_coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict],
+) -> None:
+  """Check that copy_coll() w/ journal records the progress and the endpoints,
+  adding the records, and removes the journal once completed.
+  """
+
+  # (1) arrange
+  coll.get.side_effect = [
+    {
+      "ids": [r["id"] for r in cc_records],
+      "metadatas": [r["metadata"] for r in cc_records],
+      "documents": [r["document"] for r in cc_records],
+    },
+    {"ids": [], "metadatas": [], "documents": []},
+  ]
+
+  saved: list[WriteJournal] = []
+
+  async def save(self: WriteJournal, file: Path) -> None:
+    saved.append(replace(self))
+
+  mocker.patch.object(WriteJournal, "save", save)
+
+  # (2) act
+  ends = ("server://a:1/t/db/test", "server://b:1/t/db/copy")
+  out = await copier.copy_coll(
+    coll, dst_coll, journal=(journal := tmp_path / "j"), endpoints=ends
+  )
+
+  # (3) assessment
+  assert out.count == len(cc_records)
+  dst_coll.upsert.assert_not_awaited()
+  assert (saved[-1].count, saved[-1].src, saved[-1].dst) == (len(cc_records), *ends)
+  assert not journal.exists()
+
+
+async def test_copy_resume_after_completed(
+  copier: CollCopier,
+  coll: AsyncMockType,
+  dst_coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict],
+) -> None:
+  """Check that copy_coll() removes the journal of a completed copy, so a later
+  resume into a recreated destination copies every record again.
+  """
+
+  # (1) arrange
+  def pages() -> list[dict]:
+    return [
+      {
+        "ids": [r["id"] for r in cc_records],
+        "metadatas": [r["metadata"] for r in cc_records],
+        "documents": [r["document"] for r in cc_records],
+      },
+      {"ids": [], "metadatas": [], "documents": []},
+    ]
+
+  journal = tmp_path / "test-copy.cp.journal"
+  coll.get.side_effect = pages()
+  await copier.copy_coll(coll, dst_coll, journal=journal)
+  dst_coll.reset_mock()
+
+  # (2) act
+  coll.get.side_effect = pages()
+  out = await copier.copy_coll(coll, dst_coll, journal=journal, resume=True)
+
+  # (3) assessment
+  assert out.count == len(cc_records)
+  ids = [i for c in dst_coll.upsert.await_args_list for i in c.kwargs["ids"]]
+  assert ids == [r["id"] for r in cc_records]
+  assert not journal.exists()
+
+
+def test_cp_journal_path(tmp_path: Path) -> None:
+  """Check that cp_journal_path() names the journals after the copy and the
+  endpoints, these telling apart the copies between collections of the same names.
+  """
+
+  # (1) act
+  out = cp_journal_path(tmp_path, "a-b", ("server://h:1/t/db/a", "server://h:1/t/db/b"))
+  other = cp_journal_path(tmp_path, "a-b", ("server://h:1/t/db/a", "server://h:2/t/db/b"))
+
+  # (2) assessment
+  assert out.parent == tmp_path
+  assert out.name.startswith("a-b.") and out.name.endswith(".cp.journal")
+  assert other != out
+
+
+async def test_copy_own_limits(
+  mocker: MockerFixture,
+  coll: AsyncMockType,
+  dst_coll: AsyncMockType,
+  default_batch_size: int,
+) -> None:
+  """Check that copy_coll() throttles the source and the destination, every one
+  with its own limit like this of the copier.
+  """
+
+  # (1) arrange
+  coll.get.return_value = {"ids": [], "metadatas": [], "documents": []}
+  limit = AimdLimit(2, max_rps=100)
+  copier = CollCopier(batch_size=default_batch_size, fields=DEFAULT_FIELDS, limit=limit)
+  spy = mocker.spy(copier_mod, "throttled")
+
+  # (2) act
+  await copier.copy_coll(coll, dst_coll)
+
+  # (3) assessment
+  (src_limit, dst_limit) = [c.args[1] for c in spy.call_args_list]
+  assert src_limit is limit
+  assert dst_limit is not limit
+  assert (dst_limit.max, dst_limit.max_rps) == (limit.max, limit.max_rps)
@@ -0,0 +1,164 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from chromadb.api import AsyncClientAPI
+from pytest_mock import AsyncMockType, MockerFixture
+
+from chromio.errors import CollAlreadyExistsError
+from chromio.ie.cp import CollCopier, CollCopyRpt, DbCopier, DbRef
+from chromio.ie.cp.copier import cp_journal_path
+from chromio.ie.limit import AimdLimit
+from chromio.uri import ChromioUri
+
+
+def _ref(db: AsyncMockType, name: str, host: str) -> DbRef:
+  """Returns the reference to a database of a server."""
+
+  return DbRef(db, name, f"{host}:8000", ChromioUri.server(host=host, db=name))
+
+
+def _db(mocker: MockerFixture, counts: dict[str, int]) -> AsyncMockType:
+  """Returns a database mock with collections of the given counts."""
+
+  colls = {}
+
+  for name, count in counts.items():
+    coll = mocker.AsyncMock()
+    type(coll).name = mocker.PropertyMock(return_value=name)
+    type(coll).configuration_json = mocker.PropertyMock(return_value={})
+    coll.count.return_value = count
+    colls[name] = coll
+
+  db = mocker.AsyncMock(spec=AsyncClientAPI)
+  db.list_collections.return_value = list(colls.values())
+  db.get_collection.side_effect = lambda name: colls[name]
+  return db
+
+
+@pytest.mark.parametrize(
+  ("workers", "requests", "limit"),
+  (
+    pytest.param(1, None, None, id="sequential"),
+    pytest.param(3, None, None, id="concurrent"),
+    pytest.param(3, 1, None, id="concurrent, one request per server"),
+    pytest.param(3, None, 1, id="concurrent, copier limit per server"),
+  ),
+)
+async def test_copy_dbs(
+  mocker: MockerFixture,
+  tmp_path: Path,
+  workers: int,
+  requests: int | None,
+  limit: int | None,
+) -> None:
+  """Check that copy_dbs() copies the collections of all the databases, the
+  largest first, creating them in the destination, and limits the collections
+  and the requests in flight.
+  """
+
+  # (1) arrange
+  src1, src2 = _db(mocker, {"a": 1, "b": 30}), _db(mocker, {"c": 20})
+  dst = mocker.AsyncMock(spec=AsyncClientAPI)
+  dst.get_collection.side_effect = lambda name: f"dst-{name}"
+
+  def create_coll_with_conf(name, conf) -> str:
+    if name == "a":
+      raise CollAlreadyExistsError(name)
+
+    return f"new-{name}"
+
+  mocker.patch(
+    "chromio.tools.db.DbTool.create_coll_with_conf", side_effect=create_coll_with_conf
+  )
+
+  order, dsts, journals = [], {}, []
+  in_flight, max_in_flight = 0, 0
+  requesting, max_requesting = 0, 0
+
+  async def get(**_) -> dict:
+    nonlocal requesting, max_requesting
+
+    requesting += 1
+    max_requesting = max(max_requesting, requesting)
+    await asyncio.sleep(0.01)
+    requesting -= 1
+    return {"ids": []}
+
+  for coll in [*src1.list_collections.return_value, *src2.list_collections.return_value]:
+    coll.get.side_effect = get
+
+  async def copy_coll(src_coll, dst_coll, *, journal, endpoints, **_) -> CollCopyRpt:
+    nonlocal in_flight, max_in_flight
+
+    order.append(name := src_coll.name)
+    dsts[name] = dst_coll if (requests or limit) is None else dst_coll.coll
+    journals.append((journal, endpoints))
+    in_flight += 1
+    max_in_flight = max(max_in_flight, in_flight)
+    await src_coll.get(ids=[])
+    in_flight -= 1
+
+    return CollCopyRpt(name, await src_coll.count(), 0, name)
+
+  copier = mocker.AsyncMock(spec=CollCopier)
+  copier.copy_coll.side_effect = copy_coll
+  copier.limit = None if limit is None else AimdLimit(limit)
+
+  # (2) act
+  out = await DbCopier(copier, workers, requests).copy_dbs(
+    [
+      (_ref(src1, "one", "src"), _ref(dst, "uno", "dst")),
+      (_ref(src2, "two", "src"), _ref(dst, "dos", "dst")),
+    ],
+    journals=tmp_path,
+  )
+
+  # (3) assessment
+  assert order == ["b", "c", "a"]
+  assert max_in_flight == workers
+  assert max_requesting == (requests or limit or workers)
+  assert dsts == {"a": "dst-a", "b": "new-b", "c": "new-c"}
+
+  def journal(src: str, dst: str, name: str) -> tuple[Path, tuple[str, str]]:
+    ends = (
+      f"server://src:8000/default_tenant/{src}/{name}",
+      f"server://dst:8000/default_tenant/{dst}/{name}",
+    )
+    return cp_journal_path(tmp_path, f"{src}.{name}-{dst}.{name}", ends), ends
+
+  assert journals == [
+    journal("one", "uno", "b"),
+    journal("two", "dos", "c"),
+    journal("one", "uno", "a"),
+  ]
+  assert out.count == 51
+  assert out.batches_failed == 0
+  assert [(r.db, r.coll, r.count) for r in out.colls] == [
+    ("one", "a", 1),
+    ("one", "b", 30),
+    ("two", "c", 20),
+  ]
+
+
+async def test_copy_db(mocker: MockerFixture) -> None:
+  """Check that copy_db() copies the collections of a database, w/o journals."""
+
+  # (1) arrange
+  src, dst = _db(mocker, {"a": 1}), mocker.AsyncMock(spec=AsyncClientAPI)
+  mocker.patch("chromio.tools.db.DbTool.create_coll_with_conf", return_value="new-a")
+
+  copier = mocker.AsyncMock(spec=CollCopier)
+  copier.copy_coll.return_value = CollCopyRpt("a", 1, 0, "a", batches_failed=2)
+  copier.limit = None
+
+  # (2) act
+  out = await DbCopier(copier).copy_db(
+    _ref(src, "one", "localhost"), _ref(dst, "two", "localhost")
+  )
+
+  # (3) assessment
+  assert out.count == 1
+  assert out.batches_failed == 2
+  assert out.colls == [CollCopyRpt("a", 1, 0, "a", batches_failed=2, db="one")]
+  assert copier.copy_coll.await_args.kwargs["journal"] is None
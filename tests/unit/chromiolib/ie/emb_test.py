@@ -0,0 +1,65 @@
+import base64
+
+import numpy as np
+import pytest
+
+from chromio.ie.consts import EmbeddingEncoding
+from chromio.ie.emb import decode, encode
+
+
+@pytest.mark.parametrize(
+  ("encoding", "e_size"),
+  (
+    pytest.param("float32", 16, id="float32"),
+    pytest.param("float16", 8, id="float16"),
+  ),
+)
+def test_encode_and_decode_binary(encoding: EmbeddingEncoding, e_size: int) -> None:
+  """Check that the binary encodings store little-endian arrays in base64 and that
+  decode() returns the original values.
+  """
+
+  # (1) arrange
+  embedding = [0.5, -1.25, 2.0, 1024.0]
+
+  # (2) act
+  out = encode(np.array(embedding, dtype=np.float32), encoding)
+
+  # (3) assessment
+  assert isinstance(out, str)
+  assert len(buf := base64.b64decode(out)) == e_size
+  assert buf[: e_size // 4] == np.array([0.5], dtype=f"<f{e_size // 4}").tobytes()
+  assert isinstance(dec := decode(out, encoding), np.ndarray)
+  assert dec.dtype == np.float32
+  assert dec.tolist() == embedding
+
+
+def test_encode_and_decode_json() -> None:
+  """Check that the json encoding keeps the embeddings as lists of floats."""
+
+  # (1) act
+  out = encode(np.array([0.5, 1.5], dtype=np.float32), "json")
+
+  # (2) assessment
+  assert out == [0.5, 1.5]
+  assert decode(out, "json") == out
+  assert decode(out, "float32") == out
+
+
+@pytest.mark.parametrize(
+  ("value", "encoding", "e_msg"),
+  (
+    pytest.param("AAAAPw==", "json", "Unexpected encoded embedding", id="json"),
+    pytest.param("AAA*Pw==", "float32", "Invalid float32 embedding", id="base64"),
+    pytest.param("AAAAPwA=", "float32", "Invalid float32 embedding", id="length"),
+  ),
+)
+def test_decode_raises_value_error(
+  value: str, encoding: EmbeddingEncoding, e_msg: str
+) -> None:
+  """Check that decode() raises ValueError when the value doesn't comply with the
+  encoding.
+  """
+
+  with pytest.raises(ValueError, match=e_msg):
+    decode(value, encoding)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from chromadb.api import AsyncClientAPI
+from pytest_mock import MockerFixture
+
+from chromio.ie.exp import CollExporter, CollExportRpt, DbExporter
+from chromio.ie.manifest import DbManifest, DbManifestColl
+
+
+@pytest.mark.parametrize(
+  ("workers", "e_order"),
+  (
+    pytest.param(1, ["b", "c", "a"], id="sequential, largest first"),
+    pytest.param(3, ["b", "c", "a"], id="concurrent"),
+  ),
+)
+async def test_export_db(
+  mocker: MockerFixture, tmp_path: Path, workers: int, e_order: list[str]
+) -> None:
+  """Check that export_db() exports every collection to its file, the largest
+  first, and the manifest listing them.
+  """
+
+  # (1) arrange
+  counts = {"a": 1, "b": 30, "c": 20}
+  colls = []
+
+  for name, count in counts.items():
+    coll = mocker.AsyncMock()
+    type(coll).name = mocker.PropertyMock(return_value=name)
+    coll.count.return_value = count
+    colls.append(coll)
+
+  db = mocker.AsyncMock(spec=AsyncClientAPI)
+  db.list_collections.return_value = colls
+  db.get_collection.side_effect = lambda name: colls[list(counts).index(name)]
+
+  order, in_flight, max_in_flight = [], 0, 0
+
+  async def export_coll(coll, file, **_) -> CollExportRpt:
+    nonlocal in_flight, max_in_flight
+
+    order.append(coll.name)
+    in_flight += 1
+    max_in_flight = max(max_in_flight, in_flight)
+    await asyncio.sleep(0.01)
+    in_flight -= 1
+
+    return CollExportRpt(coll.name, counts[coll.name], 0, str(file))
+
+  exporter = mocker.AsyncMock(spec=CollExporter)
+  exporter.export_coll.side_effect = export_coll
+
+  # (2) act
+  out = await DbExporter(exporter, workers).export_db(db, tmp_path / "out", v="1.1.0")
+
+  # (3) assessment
+  assert order == e_order
+  assert max_in_flight == workers
+  assert out.count == 51
+  assert out.file_path == str(tmp_path / "out" / "db.manifest.json")
+  assert [(r.coll, r.file_path) for r in out.colls] == [
+    (name, str(tmp_path / "out" / f"{name}.json")) for name in ["a", "b", "c"]
+  ]
+
+  manifest = await DbManifest.load(Path(out.file_path))
+  assert manifest.colls == [
+    DbManifestColl(name, f"{name}.json", count) for name, count in counts.items()
+  ]
+  assert manifest.count == 51
+  assert json.loads(Path(out.file_path).read_text())["version"] == "1.0"
+
+
+async def test_export_db_failed(mocker: MockerFixture, tmp_path: Path) -> None:
+  """Check that export_db() raises the error of a collection failed, cancelling
+  the exports in progress, w/o manifest.
+  """
+
+  # (1) arrange
+  colls = []
+
+  for name, count in {"a": 1, "b": 30}.items():
+    coll = mocker.AsyncMock()
+    type(coll).name = mocker.PropertyMock(return_value=name)
+    coll.count.return_value = count
+    colls.append(coll)
+
+  db = mocker.AsyncMock(spec=AsyncClientAPI)
+  db.list_collections.return_value = colls
+  db.get_collection.side_effect = lambda name: colls[["a", "b"].index(name)]
+  cancelled = asyncio.Event()
+
+  async def export_coll(coll, file, **_) -> CollExportRpt:
+    # the largest collection waits, the other one fails
+    if coll.name == "a":
+      raise ValueError("bad collection")
+
+    try:
+      await asyncio.sleep(10)
+    except asyncio.CancelledError:
+      cancelled.set()
+      raise
+
+    return CollExportRpt(coll.name, 30, 0, str(file))
+
+  exporter = mocker.AsyncMock(spec=CollExporter)
+  exporter.export_coll.side_effect = export_coll
+
+  # (2) act
+  with pytest.raises(ValueError, match="bad collection"):
+    await DbExporter(exporter, 2).export_db(
+      db, out := tmp_path / "out", v="1.1.0", ext=".parquet"
+    )
+
+  # (3) assessment
+  assert cancelled.is_set()
+  assert not (out / "db.manifest.json").exists()
+  assert exporter.export_coll.await_args_list[0].args[1] == out / "b.parquet"
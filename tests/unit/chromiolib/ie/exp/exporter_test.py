@@ -1,3 +1,4 @@
+import json
 from math import ceil
 from pathlib import Path
 
@@ -5,8 +6,15 @@ import pytest
 from aiofiles import open
 from pytest_mock import AsyncMockType, MockerFixture
 
+from chromio.ie import Field
+from chromio.ie.chain import Chain, ChainLink, load_hashes
 from chromio.ie.consts import DEFAULT_FIELDS
 from chromio.ie.exp import CollExporter
+from chromio.ie.exp.reader import CollReader
+from chromio.ie.exp.store import StoreReader
+from chromio.ie.imp.reader import ExpFileReader
+from chromio.ie.manifest import Manifest
+from chromio.ie.perf import Perf
 
 
 @pytest.fixture(scope="module")
@@ -53,6 +61,10 @@ async def test_export_all(
   assert out.count == len(cc_records)
   assert out.file_path == str(file_path)
   assert out.duration >= 0
+  assert set(out.phases) == {"read", "encode", "write"}
+  assert out.bytes > 0
+  assert set(out.latency) == {"read"}
+  assert out.peak_rss > 0
 
   assert get.await_args_list == [
     mocker.call(
@@ -66,3 +78,397 @@ async def test_export_all(
 
   async with open(file_path, "r") as file:
     assert await file.read() == cc_export
+
+
+async def test_export_binary_embeddings(coll: AsyncMockType, tmp_path: Path) -> None:
+  """Check that export_coll() w/ a binary encoding writes the embeddings in base64,
+  declaring the encoding in the file.
+  """
+
+  # (1) arrange
+  fields = [Field.id, Field.doc, Field.embedding]
+  exporter = CollExporter(batch_size=2, fields=fields, encoding="float32")
+  coll.get.side_effect = [
+    {"ids": ["1", "2"], "documents": ["a", "b"], "embeddings": [[0.5, -1.5], [2, 4]]},
+    {"ids": [], "documents": [], "embeddings": []},
+  ]
+
+  # (2) act
+  await exporter.export_coll(coll, file_path := tmp_path / "test.json", v="1.1.0")
+
+  # (3) assessment
+  async with open(file_path, "r") as file:
+    c = json.loads(await file.read())
+
+  assert c["version"] == "1.1"
+  assert c["metadata"]["encoding"] == {"embedding": "float32"}
+  assert c["data"][0] == {"id": "1", "document": "a", "embedding": "AAAAPwAAwL8="}
+
+  out = [batch async for batch in ExpFileReader().read(file_path)]
+  assert [r["embedding"] for r in out[0]] == [[0.5, -1.5], [2.0, 4.0]]
+
+
+@pytest.mark.parametrize("suffix", (".parquet", ".arrow"))
+async def test_export_columnar(coll: AsyncMockType, tmp_path: Path, suffix: str) -> None:
+  """Check that export_coll() writes a columnar file when its extension is of
+  Parquet or Arrow IPC.
+  """
+
+  # (1) arrange
+  pytest.importorskip("pyarrow")
+  from chromio.ie.arrow import ArrowFileReader
+
+  fields = [Field.id, Field.meta, Field.embedding]
+  exporter = CollExporter(batch_size=2, fields=fields)
+  coll.get.side_effect = [
+    {"ids": ["1", "2"], "metadatas": [{"x": 1}, None], "embeddings": [[0.5], [2]]},
+    {"ids": [], "metadatas": [], "embeddings": []},
+  ]
+
+  # (2) act
+  out = await exporter.export_coll(coll, file := tmp_path / f"test{suffix}", v="1.1.0")
+
+  # (3) assessment
+  assert out.count == 2
+
+  hdr = await (reader := ArrowFileReader()).read_metadata(file)
+  assert hdr["metadata"]["chroma"] == {"version": "1.1.0"}
+  assert hdr["metadata"]["coll"]["name"] == coll.name
+
+  recs = [r async for batch in reader.read(file) for r in batch]
+  assert [(r["id"], r["metadata"], r["embedding"].tolist()) for r in recs] == [
+    ("1", {"x": 1}, [0.5]),
+    ("2", None, [2.0]),
+  ]
+
+
+@pytest.mark.parametrize("suffix", (".json.gz", ".json.zst"))
+async def test_export_compressed(
+  exporter: CollExporter,
+  coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict],
+  cc_record_batches: list[dict],
+  suffix: str,
+) -> None:
+  """Check that export_coll() compresses the file attending to its extension, this
+  being read back by ExpFileReader.
+  """
+
+  # (1) arrange
+  if suffix.endswith(".zst"):
+    pytest.importorskip("zstandard")
+
+  coll.get.side_effect = [
+    {
+      "ids": [r["id"] for r in batch],
+      "metadatas": [r["metadata"] for r in batch],
+      "documents": [r["document"] for r in batch],
+    }
+    for batch in cc_record_batches
+  ] + [{"ids": [], "metadatas": [], "documents": []}]
+
+  # (2) act
+  await exporter.export_coll(coll, file := tmp_path / f"test{suffix}", v="1.1.0")
+
+  # (3) assessment
+  with file.open("rb") as f:
+    assert f.read(2) in (b"\x1f\x8b", b"\x28\xb5")  # gzip and zstd magic numbers
+
+  out = [r async for batch in ExpFileReader().read(file) for r in batch]
+  assert out == cc_records
+
+
+@pytest.mark.parametrize(
+  ("shards", "limit", "metafilter", "e_counts"),
+  (
+    pytest.param(2, None, None, [3, 2], id="2 shards"),
+    pytest.param(3, 4, None, [2, 2], id="limit"),
+    pytest.param(2, None, {"x": 1}, [2, 2], id="metafilter"),
+    pytest.param(4, 0, None, [0], id="empty"),
+  ),
+)
+async def test_export_shards(
+  coll: AsyncMockType,
+  tmp_path: Path,
+  shards: int,
+  limit: int | None,
+  metafilter: dict | None,
+  e_counts: list[int],
+) -> None:
+  """Check that export_coll_shards() exports disjoint windows to part files,
+  listed in a manifest.
+  """
+
+  # (1) arrange
+  ids = [str(i) for i in range(5 if metafilter is None else 4)]
+  exporter = CollExporter(batch_size=2, fields=DEFAULT_FIELDS)
+
+  async def get(*, include, where=None, offset=0, limit=None) -> dict:
+    page = ids[offset:] if limit is None else ids[offset : offset + limit]
+    return {"ids": page, "metadatas": [{} for _ in page], "documents": page}
+
+  coll.count.return_value = 5
+  coll.get.side_effect = get
+
+  # (2) act
+  out = await exporter.export_coll_shards(
+    coll,
+    tmp_path / "out.json",
+    shards=shards,
+    v="1.1.0",
+    limit=limit,
+    metafilter=metafilter,
+  )
+
+  # (3) assessment
+  assert out.count == sum(e_counts)
+  assert out.file_path == str(tmp_path / "out.manifest.json")
+
+  manifest = await Manifest.load(Path(out.file_path))
+  assert [p.count for p in manifest.parts] == e_counts
+  assert [p.file for p in manifest.parts] == [
+    f"out.part-{i:04d}.json" for i in range(len(e_counts))
+  ]
+
+  recs = [
+    r
+    for p in manifest.parts
+    async for batch in ExpFileReader().read(tmp_path / p.file)
+    for r in batch
+  ]
+  assert [r["id"] for r in recs] == ids[: sum(e_counts)]
+
+
+async def test_export_resume(
+  mocker: MockerFixture,
+  exporter: CollExporter,
+  coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict],
+  cc_export: str,
+  cc_record_batches: list[list[dict]],
+  default_batch_size: int,
+) -> None:
+  """Check that export_coll() w/ resume continues an interrupted export from its
+  last batch committed, removing the journal and the partial file when done.
+  """
+
+  # (1) arrange
+  def res(batch: list[dict]) -> dict:
+    return {
+      "ids": [r["id"] for r in batch],
+      "metadatas": [r["metadata"] for r in batch],
+      "documents": [r["document"] for r in batch],
+    }
+
+  file_path = tmp_path / "test.json"
+  coll.get.side_effect = [res(cc_record_batches[0]), RuntimeError("interrupted")]
+
+  with pytest.raises(RuntimeError, match="interrupted"):
+    await exporter.export_coll(coll, file_path, v="1.1.0")
+
+  # some garbage written after the last commit, as when killed while writing
+  async with open(tmp_path / "test.json.partial", "a") as file:
+    await file.write(',\n    {"id": ')
+
+  (get := coll.get).reset_mock(side_effect=True)
+  get.side_effect = [res(batch) for batch in cc_record_batches[1:]] + [res([])]
+
+  # (2) act
+  out = await exporter.export_coll(coll, file_path, v="1.1.0", resume=True)
+
+  # (3) assessment
+  assert out.count == len(cc_records)
+  assert get.await_args_list[0] == mocker.call(
+    include=["metadatas", "documents"],
+    where=None,
+    offset=default_batch_size,
+    limit=2,
+  )
+
+  async with open(file_path, "r") as file:
+    assert await file.read() == cc_export
+
+  assert sorted(p.name for p in tmp_path.iterdir()) == ["test.json"]
+
+
+async def test_export_resume_wo_journal(
+  exporter: CollExporter, coll: AsyncMockType, tmp_path: Path
+) -> None:
+  """Check that export_coll() w/ resume and w/o journal exports from the start."""
+
+  # (1) arrange
+  coll.get.side_effect = [
+    {"ids": ["1"], "metadatas": [None], "documents": ["a"]},
+    {"ids": [], "metadatas": [], "documents": []},
+  ]
+
+  # (2) act
+  out = await exporter.export_coll(coll, tmp_path / "test.json", v="1.1.0", resume=True)
+
+  # (3) assessment
+  assert out.count == 1
+
+
+async def test_export_resume_wo_partial(
+  exporter: CollExporter, coll: AsyncMockType, tmp_path: Path
+) -> None:
+  """Check that export_coll() w/ resume exports from the start when the journal has
+  a batch committed but the partial file is gone.
+  """
+
+  # (1) arrange
+  (tmp_path / "test.json.journal").write_text(
+    json.dumps(
+      {
+        "coll": coll.name,
+        "limit": None,
+        "metafilter": None,
+        "fields": ["ids", "metadatas", "documents"],
+        "count": 10,
+        "bytes": 1024,
+      }
+    )
+  )
+
+  coll.get.side_effect = [
+    {"ids": ["1"], "metadatas": [None], "documents": ["a"]},
+    {"ids": [], "metadatas": [], "documents": []},
+  ]
+
+  # (2) act
+  out = await exporter.export_coll(coll, tmp_path / "test.json", v="1.1.0", resume=True)
+
+  # (3) assessment
+  assert out.count == 1
+  assert coll.get.await_args_list[0].kwargs["offset"] == 0
+  assert json.loads((tmp_path / "test.json").read_text())["data"] == [
+    {"id": "1", "metadata": None, "document": "a"}
+  ]
+
+
+@pytest.mark.parametrize(
+  ("file_name", "journal", "e"),
+  (
+    pytest.param("test.json.gz", None, "Only the uncompressed", id="compressed"),
+    pytest.param("test.parquet", None, "Only the uncompressed", id="columnar"),
+    pytest.param(
+      "test.json",
+      {"coll": "other", "limit": None, "metafilter": None, "fields": ["id"]},
+      "is of other collection",
+      id="other collection",
+    ),
+    pytest.param(
+      "test.json",
+      {
+        "coll": "test",
+        "limit": None,
+        "metafilter": None,
+        "fields": ["ids", "metadatas", "documents"],
+        "encoding": "float16",
+      },
+      "is of other collection",
+      id="other encoding",
+    ),
+  ),
+)
+async def test_export_resume_error(
+  exporter: CollExporter,
+  coll: AsyncMockType,
+  tmp_path: Path,
+  file_name: str,
+  journal: dict | None,
+  e: str,
+) -> None:
+  """Check that export_coll() w/ resume raises when the export can't be resumed."""
+
+  # (1) arrange
+  if journal is not None:
+    (tmp_path / f"{file_name}.journal").write_text(json.dumps(journal))
+
+  # (2) act and assessment
+  with pytest.raises(ValueError, match=e):
+    await exporter.export_coll(coll, tmp_path / file_name, v="1.1.0", resume=True)
+
+
+async def test_export_incremental(
+  exporter: CollExporter, coll: AsyncMockType, tmp_path: Path
+) -> None:
+  """Check that export_coll_incremental() exports all the records the first time
+  and, the next ones, only these added or changed, recording the ids deleted.
+  """
+
+  # (1) arrange
+  def res(docs: dict[str, str]) -> list[dict]:
+    ids = list(docs)
+    return [
+      {"ids": ids, "metadatas": [None] * len(ids), "documents": list(docs.values())},
+      {"ids": [], "metadatas": [], "documents": []},
+    ]
+
+  file = tmp_path / "out.chain.json"
+  coll.get.side_effect = (
+    res({"1": "a", "2": "b", "3": "c"})
+    + res({"1": "a", "3": "C", "4": "d"})
+    + res({"1": "a", "3": "C", "4": "d"})
+  )
+
+  # (2) act
+  full = await exporter.export_coll_incremental(coll, file, v="1.1.0")
+  delta = await exporter.export_coll_incremental(coll, file, v="1.1.0")
+  same = await exporter.export_coll_incremental(coll, file, v="1.1.0")
+
+  # (3) assessment
+  assert (full.count, full.file_path) == (3, str(tmp_path / "out.0000.json"))
+  assert (delta.count, delta.file_path) == (2, str(tmp_path / "out.0001.json"))
+  assert same.count == 0
+
+  chain = await Chain.load(file)
+  assert chain.links == [
+    ChainLink("out.0000.json", "full", 3),
+    ChainLink("out.0001.json", "delta", 2, ["2"]),
+    ChainLink("out.0002.json", "delta", 0),
+  ]
+
+  out = [r async for b in ExpFileReader().read(tmp_path / "out.0001.json") for r in b]
+  assert [(r["id"], r["document"]) for r in out] == [("3", "C"), ("4", "d")]
+  assert sorted(await load_hashes(tmp_path / "out.hashes.json")) == ["1", "3", "4"]
+
+
+async def test_export_incremental_other_coll(
+  exporter: CollExporter, coll: AsyncMockType, tmp_path: Path
+) -> None:
+  """Check that export_coll_incremental() raises when the chain is of other
+  collection.
+  """
+
+  # (1) arrange
+  await Chain("other", ["id"]).save(file := tmp_path / "out.chain.json")
+
+  # (2) act and assessment
+  with pytest.raises(ValueError, match="is of other collection or fields"):
+    await exporter.export_coll_incremental(coll, file, v="1.1.0")
+
+
+@pytest.mark.parametrize(
+  ("store", "metafilter", "e_reader"),
+  (
+    pytest.param(Path("db"), None, StoreReader, id="store"),
+    pytest.param(Path("db"), {"a": 1}, CollReader, id="store w/ metafilter"),
+    pytest.param(None, None, CollReader, id="api"),
+  ),
+)
+def test_reader(store: Path | None, metafilter: dict | None, e_reader: type) -> None:
+  """Check that the store is read straight from its files, except with a metadata
+  filter.
+  """
+
+  # (1) arrange
+  exporter = CollExporter(batch_size=100, fields=DEFAULT_FIELDS, store=store)
+
+  # (2) act
+  out = exporter._reader(metafilter, Perf())
+
+  # (3) assessment
+  assert isinstance(out, e_reader)
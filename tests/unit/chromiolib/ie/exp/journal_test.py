@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from chromio.ie.exp.journal import ExpJournal, journal_path, partial_path
+
+
+async def test_save_and_load(tmp_path: Path) -> None:
+  """Check that a journal saved is loaded back, replacing the previous one."""
+
+  # (1) arrange
+  jnl = ExpJournal("test", 10, {"x": 1}, ["id", "metadata"])
+  file = tmp_path / "out.json.journal"
+
+  # (2) act
+  await jnl.save(file)
+  jnl.count, jnl.bytes = 4, 128
+  await jnl.save(file)
+  out = await ExpJournal.load(file)
+
+  # (3) assessment
+  assert out == jnl
+  assert [p.name for p in tmp_path.iterdir()] == ["out.json.journal"]
+
+
+async def test_load_not_found(tmp_path: Path) -> None:
+  """Check that load() returns None when the journal doesn't exist."""
+
+  assert await ExpJournal.load(tmp_path / "out.json.journal") is None
+
+
+def test_matches() -> None:
+  """Check that matches() compares the collection and the arguments, not the
+  progress.
+  """
+
+  # (1) arrange
+  jnl = ExpJournal("test", None, None, ["id"], count=2, bytes=64)
+
+  # (2) act and assessment
+  assert jnl.matches(ExpJournal("test", None, None, ["id"]))
+  assert not jnl.matches(ExpJournal("test", 10, None, ["id"]))
+  assert not jnl.matches(ExpJournal("other", None, None, ["id"]))
+  assert not jnl.matches(ExpJournal("test", None, None, ["id"], encoding="float16"))
+  assert not jnl.matches(ExpJournal("test", None, None, ["id"], paging="id"))
+  assert not jnl.matches(ExpJournal("test", None, None, ["id"], store="db"))
+
+
+def test_paths() -> None:
+  """Check the journal and partial paths of an export file."""
+
+  assert journal_path("out.json") == Path("out.json.journal")
+  assert partial_path(Path("dir/out.json")) == Path("dir/out.json.partial")
@@ -1,8 +1,14 @@
+import asyncio
+from contextlib import aclosing
+from typing import Any
+
+import numpy as np
 import pytest
 from pytest import FixtureRequest
-from pytest_mock import AsyncMockType
+from pytest_mock import AsyncMockType, MockerFixture
 
 from chromio.ie import Field
+from chromio.ie.consts import Paging
 from chromio.ie.exp.reader import CollReader
 
 
@@ -126,3 +132,294 @@ async def test_read_only_id(coll: AsyncMockType, reader: CollReader) -> None:
       assert "metadata" not in rec
       assert "document" not in rec
       assert "embedding" not in rec
+
+
+async def test_read_embeddings(coll: AsyncMockType, reader: CollReader) -> None:
+  """Check that read() returns the embeddings as lists of floats when requested."""
+
+  # (1) arrange
+  fields = [Field.id, Field.doc, Field.embedding]
+  (get := coll.get).side_effect = [
+    {
+      "ids": ["1", "2"],
+      "documents": ["one", "two"],
+      "embeddings": np.array([[0.5, 0.25], [1.0, 2.0]], dtype=np.float32),
+    },
+    {"ids": ["3"], "documents": ["three"], "embeddings": [[3.0, 4.0]]},
+    {"ids": [], "documents": [], "embeddings": []},
+  ]
+
+  # (2) act
+  out = [batch async for batch in reader.read(coll, fields, batch_size=2)]
+
+  # (3) assessment
+  assert get.await_args_list[0].kwargs["include"] == ["documents", "embeddings"]
+  assert out == [
+    [
+      {"id": "1", "document": "one", "embedding": [0.5, 0.25]},
+      {"id": "2", "document": "two", "embedding": [1.0, 2.0]},
+    ],
+    [{"id": "3", "document": "three", "embedding": [3.0, 4.0]}],
+  ]
+  assert type(out[0][0]["embedding"][0]) is float
+
+
+@pytest.mark.parametrize(
+  ("count", "limit", "id_page_size", "e_batches", "e_enums"),
+  (
+    pytest.param(5, None, 2, [2, 2, 1], 3, id="all, last id page short"),
+    pytest.param(4, None, 2, [2, 2], 3, id="all, last id page empty"),
+    pytest.param(5, 3, 2, [2, 1], 2, id="limit"),
+    pytest.param(5, 4, 2, [2, 2], 2, id="limit, full id pages"),
+  ),
+)
+async def test_read_by_ids(
+  mocker: MockerFixture,
+  coll: AsyncMockType,
+  count: int,
+  limit: int | None,
+  id_page_size: int,
+  e_batches: list[int],
+  e_enums: int,
+) -> None:
+  """Check that read() w/ ids paging enumerates the ids and, then, reads the records
+  by id.
+  """
+
+  # (1) arrange
+  fields = [Field.id, Field.meta, Field.doc]
+  reader = CollReader(paging="ids", id_page_size=id_page_size)
+  ids = [str(i) for i in range(count)]
+
+  def get(*, include, ids=None, where=None, offset=0, limit=0) -> dict:
+    if ids is None:  # enumeration
+      return {"ids": all_ids[offset : offset + limit]}
+
+    return {
+      "ids": ids,
+      "metadatas": [{"x": id} for id in ids],
+      "documents": [f"doc {id}" for id in ids],
+    }
+
+  all_ids = ids
+  coll.get.side_effect = get
+
+  # (2) act
+  out = [batch async for batch in reader.read(coll, fields, batch_size=2, limit=limit)]
+
+  # (3) assessment
+  assert [len(batch) for batch in out] == e_batches
+  assert [r["id"] for batch in out for r in batch] == ids[: sum(e_batches)]
+  assert out[0][0] == {"id": "0", "metadata": {"x": "0"}, "document": "doc 0"}
+
+  enums = [c for c in coll.get.await_args_list if c.kwargs["include"] == []]
+  assert len(enums) == e_enums
+  assert enums[0] == mocker.call(
+    include=[], where=None, offset=0, limit=min(id_page_size, limit or id_page_size)
+  )
+
+
+async def test_read_by_ids_deleted(coll: AsyncMockType) -> None:
+  """Check that read() w/ ids paging goes on after a page whose records were all
+  deleted since their ids were enumerated.
+  """
+
+  # (1) arrange
+  reader = CollReader(paging="ids", id_page_size=100, prefetch=2)
+  all_ids, deleted = [str(i) for i in range(6)], {"2", "3"}
+
+  async def get(*, include, ids=None, where=None, offset=0, limit=0) -> dict:
+    if ids is None:  # enumeration
+      return {"ids": all_ids[offset : offset + limit]}
+
+    ids = [id for id in ids if id not in deleted]
+    return {"ids": ids, "metadatas": [{} for _ in ids], "documents": ids}
+
+  coll.get.side_effect = get
+
+  # (2) act
+  out = [b async for b in reader.read(coll, batch_size=2)]
+
+  # (3) assessment
+  assert [[r["id"] for r in batch] for batch in out] == [["0", "1"], ["4", "5"]]
+
+
+@pytest.mark.parametrize("paging", ("offset", "ids"))
+async def test_read_window(coll: AsyncMockType, paging: Paging) -> None:
+  """Check that read() w/ offset returns the records of the window only."""
+
+  # (1) arrange
+  reader = CollReader(paging, id_page_size=2)
+  all_ids = [str(i) for i in range(9)]
+
+  async def get(*, include, ids=None, where=None, offset=0, limit=0) -> dict:
+    ids = ids if ids is not None else all_ids[offset : offset + limit]
+    return {"ids": ids, "metadatas": [{} for _ in ids], "documents": ids}
+
+  coll.get.side_effect = get
+
+  # (2) act
+  out = [b async for b in reader.read(coll, batch_size=2, limit=5, offset=3)]
+
+  # (3) assessment
+  assert [r["id"] for batch in out for r in batch] == all_ids[3:8]
+
+
+@pytest.mark.parametrize(("limit", "e"), ((None, 9), (5, 5)))
+async def test_count(coll: AsyncMockType, limit: int | None, e: int) -> None:
+  """Check that count() counts the records matching a filter page by page, up to the
+  limit, no request returning more ids than the page size.
+  """
+
+  # (1) arrange
+  reader = CollReader(id_page_size=2)
+  all_ids = [str(i) for i in range(9)]
+
+  async def get(*, include, where, offset, limit) -> dict:
+    return {"ids": all_ids[offset : offset + limit]}
+
+  coll.get.side_effect = get
+
+  # (2) act
+  out = await reader.count(coll, {"x": 1}, limit)
+
+  # (3) assessment
+  assert out == e
+  assert all(c.kwargs["limit"] <= 2 for c in coll.get.await_args_list)
+  assert all(c.kwargs["where"] == {"x": 1} for c in coll.get.await_args_list)
+
+
+@pytest.mark.parametrize(
+  ("paging", "prefetch"),
+  (
+    pytest.param("offset", 0, id="offset, no prefetch"),
+    pytest.param("offset", 3, id="offset, prefetch"),
+    pytest.param("ids", 3, id="ids, prefetch"),
+  ),
+)
+async def test_read_with_prefetch(
+  coll: AsyncMockType, paging: Paging, prefetch: int
+) -> None:
+  """Check that read() keeps up to prefetch pages in flight while a batch is
+  processed, returning the batches in order.
+  """
+
+  # (1) arrange
+  reader = CollReader(paging, id_page_size=100, prefetch=prefetch)
+  all_ids = [str(i) for i in range(9)]
+  inflight, max_inflight = 0, 0
+
+  async def get(*, include, ids=None, where=None, offset=0, limit=0) -> dict:
+    nonlocal inflight, max_inflight
+
+    if ids is None and include == []:  # enumeration
+      return {"ids": all_ids[offset : offset + limit]}
+
+    inflight += 1
+    max_inflight = max(max_inflight, inflight)
+    await asyncio.sleep(0.01)
+    inflight -= 1
+
+    ids = ids if ids is not None else all_ids[offset : offset + limit]
+    return {"ids": ids, "metadatas": [{} for _ in ids], "documents": ids}
+
+  coll.get.side_effect = get
+
+  # (2) act
+  out = []
+
+  async for batch in reader.read(coll, batch_size=2):
+    out.append(batch)
+    await asyncio.sleep(0.02)  # processing time
+
+  # (3) assessment
+  assert [r["id"] for batch in out for r in batch] == all_ids
+  assert max_inflight == max(prefetch, 1)
+
+
+async def test_read_cancels_pending_pages(coll: AsyncMockType) -> None:
+  """Check that read() cancels the pages read ahead when the consumer stops, these
+  finished once closed.
+  """
+
+  # (1) arrange
+  reader = CollReader(prefetch=4)
+  cancelled = 0
+
+  async def get(*, include, where=None, offset=0, limit=0) -> dict:
+    nonlocal cancelled
+
+    try:
+      await asyncio.sleep(0 if offset == 0 else 10)
+    except asyncio.CancelledError:
+      cancelled += 1
+      raise
+
+    return {"ids": ["1", "2"], "metadatas": [{}, {}], "documents": ["a", "b"]}
+
+  coll.get.side_effect = get
+
+  # (2) act
+  async with aclosing(reader.read(coll, batch_size=2)) as batches:
+    out = await anext(batches)
+    await asyncio.sleep(0.01)  # pages read ahead started
+
+  # (3) assessment
+  assert len(out) == 2
+  assert cancelled == 4
+
+
+async def test_fetch_closes_requests() -> None:
+  """Check that _fetch() closes the page requests when the consumer stops."""
+
+  # (1) arrange
+  closed = False
+
+  async def page() -> dict:
+    return {"ids": ["1"]}
+
+  async def reqs() -> Any:
+    nonlocal closed
+
+    try:
+      while True:
+        yield page()
+    finally:
+      closed = True
+
+  # (2) act
+  async with aclosing(CollReader(prefetch=2)._fetch(reqs())) as pages:
+    out = await anext(pages)
+
+  # (3) assessment
+  assert out == {"ids": ["1"]}
+  assert closed
+
+
+@pytest.mark.parametrize("paging", ("offset", "ids"))
+async def test_read_batch_bytes(coll: AsyncMockType, paging: Paging) -> None:
+  """Check that read() sizes the pages after the first one with the byte budget,
+  estimated from the records read.
+  """
+
+  # (1) arrange
+  recs = [{"id": f"{i:02d}", "document": "x" * 100} for i in range(20)]
+
+  def get(ids=None, include=None, where=None, offset=0, limit=0) -> dict:
+    sel = [r for r in recs if r["id"] in ids] if ids else recs[offset : offset + limit]
+    return {"ids": [r["id"] for r in sel], "documents": [r["document"] for r in sel]}
+
+  coll.get.side_effect = get
+
+  # (2) act
+  out = [
+    b
+    async for b in CollReader(paging).read(
+      coll, [Field.id, Field.doc], batch_size=10, batch_bytes=306
+    )
+  ]
+
+  # (3) assessment
+  assert [len(b) for b in out] == [10, 3, 3, 3, 1]
+  assert [r["id"] for b in out for r in b] == [r["id"] for r in recs]
+
@@ -0,0 +1,222 @@
+import pickle
+from pathlib import Path
+from typing import cast
+
+import chromadb
+import numpy as np
+import pytest
+from chromadb.config import Settings
+from pytest_mock import MockerFixture
+
+from chromio.ie.exp.store import StoreReader, _BuiltinsUnpickler, _read_hnsw
+from chromio.ie.field import Field
+
+_FIELDS = [Field.meta, Field.doc, Field.embedding]
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory: pytest.TempPathFactory) -> Path:
+  """A persistent directory with the collections small, its vectors only in the
+  write-ahead log, and big, its vectors persisted in the HNSW index and then
+  changed in the log.
+  """
+
+  dir = tmp_path_factory.mktemp("store")
+  cli = chromadb.PersistentClient(str(dir), Settings(anonymized_telemetry=False))
+  rng = np.random.default_rng(0)
+
+  for name, count in (("small", 50), ("big", 1500)):
+    coll = cli.create_collection(name)
+    coll.add(
+      ids=[f"{name}{i}" for i in range(count)],
+      embeddings=rng.random((count, 8), dtype=np.float32),
+      metadatas=[  # type: ignore
+        {"i": i, "f": i / 2, "b": i % 2 == 0, "s": str(i), "a": [i, i + 1]}
+        if i % 3 != 0
+        else None
+        for i in range(count)
+      ],
+      documents=[f"doc {i}" if i % 4 != 0 else None for i in range(count)],  # type: ignore
+    )
+    coll.delete(ids=[f"{name}1"])
+    coll.upsert(ids=[f"{name}2"], embeddings=[[1.0] * 8], metadatas=[{"i": -2}])
+    coll.update(ids=[f"{name}3"], metadatas=[{"u": True}])
+
+  return dir
+
+
+def _expected(dir: Path, name: str) -> list[dict]:
+  """Returns the records of a collection, read through the Chroma API."""
+
+  coll = chromadb.PersistentClient(str(dir), Settings(anonymized_telemetry=False))
+  res = coll.get_collection(name).get(include=["metadatas", "documents", "embeddings"])
+
+  fields = ("ids", "metadatas", "documents", "embeddings")
+
+  return [
+    {"id": id, "metadata": m, "document": d, "embedding": e}
+    for id, m, d, e in zip(*(cast(list, res[f]) for f in fields))
+  ]
+
+
+@pytest.mark.parametrize("name", ("small", "big"))
+async def test_read(mocker: MockerFixture, store: Path, name: str) -> None:
+  """Check that read() returns the same records as the Chroma API, in the same order."""
+
+  # (1) arrange
+  coll = mocker.Mock()
+  coll.name = name
+  e = _expected(store, name)
+
+  # (2) act
+  out = [b async for b in StoreReader(store).read(coll, _FIELDS, 100)]
+
+  # (3) assessment
+  recs = [r for b in out for r in b]
+
+  assert len(out) == -(-len(e) // 100)
+  assert [r["id"] for r in recs] == [r["id"] for r in e]
+  assert [r["metadata"] for r in recs] == [r["metadata"] for r in e]
+  assert [r["document"] for r in recs] == [r["document"] for r in e]
+  assert all(r["embedding"] == x["embedding"].tolist() for r, x in zip(recs, e))
+
+
+@pytest.mark.parametrize("field", (Field.meta, Field.doc, Field.embedding))
+async def test_read_window(mocker: MockerFixture, store: Path, field: Field) -> None:
+  """Check that read() returns the window given by offset and limit, w/o the fields
+  not requested.
+  """
+
+  # (1) arrange
+  coll = mocker.Mock()
+  coll.name = "big"
+  e = _expected(store, "big")[250:520]
+  key = {Field.meta: "metadata", Field.doc: "document", Field.embedding: "embedding"}[
+    field
+  ]
+
+  # (2) act
+  out = [
+    b async for b in StoreReader(store).read(coll, [field], 100, limit=270, offset=250)
+  ]
+
+  # (3) assessment
+  assert [len(b) for b in out] == [100, 100, 70]
+  assert [r["id"] for b in out for r in b] == [r["id"] for r in e]
+  assert set(out[0][0]) == {"id", key}
+
+
+async def test_read_past_end(mocker: MockerFixture, store: Path) -> None:
+  """Check that read() returns nothing when the offset is past the end."""
+
+  # (1) arrange
+  coll = mocker.Mock()
+  coll.name = "small"
+
+  # (2) act
+  out = [b async for b in StoreReader(store).read(coll, [], offset=100)]
+
+  # (3) assessment
+  assert out == []
+
+
+@pytest.mark.parametrize(
+  ("name", "metafilter", "dir", "e_msg"),
+  (
+    pytest.param("small", {"i": 1}, None, "metadata filters", id="metafilter"),
+    pytest.param("unknown", None, None, "Collection not found", id="unknown coll"),
+    pytest.param("small", None, "nodir", "Persistent directory not found", id="no dir"),
+  ),
+)
+async def test_read_error(
+  mocker: MockerFixture,
+  store: Path,
+  name: str,
+  metafilter: dict | None,
+  dir: str | None,
+  e_msg: str,
+) -> None:
+  """Check that read() raises ValueError for what it can't read."""
+
+  # (1) arrange
+  coll = mocker.Mock()
+  coll.name = name
+  reader = StoreReader(store / dir if dir else store)
+
+  # (2) act
+  with pytest.raises(ValueError) as e:
+    _ = [b async for b in reader.read(coll, _FIELDS, metafilter=metafilter)]
+
+  # (3) assessment
+  assert e_msg in str(e.value)
+
+
+@pytest.mark.parametrize("segment", ("_METADATA_SEGMENT", "_VECTOR_SEGMENT"))
+async def test_read_unsupported_segments(
+  mocker: MockerFixture, store: Path, segment: str
+) -> None:
+  """Check that read() raises ValueError when the collection has a segment not
+  understood, these of distributed or newer databases.
+  """
+
+  # (1) arrange
+  coll = mocker.Mock()
+  coll.name = "small"
+  mocker.patch(f"chromio.ie.exp.store.{segment}", "urn:unknown")
+
+  # (2) act
+  with pytest.raises(ValueError) as e:
+    _ = [b async for b in StoreReader(store).read(coll, _FIELDS)]
+
+  # (3) assessment
+  assert "Unsupported segments" in str(e.value)
+
+
+async def test_read_missing_vector(mocker: MockerFixture, store: Path) -> None:
+  """Check that read() raises ValueError when a record has no vector in the store."""
+
+  # (1) arrange
+  coll = mocker.Mock()
+  coll.name = "small"
+  mocker.patch("chromio.ie.exp.store._LOG_SQL", "SELECT 0, '', NULL WHERE ? AND ?")
+
+  # (2) act
+  with pytest.raises(ValueError) as e:
+    _ = [b async for b in StoreReader(store).read(coll, _FIELDS)]
+
+  # (3) assessment
+  assert "Vector not found" in str(e.value)
+
+
+def test_read_hnsw_version(tmp_path: Path) -> None:
+  """Check that _read_hnsw() raises ValueError for an unknown index version."""
+
+  # (1) arrange
+  (tmp_path / "header.bin").write_bytes((2).to_bytes(4, "little") + bytes(96))
+
+  # (2) act
+  with pytest.raises(ValueError) as e:
+    _read_hnsw(tmp_path, 8)
+
+  # (3) assessment
+  assert "Unsupported HNSW index version" in str(e.value)
+
+
+def test_unpickler(tmp_path: Path) -> None:
+  """Check that the index metadata unpickler loads builtins and refuses classes."""
+
+  # (1) arrange
+  ok, bad = tmp_path / "ok.pickle", tmp_path / "bad.pickle"
+  ok.write_bytes(pickle.dumps({"label_to_id": {1: "a"}}))
+  bad.write_bytes(pickle.dumps({"label_to_id": {1: "a"}, "path": Path("x")}))
+
+  # (2) act
+  with open(ok, "rb") as f:
+    out = _BuiltinsUnpickler(f).load()
+
+  with pytest.raises(ValueError) as e, open(bad, "rb") as f:
+    _BuiltinsUnpickler(f).load()
+
+  # (3) assessment
+  assert out == {"label_to_id": {1: "a"}}
+  assert "Unexpected object" in str(e.value)
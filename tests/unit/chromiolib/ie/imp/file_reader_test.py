@@ -0,0 +1,151 @@
+import json
+from pathlib import Path
+
+import pytest
+from aiofiles import open
+
+from chromio.ie.imp.reader import ExpFileReader
+
+
+@pytest.fixture(scope="module")
+def reader() -> ExpFileReader:
+  """Reader to use in the tests, with a small chunk size for forcing several reads."""
+
+  return ExpFileReader(chunk_size=16)
+
+
+async def test_read_metadata(
+  data_dir: Path, reader: ExpFileReader, cc_export: str
+) -> None:
+  """Check that read_metadata() returns the header of an export file."""
+
+  # (1) act
+  out = await reader.read_metadata(data_dir / "cc-export.json")
+
+  # (2) assessment
+  c = json.loads(cc_export)
+  assert out == {"version": c["version"], "metadata": c["metadata"]}
+
+
+async def test_read_metadata_after_data(tmp_path: Path, reader: ExpFileReader) -> None:
+  """Check that read_metadata() returns the metadata when set after the data."""
+
+  # (1) arrange
+  file_path = tmp_path / "exp.json"
+
+  async with open(file_path, "w") as f:
+    await f.write('{"data": [{"id": "1"}, {"id": "2"}], "metadata": {"n": 1.25}}')
+
+  # (2) act
+  out = await reader.read_metadata(file_path)
+
+  # (3) assessment
+  assert out == {"metadata": {"n": 1.25}}
+
+
+@pytest.mark.parametrize(
+  ("batch_size", "limit", "e"),
+  (
+    pytest.param(2, None, [2, 1], id="all"),
+    pytest.param(1, 2, [1, 1], id="limit"),
+    pytest.param(2, 0, [], id="zero limit"),
+    pytest.param(5, None, [3], id="one batch"),
+  ),
+)
+async def test_read(
+  data_dir: Path,
+  reader: ExpFileReader,
+  cc_records: list[dict],
+  batch_size: int,
+  limit: int | None,
+  e: list[int],
+) -> None:
+  """Check that read() returns the records batch by batch."""
+
+  # (1) act
+  out = [
+    batch async for batch in reader.read(data_dir / "cc-export.json", batch_size, limit)
+  ]
+
+  # (2) assessment
+  assert [len(batch) for batch in out] == e
+  assert [r for batch in out for r in batch] == cc_records[: sum(e)]
+
+
+@pytest.mark.parametrize(
+  ("content", "e"),
+  (
+    pytest.param("{}", [], id="empty object"),
+    pytest.param('{"version": "1.0", "data": []}', [], id="empty data"),
+    pytest.param('{"data": [{"id": "1", "n": 123456789}]}', [1], id="number"),
+  ),
+)
+async def test_read_special_cases(
+  tmp_path: Path, reader: ExpFileReader, content: str, e: list[int]
+) -> None:
+  """Check that read() handles the special cases."""
+
+  # (1) arrange
+  async with open(file_path := tmp_path / "exp.json", "w") as f:
+    await f.write(content)
+
+  # (2) act
+  out = [batch async for batch in reader.read(file_path)]
+
+  # (3) assessment
+  assert [len(batch) for batch in out] == e
+
+
+@pytest.mark.parametrize(
+  ("encoding", "embedding"),
+  (
+    pytest.param("float32", "AAAAPwAAwL8=", id="float32"),
+    pytest.param("float16", "ADgAvg==", id="float16"),
+    pytest.param("json", [0.5, -1.5], id="json"),
+  ),
+)
+async def test_read_decodes_embeddings(
+  tmp_path: Path, reader: ExpFileReader, encoding: str, embedding: str | list
+) -> None:
+  """Check that read() decodes the embeddings attending to the file encoding."""
+
+  # (1) arrange
+  c = {
+    "version": "1.1",
+    "metadata": {"coll": {"name": "test"}, "encoding": {"embedding": encoding}},
+    "data": [{"id": "1", "embedding": embedding}],
+  }
+
+  async with open(file_path := tmp_path / "exp.json", "w") as f:
+    await f.write(json.dumps(c))
+
+  # (2) act
+  out = [batch async for batch in reader.read(file_path)]
+
+  # (3) assessment
+  [[rec]] = out
+  assert rec["id"] == "1"
+  assert list(rec["embedding"]) == [0.5, -1.5]
+
+
+@pytest.mark.parametrize(
+  "content",
+  (
+    pytest.param('["data"]', id="not an object"),
+    pytest.param('{"data": [{"id": "1"}', id="unterminated array"),
+    pytest.param('{"data": [{"id": "1', id="unterminated record"),
+    pytest.param('{"data" [{"id": "1"}]}', id="missing colon"),
+  ),
+)
+async def test_read_raises_error_if_invalid_json(
+  tmp_path: Path, reader: ExpFileReader, content: str
+) -> None:
+  """Check that read() raises JSONDecodeError if the file is not valid JSON."""
+
+  # (1) arrange
+  async with open(file_path := tmp_path / "exp.json", "w") as f:
+    await f.write(content)
+
+  # (2) act and assessment
+  with pytest.raises(json.JSONDecodeError):
+    [batch async for batch in reader.read(file_path)]
@@ -1,11 +1,18 @@
+import asyncio
+import json
 from math import ceil
+from pathlib import Path
 from typing import Any
 
 import pytest
-from pytest_mock import AsyncMockType
+from chromadb.errors import InvalidArgumentError
+from pytest_mock import AsyncMockType, MockerFixture
 
+from chromio.ie.chain import Chain, ChainLink
 from chromio.ie.consts import DEFAULT_FIELDS
 from chromio.ie.imp.importer import CollImporter
+from chromio.ie.imp.journal import WriteJournal, journal_path
+from chromio.ie.imp.reader import ExpFileReader
 
 
 @pytest.fixture(scope="module")
@@ -35,6 +42,9 @@ async def test_import_all(
   assert out.coll == "test"
   assert out.count == (cc_count := len(cc_records))
   assert out.duration >= 0
+  assert set(out.phases) == {"read", "write"}
+  assert set(out.latency) == {"write"}
+  assert out.records_per_sec > 0
 
   # add mock
   assert add.await_count == ceil(cc_count / default_batch_size)
@@ -95,3 +105,298 @@ async def test_import_all_setting_metadata(
   for call in add.await_args_list:
     assert call.kwargs["metadatas"][0]["cert"] == "C"
     assert call.kwargs["metadatas"][0]["dir"] == "D"
+
+
+async def test_import_record_stream_setting_metadata(
+  importer: CollImporter,
+  coll: AsyncMockType,
+  data_dir: Path,
+  cc_records: list[dict[str, Any]],
+  default_batch_size: int,
+) -> None:
+  """Check that import() imports the records streamed from an export file."""
+
+  # (1) arrange
+  (add := coll.add).return_value = None
+  recs = ExpFileReader().read(data_dir / "cc-export.json", default_batch_size)
+
+  # (2) act
+  out = await importer.import_coll(coll, recs, set={"cert": "C"})
+
+  # (3) assessment
+  # report
+  assert out.count == (cc_count := len(cc_records))
+
+  # add mock
+  assert add.await_count == ceil(cc_count / default_batch_size)
+
+  for call in add.await_args_list:
+    assert all(md["cert"] == "C" for md in call.kwargs["metadatas"])
+
+
+@pytest.mark.parametrize("workers", (1, 3))
+async def test_import_parts(
+  importer: CollImporter,
+  coll: AsyncMockType,
+  data_dir: Path,
+  tmp_path: Path,
+  cc_records: list[dict[str, Any]],
+  workers: int,
+) -> None:
+  """Check that import_parts() imports all the part files, reporting every one."""
+
+  # (1) arrange
+  (add := coll.add).return_value = None
+  files = [data_dir / "cc-export.json"] * 2 + [tmp_path / "part.arrow"]
+
+  pytest.importorskip("pyarrow")
+  from chromio.ie.arrow import ArrowFileWriter
+
+  async def recs():
+    yield cc_records[:1]
+
+  await ArrowFileWriter().write(files[2], {}, recs(), DEFAULT_FIELDS)
+
+  # (2) act
+  out = await importer.import_parts(coll, files, workers=workers)
+
+  # (3) assessment
+  assert out.coll == "test"
+  assert out.count == (cc_count := len(cc_records)) * 2 + 1
+  assert [(p.file, p.count) for p in out.parts] == [
+    (str(files[0]), cc_count),
+    (str(files[1]), cc_count),
+    (str(files[2]), 1),
+  ]
+  assert sum(len(c.kwargs["ids"]) for c in add.await_args_list) == out.count
+
+
+async def test_import_parts_failed(
+  mocker: MockerFixture, importer: CollImporter, coll: AsyncMockType, data_dir: Path
+) -> None:
+  """Check that import_parts() raises the error of a part failed, cancelling the
+  parts being imported.
+  """
+
+  # (1) arrange
+  waiting, cancelled = asyncio.Event(), asyncio.Event()
+
+  async def import_coll(self: CollImporter, coll: Any, recs: Any, **kwargs) -> Any:
+    # the first part waits, the second one fails
+    if waiting.is_set():
+      raise ValueError("bad part")
+
+    waiting.set()
+
+    try:
+      await asyncio.sleep(10)
+    except asyncio.CancelledError:
+      cancelled.set()
+      raise
+
+  mocker.patch.object(CollImporter, "import_coll", import_coll)
+  files = [data_dir / "cc-export.json"] * 2
+
+  # (2) act
+  with pytest.raises(ValueError, match="bad part"):
+    await importer.import_parts(coll, files, workers=2)
+
+  # (3) assessment
+  assert cancelled.is_set()
+
+
+@pytest.mark.parametrize("stream", (False, True))
+async def test_import_resume(
+  coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict[str, Any]],
+  default_batch_size: int,
+  stream: bool,
+) -> None:
+  """Check that import_coll() w/ resume skips the records committed before the
+  interruption and upserts the rest.
+  """
+
+  # (1) arrange
+  def recs() -> Any:
+    async def gen():
+      yield cc_records[:1]
+      yield cc_records[1:]
+
+    return gen() if stream else cc_records
+
+  importer = CollImporter(default_batch_size, DEFAULT_FIELDS)
+  journal = tmp_path / "cc-export.json.imp.journal"
+  coll.add.side_effect = [None, InvalidArgumentError("bad record")]
+
+  with pytest.raises(InvalidArgumentError, match="bad record"):
+    await importer.import_coll(coll, recs(), journal=journal)
+
+  # (2) act
+  out = await importer.import_coll(coll, recs(), journal=journal, resume=True)
+
+  # (3) assessment
+  assert out.count == len(cc_records) - default_batch_size
+  assert coll.add.await_count == 2
+  assert [c.kwargs["ids"] for c in coll.upsert.await_args_list] == [
+    [r["id"] for r in cc_records[default_batch_size:]]
+  ]
+  assert not journal.exists()
+
+
+async def test_import_resume_after_completed(
+  importer: CollImporter,
+  coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict[str, Any]],
+) -> None:
+  """Check that import_coll() removes the journal of a completed import, so a
+  later resume into a fresh collection writes every record again.
+  """
+
+  # (1) arrange
+  journal = tmp_path / "cc-export.json.imp.journal"
+  await importer.import_coll(coll, cc_records, journal=journal)
+  coll.reset_mock()
+
+  # (2) act
+  out = await importer.import_coll(coll, cc_records, journal=journal, resume=True)
+
+  # (3) assessment
+  assert out.count == len(cc_records)
+  assert sum(len(c.kwargs["ids"]) for c in coll.upsert.await_args_list) == len(
+    cc_records
+  )
+  assert not journal.exists()
+
+
+async def test_import_resume_wo_journal(
+  coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict[str, Any]],
+  default_batch_size: int,
+) -> None:
+  """Check that import_coll() w/ resume and no journal, such as after a failed
+  import run w/o resume, upserts every record instead of failing on the records
+  written before.
+  """
+
+  # (1) arrange
+  importer = CollImporter(default_batch_size, DEFAULT_FIELDS)
+  journal = tmp_path / "cc-export.json.imp.journal"
+  coll.add.side_effect = [None, InvalidArgumentError("bad record")]
+
+  with pytest.raises(InvalidArgumentError, match="bad record"):
+    await importer.import_coll(coll, cc_records)
+
+  # (2) act
+  out = await importer.import_coll(coll, cc_records, journal=journal, resume=True)
+
+  # (3) assessment
+  assert out.count == len(cc_records)
+  assert coll.add.await_count == 2
+  assert [i for c in coll.upsert.await_args_list for i in c.kwargs["ids"]] == [
+    r["id"] for r in cc_records
+  ]
+  assert not journal.exists()
+
+
+async def test_import_resume_completed(
+  importer: CollImporter,
+  coll: AsyncMockType,
+  tmp_path: Path,
+  cc_records: list[dict[str, Any]],
+) -> None:
+  """Check that import_coll() w/ resume writes nothing when the import completed."""
+
+  # (1) arrange
+  fields = [str(fld) for fld in DEFAULT_FIELDS]
+  journal = tmp_path / "cc-export.json.imp.journal"
+  await WriteJournal("test", fields, count=len(cc_records)).save(journal)
+
+  # (2) act
+  out = await importer.import_coll(coll, cc_records, journal=journal, resume=True)
+
+  # (3) assessment
+  assert out.count == 0
+  coll.upsert.assert_not_awaited()
+
+
+async def test_import_parts_resume(
+  importer: CollImporter,
+  coll: AsyncMockType,
+  data_dir: Path,
+  tmp_path: Path,
+  cc_records: list[dict[str, Any]],
+) -> None:
+  """Check that import_parts() w/ journals resumes every part from its journal,
+  skipping the parts already imported.
+  """
+
+  # (1) arrange
+  files = [tmp_path / "out.part-0000.json", tmp_path / "out.part-0001.json"]
+
+  for file in files:
+    file.write_text((data_dir / "cc-export.json").read_text())
+
+  fields, dst = [str(fld) for fld in DEFAULT_FIELDS], "server://h:1/t/db/test"
+  journals = tmp_path / "journals"
+  journals.mkdir()
+
+  await WriteJournal(
+    "test", fields, src=str(files[0]), dst=dst, count=len(cc_records)
+  ).save(journals / journal_path(files[0].name))
+
+  # (2) act
+  out = await importer.import_parts(
+    coll, files, journals=journals, resume=True, endpoint=dst
+  )
+
+  # (3) assessment
+  assert [p.count for p in out.parts] == [0, len(cc_records)]
+  assert not any((journals / journal_path(file.name)).exists() for file in files)
+  assert not any(journal_path(file).exists() for file in files)
+
+
+async def test_import_chain(
+  importer: CollImporter, coll: AsyncMockType, tmp_path: Path
+) -> None:
+  """Check that import_chain() imports every record once, from the newest export
+  having it, w/o the records deleted afterwards.
+  """
+
+  # (1) arrange
+  def export(file: str, docs: dict[str, str]) -> None:
+    data = [{"id": k, "document": v, "metadata": None} for k, v in docs.items()]
+    hdr = {"version": "1.0", "metadata": {"coll": {"name": "test"}}}
+    (tmp_path / file).write_text(json.dumps(hdr | {"data": data}))
+
+  export("out.0000.json", {"1": "a", "2": "b", "3": "c"})
+  export("out.0001.json", {"3": "C", "4": "d"})
+  export("out.0002.json", {"4": "D"})
+
+  await Chain(
+    "test",
+    [str(fld) for fld in DEFAULT_FIELDS],
+    [
+      ChainLink("out.0000.json", "full", 3),
+      ChainLink("out.0001.json", "delta", 2, ["2"]),
+      ChainLink("out.0002.json", "delta", 1),
+    ],
+  ).save(file := tmp_path / "out.chain.json")
+
+  # (2) act
+  out = await importer.import_chain(coll, file)
+
+  # (3) assessment
+  assert out.count == 3
+  assert [(Path(p.file).name, p.count) for p in out.parts] == [
+    ("out.0000.json", 1),
+    ("out.0001.json", 1),
+    ("out.0002.json", 1),
+  ]
+  assert sorted(
+    (id, doc)
+    for c in coll.add.await_args_list
+    for id, doc in zip(c.kwargs["ids"], c.kwargs["documents"], strict=True)
+  ) == [("1", "a"), ("3", "C"), ("4", "D")]
@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+from chromio.ie.imp.journal import WriteJournal, journal_path
+
+
+async def test_begin(tmp_path: Path) -> None:
+  """Check that begin() saves the journal when not resuming."""
+
+  # (1) arrange
+  file = tmp_path / "out.json.imp.journal"
+  await WriteJournal("test", ["id"], count=2).save(file)
+
+  # (2) act
+  out, resumed = await (jnl := WriteJournal("test", ["id"])).begin(file, False)
+
+  # (3) assessment
+  assert out is jnl
+  assert not resumed
+  assert await WriteJournal.load(file) == jnl
+
+
+@pytest.mark.parametrize("saved", (True, False))
+async def test_begin_resuming(tmp_path: Path, saved: bool) -> None:
+  """Check that begin() w/ resume returns the journal saved, if any, and a
+  resumption from the first record otherwise.
+  """
+
+  # (1) arrange
+  file = tmp_path / "out.json.imp.journal"
+  prev = WriteJournal("test", ["id"], 10, count=4)
+
+  if saved:
+    await prev.save(file)
+
+  # (2) act
+  out, resumed = await WriteJournal("test", ["id"], 10).begin(file, True)
+
+  # (3) assessment
+  assert resumed
+  assert out.count == (4 if saved else 0)
+  assert await WriteJournal.load(file) == out
+
+
+@pytest.mark.parametrize(
+  "other",
+  (
+    pytest.param(WriteJournal("other", ["id"], dst="server://h:1/t/d/c"), id="coll"),
+    pytest.param(WriteJournal("test", ["id"], dst="server://h:2/t/d/c"), id="dst"),
+    pytest.param(
+      WriteJournal("test", ["id"], src="server://h:1/t/x/c", dst="server://h:1/t/d/c"),
+      id="src",
+    ),
+  ),
+)
+async def test_begin_resuming_other_write(tmp_path: Path, other: WriteJournal) -> None:
+  """Check that begin() w/ resume raises when the journal is of other write: other
+  collection, arguments or endpoints.
+  """
+
+  # (1) arrange
+  await WriteJournal("test", ["id"], dst="server://h:1/t/d/c").save(
+    file := tmp_path / "out.json.imp.journal"
+  )
+
+  # (2) act and assessment
+  with pytest.raises(ValueError, match="is of other collection or arguments"):
+    await other.begin(file, True)
+
+
+def test_journal_path() -> None:
+  """Check the journal path of an import file."""
+
+  assert journal_path("dir/out.json") == Path("dir/out.json.imp.journal")
@@ -1,9 +1,14 @@
+import asyncio
+from collections.abc import AsyncIterator
+
 import pytest
+from chromadb.errors import InternalError, InvalidArgumentError
 from pytest import FixtureRequest
-from pytest_mock import AsyncMockType
+from pytest_mock import AsyncMockType, MockerFixture
 
 from chromio.ie import Field
 from chromio.ie.imp.writer import CollWriter
+from chromio.ie.metrics import metrics
 
 
 @pytest.fixture(scope="module")
@@ -47,7 +52,7 @@ async def test_write_records_with_default_fields(
   out = await writer.write(records, coll, batch_size=batch_size, limit=limit)
 
   # (3) assessment
-  assert out == e
+  assert out.count == e
   assert add.await_count == e_batches
 
   for call in add.await_args_list:
@@ -85,9 +90,354 @@ async def test_write_records_with_embedding(
   )
 
   # (3) assessment
-  assert out == e
+  assert out.count == e
   assert add.await_count == e_batches
 
   for call in add.await_args_list:
     assert call.kwargs["metadatas"] is not None
     assert call.kwargs["embeddings"] is not None
+
+
+@pytest.mark.parametrize("records", (3,), indirect=True)
+async def test_write_only_embeddings(
+  writer: CollWriter, coll: AsyncMockType, records: list[dict]
+) -> None:
+  """Check that write() doesn't write the documents when only the embeddings are
+  requested, so these aren't re-embedded.
+  """
+
+  # (1) arrange
+  records = [{"id": r["id"], "embedding": r["embedding"]} for r in records]
+  (add := coll.add).return_value = None
+
+  # (2) act
+  out = await writer.write(records, coll, fields=[Field.embedding], batch_size=5)
+
+  # (3) assessment
+  assert out.count == 3
+  add.assert_awaited_once_with(
+    ids=[r["id"] for r in records],
+    documents=None,
+    metadatas=None,
+    embeddings=[[0.1, 0.2]] * 3,
+  )
+
+
+@pytest.mark.parametrize(
+  ("records", "batch_size", "limit", "e", "e_batches"),
+  (
+    pytest.param(5, 2, 3, 3, 2),
+    pytest.param(5, 2, None, 5, 3),
+    pytest.param(5, 3, 5, 5, 2),
+    pytest.param(4, 2, None, 4, 2),
+  ),
+  indirect=("records",),
+)
+async def test_write_record_stream(
+  writer: CollWriter,
+  coll: AsyncMockType,
+  records: list[dict],
+  batch_size: int,
+  limit: int | None,
+  e: int,
+  e_batches: int,
+) -> None:
+  """Check that write() writes the records of an asynchronous stream of batches,
+  rebatching them attending to the batch size.
+  """
+
+  # (1) arrange
+  (add := coll.add).return_value = None
+
+  async def stream() -> AsyncIterator[list[dict]]:
+    for i in range(0, len(records), 2):
+      yield records[i : i + 2]
+
+  # (2) act
+  out = await writer.write(stream(), coll, batch_size=batch_size, limit=limit)
+
+  # (3) assessment
+  assert out.count == e
+  assert add.await_count == e_batches
+  assert [id for c in add.await_args_list for id in c.kwargs["ids"]] == [
+    r["id"] for r in records[:e]
+  ]
+
+
+@pytest.mark.parametrize(
+  ("stream", "batch_bytes", "limit", "e_batches"),
+  (
+    pytest.param(False, 300, None, [2, 3], id="budget"),
+    pytest.param(False, 50, None, [1, 1, 1, 1, 1], id="record over budget"),
+    pytest.param(False, 10_000, None, [4, 1], id="batch size"),
+    pytest.param(True, 300, None, [2, 3], id="stream"),
+    pytest.param(True, 300, 3, [2, 1], id="stream w/ limit"),
+    pytest.param(True, 10_000, 4, [4], id="stream w/ limit, batch size"),
+  ),
+)
+async def test_write_batch_bytes(
+  writer: CollWriter,
+  coll: AsyncMockType,
+  stream: bool,
+  batch_bytes: int,
+  limit: int | None,
+  e_batches: list[int],
+) -> None:
+  """Check that write() cuts the batches when these reach the byte budget, before
+  the batch size.
+  """
+
+  # (1) arrange
+  (add := coll.add).return_value = None
+  records = [
+    {"id": str(i), "document": "x" * 100, "metadata": {"k": "v"}, "embedding": [0, 1]}
+    for i in range(5)
+  ]
+  records[-1]["document"] = None
+
+  async def batches() -> AsyncIterator[list[dict]]:
+    for i in range(0, len(records), 3):
+      yield records[i : i + 3]
+
+  # (2) act
+  out = await writer.write(
+    batches() if stream else records,
+    coll,
+    batch_size=4,
+    batch_bytes=batch_bytes,
+    limit=limit,
+  )
+
+  # (3) assessment
+  assert out.count == sum(e_batches)
+  assert [len(c.kwargs["ids"]) for c in add.await_args_list] == e_batches
+
+
+@pytest.mark.parametrize(
+  ("records", "concurrency"), ((8, 1), (8, 3)), indirect=("records",)
+)
+async def test_write_batches_concurrently(
+  coll: AsyncMockType,
+  records: list[dict],
+  concurrency: int,
+) -> None:
+  """Check that write() writes up to concurrency batches at the same time."""
+
+  # (1) arrange
+  writer = CollWriter(concurrency)
+  in_flight, max_in_flight = 0, 0
+
+  async def add(**_) -> None:
+    nonlocal in_flight, max_in_flight
+
+    in_flight += 1
+    max_in_flight = max(max_in_flight, in_flight)
+    await asyncio.sleep(0.01)
+    in_flight -= 1
+
+  coll.add.side_effect = add
+
+  # (2) act
+  out = await writer.write(records, coll, batch_size=2)
+
+  # (3) assessment
+  assert out.count == 6
+  assert coll.add.await_count == 3
+  assert max_in_flight == concurrency
+
+
+@pytest.mark.parametrize("concurrency", (0, -1))
+def test_writer_invalid_concurrency(concurrency: int) -> None:
+  """Check that CollWriter rejects a concurrency less than 1."""
+
+  with pytest.raises(ValueError, match="at least 1"):
+    CollWriter(concurrency)
+
+
+@pytest.mark.parametrize(
+  ("records", "retries", "e_count", "e_retried", "e_failed"),
+  (
+    pytest.param(4, 2, 4, 1, 0, id="recovered"),
+    pytest.param(4, 1, 2, 1, 1, id="failed"),
+  ),
+  indirect=("records",),
+)
+async def test_write_retries_transient_errors(
+  coll: AsyncMockType,
+  records: list[dict],
+  retries: int,
+  e_count: int,
+  e_retried: int,
+  e_failed: int,
+) -> None:
+  """Check that write() retries the batches failing with transient errors."""
+
+  # (1) arrange
+  writer = CollWriter(retries=retries, backoff=0)
+  coll.add.side_effect = [InternalError(), InternalError(), None, None]
+  written, failed = metrics.records_written.value(), metrics.batches_failed.value()
+
+  # (2) act
+  out = await writer.write(records, coll, batch_size=2)
+
+  # (3) assessment
+  assert out.count == e_count
+  assert out.retried == e_retried
+  assert out.failed == e_failed
+
+  assert metrics.records_written.value() - written == e_count
+  assert metrics.batches_failed.value() - failed == e_failed
+  assert metrics.queue_depth.value(phase="write") == 0
+
+
+@pytest.mark.parametrize("records", (6,), indirect=True)
+async def test_write_raises_non_transient_errors(
+  coll: AsyncMockType,
+  records: list[dict],
+) -> None:
+  """Check that write() stops and raises when a batch fails with a non-transient
+  error.
+  """
+
+  # (1) arrange
+  writer = CollWriter(retries=3, backoff=0)
+  coll.add.side_effect = [None, InvalidArgumentError("bad record"), None]
+
+  # (2) act
+  with pytest.raises(InvalidArgumentError, match="bad record"):
+    await writer.write(records, coll, batch_size=2)
+
+  # (3) assessment
+  assert coll.add.await_count == 2
+
+
+@pytest.mark.parametrize(
+  ("records", "concurrency", "e"),
+  (
+    pytest.param(6, 1, [2, 4, 6], id="sequential"),
+    pytest.param(6, 3, [6], id="concurrent, first batch last"),
+  ),
+  indirect=("records",),
+)
+async def test_write_commits_in_order(
+  coll: AsyncMockType,
+  records: list[dict],
+  concurrency: int,
+  e: list[int],
+) -> None:
+  """Check that write() reports the records committed in order, a batch only
+  counting when all the previous ones are written.
+  """
+
+  # (1) arrange
+  writer = CollWriter(concurrency)
+  out: list[int] = []
+
+  # the first batches are the slowest
+  delays = {r["id"]: 0.01 * (len(records) - i) for i, r in enumerate(records)}
+
+  async def add(ids: list[str], **_) -> None:
+    await asyncio.sleep(delays[ids[0]])
+
+  async def committed(count: int) -> None:
+    out.append(count)
+
+  coll.add.side_effect = add
+
+  # (2) act
+  await writer.write(records, coll, batch_size=2, committed=committed)
+
+  # (3) assessment
+  assert out == e
+
+
+@pytest.mark.parametrize("records", (4,), indirect=True)
+async def test_write_does_not_commit_after_failed_batches(
+  mocker: MockerFixture,
+  coll: AsyncMockType,
+  records: list[dict],
+) -> None:
+  """Check that write() doesn't report the batches following a failed one."""
+
+  # (1) arrange
+  writer = CollWriter(retries=0)
+  coll.add.side_effect = [InternalError(), None]
+  committed = mocker.AsyncMock()
+
+  # (2) act
+  out = await writer.write(records, coll, batch_size=2, committed=committed)
+
+  # (3) assessment
+  assert out.failed == 1
+  committed.assert_not_awaited()
+
+
+@pytest.mark.parametrize("records", (4,), indirect=True)
+async def test_write_upserting(coll: AsyncMockType, records: list[dict]) -> None:
+  """Check that write() in upsert mode upserts the records."""
+
+  # (1) arrange
+  writer = CollWriter(mode="upsert")
+
+  # (2) act
+  out = await writer.write(records, coll, batch_size=2)
+
+  # (3) assessment
+  assert out.count == 4
+  assert coll.upsert.await_count == 2
+  coll.add.assert_not_awaited()
+
+
+@pytest.mark.parametrize("records", (6,), indirect=True)
+async def test_write_skipping_existing(coll: AsyncMockType, records: list[dict]) -> None:
+  """Check that write() in skip-existing mode only adds the records whose ids are
+  missing in the collection, skipping the batches w/o missing records.
+  """
+
+  # (1) arrange
+  writer = CollWriter(mode="skip-existing")
+  ids = [r["id"] for r in records]
+  coll.get.side_effect = [{"ids": ids[0:2]}, {"ids": [ids[3]]}, {"ids": []}]
+
+  # (2) act
+  out = await writer.write(records, coll, batch_size=2)
+
+  # (3) assessment
+  assert (out.count, out.skipped) == (3, 3)
+  assert [c.kwargs for c in coll.get.await_args_list] == [
+    {"ids": ids[i : i + 2], "include": []} for i in range(0, 6, 2)
+  ]
+  assert [c.kwargs["ids"] for c in coll.add.await_args_list] == [[ids[2]], ids[4:6]]
+
+
+@pytest.mark.parametrize(
+  ("retries", "e_skipped", "e_failed"),
+  (
+    pytest.param(1, 1, 0, id="retried"),
+    pytest.param(0, 0, 1, id="failed"),
+  ),
+)
+@pytest.mark.parametrize("records", (2,), indirect=True)
+async def test_write_skipping_existing_retried(
+  coll: AsyncMockType,
+  records: list[dict],
+  retries: int,
+  e_skipped: int,
+  e_failed: int,
+) -> None:
+  """Check that write() in skip-existing mode counts the existing records as
+  skipped once, when the batch is written, and not if it fails.
+  """
+
+  # (1) arrange
+  writer = CollWriter(retries=retries, backoff=0, mode="skip-existing")
+  ids = [r["id"] for r in records]
+  coll.get.return_value = {"ids": ids[0:1]}
+  coll.add.side_effect = [InternalError(), None]
+
+  # (2) act
+  out = await writer.write(records, coll, batch_size=2)
+
+  # (3) assessment
+  assert (out.count, out.skipped, out.failed) == (1 - e_failed, e_skipped, e_failed)
+  assert [c.kwargs["ids"] for c in coll.add.await_args_list] == [ids[1:2]] * (retries + 1)
@@ -0,0 +1,97 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from chromio.ie._io import open
+
+
+@pytest.mark.parametrize("name", ("exp.json", "exp.json.gz", "exp.json.zst"))
+async def test_write_and_read_text(tmp_path: Path, name: str) -> None:
+  """Check that open() writes and reads text files, compressed or not."""
+
+  # (1) arrange
+  if name.endswith(".zst"):
+    pytest.importorskip("zstandard")
+
+  content = '{"data": [' + ", ".join(f'{{"id": "{i}"}}' for i in range(1000)) + "]}"
+
+  # (2) act
+  async with open(file := tmp_path / name, "w") as f:
+    await f.write(content)
+
+  async with open(file) as f:
+    out = await f.read(10) + await f.read()
+
+  # (3) assessment
+  assert out == content
+
+  if name != "exp.json":
+    assert file.stat().st_size < len(content) / 4
+
+
+@pytest.mark.parametrize("name", ("data.json", "data.json.gz", "data.json.zst"))
+async def test_write_and_read_bytes(tmp_path: Path, name: str) -> None:
+  """Check that open() writes and reads binary files, compressed or not."""
+
+  # (1) arrange
+  if name.endswith(".zst"):
+    pytest.importorskip("zstandard")
+
+  content = b"0123456789" * 100
+
+  # (2) act
+  async with open(file := tmp_path / name, "wb") as f:
+    await f.write(content)
+
+  async with open(file, "rb") as f:
+    out = await f.read()
+
+  # (3) assessment
+  assert out == content
+
+
+@pytest.mark.parametrize("name", ("exp.json", "exp.json.gz"))
+async def test_text_is_utf8(tmp_path: Path, name: str) -> None:
+  """Check that open() writes and reads the text files as UTF-8, not in the
+  platform encoding.
+  """
+
+  # (1) arrange
+  content = '{"document": "caf\u00e9 \u2013 \u65e5\u672c"}'
+
+  # (2) act
+  async with open(file := tmp_path / name, "w") as f:
+    await f.write(content)
+
+  async with open(file) as f:
+    out = await f.read()
+
+  # (3) assessment
+  assert out == content
+
+  raw = file.read_bytes() if name == "exp.json" else gzip.decompress(file.read_bytes())
+  assert raw == content.encode("utf-8")
+
+
+async def test_read_gzip_written_by_others(tmp_path: Path) -> None:
+  """Check that open() reads the gzip files written by other tools."""
+
+  # (1) arrange
+  with gzip.open(file := tmp_path / "exp.json.gz", "wt") as f:
+    f.write('{"version": "1.0"}')
+
+  # (2) act
+  async with open(file) as f:
+    out = await f.read()
+
+  # (3) assessment
+  assert out == '{"version": "1.0"}'
+
+
+async def test_open_raises_file_not_found_error(tmp_path: Path) -> None:
+  """Check that open() raises FileNotFoundError when the file to read not found."""
+
+  with pytest.raises(FileNotFoundError):
+    async with open(tmp_path / "unknown.json.gz"):
+      pass
@@ -0,0 +1,106 @@
+import asyncio
+from time import monotonic
+
+import pytest
+from chromadb.errors import InvalidArgumentError, RateLimitError
+
+from chromio.ie.limit import AimdLimit
+
+
+async def test_limit_decrease_on_throttling() -> None:
+  """Check that the throttling errors decrease the limit multiplicatively, once for
+  all the requests in flight, and the non-transient errors don't.
+  """
+
+  # (1) arrange
+  limit = AimdLimit(8, initial=8)
+
+  async def req(e: Exception) -> None:
+    await asyncio.sleep(0.01)
+    raise e
+
+  # (2) act
+  out = await asyncio.gather(
+    *(limit.run(req, RateLimitError()) for _ in range(8)), return_exceptions=True
+  )
+
+  with pytest.raises(InvalidArgumentError):
+    await limit.run(req, InvalidArgumentError())
+
+  # (3) assessment
+  assert all(isinstance(e, RateLimitError) for e in out)
+  assert limit.limit == 4
+  assert limit.decreases == 1
+
+
+async def test_limit_increase() -> None:
+  """Check that the limit starts at the initial one and is increased, one request
+  per round of limit requests completed within the latency target, up to the
+  maximum.
+  """
+
+  # (1) arrange
+  limit = AimdLimit(4, latency_target=1.0, initial=2)
+  assert limit.limit == 2
+
+  async def req() -> int:
+    await asyncio.sleep(0.001)
+    return 1
+
+  # (2) act
+  out = await asyncio.gather(*(limit.run(req) for _ in range(40)))
+
+  # (3) assessment
+  assert sum(out) == 40
+  assert limit.limit == 4
+
+
+async def test_limit_latency_target() -> None:
+  """Check that the limit is decreased when the p95 latency exceeds the target."""
+
+  # (1) arrange
+  limit = AimdLimit(8, latency_target=0.005, initial=8)
+
+  async def req() -> None:
+    await asyncio.sleep(0.01)
+
+  # (2) act
+  await asyncio.gather(*(limit.run(req) for _ in range(16)))
+
+  # (3) assessment
+  assert limit.limit < 8
+  assert limit.decreases >= 1
+  assert limit.p95 is None or limit.p95 > 0.005
+
+
+@pytest.mark.parametrize(
+  ("max", "e_limit"),
+  (
+    pytest.param(32, 4, id="small window"),
+    pytest.param(2, 2, id="capped by max"),
+  ),
+)
+def test_limit_initial(max: int, e_limit: int) -> None:
+  """Check that the limit starts at a small window, capped by the maximum."""
+
+  # (1) act
+  out = AimdLimit(max)
+
+  # (2) assessment
+  assert out.limit == e_limit
+
+
+async def test_limit_max_rps() -> None:
+  """Check that the requests are spaced to never exceed the maximum rate."""
+
+  # (1) arrange
+  limit = AimdLimit(8, max_rps=100)
+
+  async def req() -> float:
+    return monotonic()
+
+  # (2) act
+  out = sorted(await asyncio.gather(*(limit.run(req) for _ in range(6))))
+
+  # (3) assessment
+  assert out[-1] - out[0] >= 0.045
@@ -0,0 +1,111 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from chromio.ie.manifest import (
+  DbManifest,
+  DbManifestColl,
+  Manifest,
+  ManifestPart,
+  export_path,
+  is_manifest,
+  manifest_path,
+  part_path,
+)
+
+
+@pytest.mark.parametrize(
+  ("file", "e_part", "e_manifest"),
+  (
+    pytest.param("out.json", "out.part-0002.json", "out.manifest.json", id="json"),
+    pytest.param(
+      "dir/out.json.gz",
+      "dir/out.part-0002.json.gz",
+      "dir/out.manifest.json",
+      id="gz",
+    ),
+    pytest.param(
+      "my.coll.parquet",
+      "my.coll.part-0002.parquet",
+      "my.coll.manifest.json",
+      id="parquet",
+    ),
+    pytest.param("out", "out.part-0002", "out.manifest.json", id="no extension"),
+  ),
+)
+def test_paths(file: str, e_part: str, e_manifest: str) -> None:
+  """Check that part_path() and manifest_path() derive the paths from the export
+  file path, and export_path() this from the part path.
+  """
+
+  # (1) act
+  part, manifest = part_path(file, 2), manifest_path(file)
+
+  # (2) assessment
+  assert part == Path(e_part)
+  assert manifest == Path(e_manifest)
+  assert export_path(part) == Path(file)
+  assert is_manifest(manifest)
+  assert not is_manifest(part)
+
+
+async def test_save_and_load(tmp_path: Path) -> None:
+  """Check that a manifest saved is loaded back."""
+
+  # (1) arrange
+  manifest = Manifest(
+    coll="test",
+    parts=[
+      ManifestPart("out.part-0000.json", 0, 3),
+      ManifestPart("out.part-0001.json", 3, 2),
+    ],
+  )
+
+  # (2) act
+  await manifest.save(file := tmp_path / "out.manifest.json")
+  out = await Manifest.load(file)
+
+  # (3) assessment
+  assert out == manifest
+  assert out.count == 5
+
+
+@pytest.mark.parametrize(
+  ("content", "e"),
+  (
+    pytest.param(
+      {"kind": "db", "colls": [], "version": "1.0"}, "of a database export", id="db"
+    ),
+    pytest.param({"colls": [], "version": "1.0"}, "of a database export", id="w/o kind"),
+  ),
+)
+async def test_load_other_kind(tmp_path: Path, content: dict, e: str) -> None:
+  """Check that load() raises when the manifest is of a database export, with or
+  w/o its kind, instead of failing on its members.
+  """
+
+  # (1) arrange
+  (file := tmp_path / "db.manifest.json").write_text(json.dumps(content))
+
+  # (2) act and assessment
+  with pytest.raises(ValueError, match=e):
+    await Manifest.load(file)
+
+
+async def test_db_manifest_kind(tmp_path: Path) -> None:
+  """Check that the database manifests are saved with their kind and rejected as
+  shard manifests, and vice versa.
+  """
+
+  # (1) arrange
+  db = DbManifest(colls=[DbManifestColl("a", "a.json", 1)])
+  await db.save(db_file := tmp_path / "db.manifest.json")
+  await Manifest("a").save(file := tmp_path / "a.manifest.json")
+
+  # (2) act and assessment
+  assert json.loads(db_file.read_text())["kind"] == "db"
+  assert await DbManifest.load(db_file) == db
+
+  with pytest.raises(ValueError, match="of a sharded export, not of a database"):
+    await DbManifest.load(file)
@@ -0,0 +1,167 @@
+import asyncio
+from pathlib import Path
+
+from chromio.ie.metrics import Counter, Gauge, Histogram, Metrics, metrics
+from chromio.ie.perf import READ, Perf
+
+
+def test_counter() -> None:
+  """Check that a counter keeps a value per label set, rendered in the Prometheus
+  text format.
+  """
+
+  # (1) arrange
+  counter = Counter("test_total", "Test counter.")
+
+  # (2) act
+  counter.inc()
+  counter.inc(2.5, phase="read")
+  counter.inc(phase="read")
+
+  # (3) assessment
+  assert counter.value(phase="read") == 3.5
+  assert counter.render() == (
+    "# HELP test_total Test counter.\n"
+    "# TYPE test_total counter\n"
+    "test_total 1\n"
+    'test_total{phase="read"} 3.5\n'
+  )
+
+
+def test_gauge() -> None:
+  """Check that a gauge goes up and down."""
+
+  # (1) arrange
+  gauge = Gauge("test", "Test gauge.")
+
+  # (2) act
+  gauge.inc(3)
+  gauge.dec()
+  gauge.set(5, phase="read")
+
+  # (3) assessment
+  assert (gauge.value(), gauge.value(phase="read")) == (2, 5)
+  assert "# TYPE test gauge\n" in gauge.render()
+
+
+def test_histogram() -> None:
+  """Check that a histogram counts the observations in cumulative buckets."""
+
+  # (1) arrange
+  hist = Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+
+  # (2) act
+  for secs in (0.05, 0.1, 0.5, 2.0):
+    hist.observe(secs, phase="read")
+
+  # (3) assessment
+  assert hist.count(phase="read") == 4
+  assert hist.count() == 0
+  assert hist.samples() == [
+    'test_seconds_bucket{phase="read",le="0.1"} 2',
+    'test_seconds_bucket{phase="read",le="1"} 3',
+    'test_seconds_bucket{phase="read",le="+Inf"} 4',
+    'test_seconds_sum{phase="read"} 2.65',
+    'test_seconds_count{phase="read"} 4',
+  ]
+
+
+async def test_perf_updates_metrics() -> None:
+  """Check that the measures of the reads and requests update the metrics."""
+
+  # (1) arrange
+  perf, recs = Perf(), [{"id": "a"}, {"id": "bc"}]
+  read, bytes, lat = (
+    metrics.records_read.value(),
+    metrics.bytes_read.value(),
+    metrics.batch_latency.count(phase=READ),
+  )
+
+  # (2) act
+  _ = [b async for b in perf.reads(recs)]
+  await perf.request(READ, asyncio.sleep(0))
+
+  # (3) assessment
+  assert metrics.records_read.value() - read == 2
+  assert metrics.bytes_read.value() - bytes == 3
+  assert metrics.batch_latency.count(phase=READ) - lat == 1
+  assert metrics.requests_inflight.value(phase=READ) == 0
+
+
+async def test_textfile(tmp_path: Path) -> None:
+  """Check that textfile() writes the metrics periodically and at the end."""
+
+  # (1) arrange
+  m, file = Metrics(), tmp_path / "chromie.prom"
+
+  # (2) act
+  async with m.textfile(file, 0.01):
+    await asyncio.sleep(0.02)
+    first = file.read_text()
+    m.records_read.inc(7)
+
+  # (3) assessment
+  assert "# TYPE chromie_records_read_total counter\n" in first
+  assert "chromie_records_read_total 7\n" not in first
+  assert "chromie_records_read_total 7\n" in file.read_text()
+  assert not (tmp_path / "chromie.prom.tmp").exists()
+
+
+async def test_serve() -> None:
+  """Check that serve() answers the HTTP requests with the metrics, ignoring the
+  connections closed w/o request.
+  """
+
+  # (1) arrange
+  m = Metrics()
+  m.records_written.inc(3)
+
+  # (2) act
+  async with m.serve("127.0.0.1", 0) as server:
+    port = server.sockets[0].getsockname()[1]
+
+    _, w = await asyncio.open_connection("127.0.0.1", port)
+    w.close()
+
+    r, w = await asyncio.open_connection("127.0.0.1", port)
+    w.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    out = (await r.read()).decode()
+    w.close()
+
+  # (3) assessment
+  head, body = out.split("\r\n\r\n", 1)
+
+  assert head.startswith("HTTP/1.1 200 OK\r\n")
+  assert f"Content-Length: {len(body)}\r\n" in head
+  assert "chromie_records_written_total 3\n" in body
+
+
+async def test_serve_idle_connections() -> None:
+  """Check that serve() closes the idle connections, after the timeout and when the
+  context ends, instead of waiting for their requests forever.
+  """
+
+  # (1) arrange
+  m = Metrics()
+
+  # (2) act
+  async with asyncio.timeout(2):
+    # closed after the timeout
+    async with m.serve("127.0.0.1", 0, timeout=0.05) as server:
+      port = server.sockets[0].getsockname()[1]
+      r, w = await asyncio.open_connection("127.0.0.1", port)
+      timed_out = await r.read()
+      w.close()
+
+    # closed when the context ends, long before the timeout
+    async with m.serve("127.0.0.1", 0, timeout=60) as server:
+      port = server.sockets[0].getsockname()[1]
+      r, w = await asyncio.open_connection("127.0.0.1", port)
+      await asyncio.sleep(0.01)
+
+    closed = await r.read()
+    w.close()
+
+  # (3) assessment
+  assert timed_out == b""
+  assert closed == b""
@@ -0,0 +1,137 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+
+from chromio.ie._rpt import CollIERpt
+from chromio.ie.perf import ENCODE, READ, WRITE, Latencies, Perf, peak_rss
+
+
+async def test_perf_reads() -> None:
+  """Check that reads() adds the time waiting for the batches to the read phase and
+  counts the bytes of the records, in memory or streamed.
+  """
+
+  # (1) arrange
+  perf, recs = Perf(), [{"id": "a", "document": "doc"}, {"id": "bc"}]
+
+  async def stream() -> AsyncGenerator[list[dict]]:
+    await asyncio.sleep(0.02)
+    yield recs
+
+  # (2) act
+  out = [b async for b in perf.reads(stream())] + [b async for b in perf.reads(recs)]
+
+  # (3) assessment
+  assert out == [recs, recs]
+  assert perf.bytes == 2 * (1 + 3 + 2)
+  assert perf.phases[READ] >= 0.02
+
+
+async def test_perf_request() -> None:
+  """Check that request() records the latency of a request, also when it fails."""
+
+  # (1) arrange
+  perf = Perf()
+
+  async def fail() -> None:
+    raise ValueError()
+
+  # (2) act
+  out = await perf.request(READ, asyncio.sleep(0.01, "ok"))
+
+  with pytest.raises(ValueError):
+    await perf.request(WRITE, fail())
+
+  # (3) assessment
+  assert out == "ok"
+  assert perf.latencies[READ][0] >= 0.01
+  assert len(perf.latencies[WRITE]) == 1
+  assert perf.phases == {}
+
+
+async def test_perf_track() -> None:
+  """Check that track() records the latency of a request task when it ends, but if
+  cancelled.
+  """
+
+  # (1) arrange
+  perf = Perf()
+  done = asyncio.ensure_future(asyncio.sleep(0.01))
+  cancelled = asyncio.ensure_future(asyncio.sleep(1))
+
+  # (2) act
+  perf.track(READ, done)
+  perf.track(READ, cancelled)
+
+  await done
+  cancelled.cancel()
+  await asyncio.sleep(0)
+
+  # (3) assessment
+  assert len(perf.latencies[READ]) == 1
+  assert perf.latencies[READ][0] >= 0.01
+
+
+def test_perf_phases() -> None:
+  """Check that phase() measures a block and rest() adds the time not measured."""
+
+  # (1) arrange
+  perf = Perf(phases={READ: 1.0})
+
+  # (2) act
+  with perf.phase(ENCODE):
+    pass
+
+  perf.rest(WRITE, 3.0)
+
+  # (3) assessment
+  assert perf.phases[ENCODE] >= 0
+  assert sum(perf.phases.values()) == pytest.approx(3.0)
+
+
+def test_perf_merge() -> None:
+  """Check that merge() adds the measures of other operation."""
+
+  # (1) arrange
+  perf = Perf({READ: 1.0}, 10, {READ: [0.1]})
+
+  # (2) act
+  perf.merge(Perf({READ: 2.0, WRITE: 1.0}, 5, {READ: [0.2], WRITE: [0.3]}))
+
+  # (3) assessment
+  assert perf == Perf({READ: 3.0, WRITE: 1.0}, 15, {READ: [0.1, 0.2], WRITE: [0.3]})
+
+
+def test_perf_measures() -> None:
+  """Check that measures() returns the percentiles of the latencies and the peak
+  RSS, these filling a report with the rates.
+  """
+
+  # (1) arrange
+  perf = Perf({READ: 1.0}, 1000, {READ: [i / 100 for i in range(100, 0, -1)]})
+
+  # (2) act
+  out = CollIERpt("test", 50, 0.5, **perf.measures())
+
+  # (3) assessment
+  assert out.latency == {READ: Latencies(p50=0.51, p95=0.96, p99=1.0, max=1.0)}
+  assert out.records_per_sec == 100
+  assert out.bytes_per_sec == 2000
+  assert out.peak_rss > 0
+
+
+def test_rpt_rates_wo_duration() -> None:
+  """Check that the rates of a report without duration are 0."""
+
+  # (1) act
+  out = CollIERpt("test", 50, 0)
+
+  # (2) assessment
+  assert (out.records_per_sec, out.bytes_per_sec) == (0, 0)
+
+
+def test_peak_rss() -> None:
+  """Check that peak_rss() returns the peak RSS of the process, in bytes."""
+
+  assert peak_rss() > 1024**2
@@ -0,0 +1,41 @@
+import httpx
+import pytest
+from chromadb.api.base_http_client import BaseHTTPClient
+from chromadb.errors import InternalError, InvalidArgumentError, RateLimitError
+
+from chromio.ie._retry import is_transient
+
+
+def _http_error(status: int, body: str) -> Exception:
+  """Returns the error raised by chromadb for a response."""
+
+  req = httpx.Request("POST", "http://localhost:8000/api/v2/collections/x/add")
+
+  try:
+    BaseHTTPClient._raise_chroma_error(httpx.Response(status, text=body, request=req))
+  except Exception as e:
+    return e
+
+  raise AssertionError("not raised")  # pragma: no cover
+
+
+@pytest.mark.parametrize(
+  ("e", "expected"),
+  (
+    pytest.param(RateLimitError(), True, id="rate limit"),
+    pytest.param(InternalError(), True, id="internal"),
+    pytest.param(httpx.ConnectError("refused"), True, id="network"),
+    pytest.param(_http_error(503, "Service Unavailable"), True, id="plain 503"),
+    pytest.param(_http_error(502, "<html>Bad Gateway</html>"), True, id="plain 502"),
+    pytest.param(_http_error(429, "Too Many Requests"), True, id="plain 429"),
+    pytest.param(_http_error(404, "Not Found"), False, id="plain 404"),
+    pytest.param(InvalidArgumentError("bad record"), False, id="invalid argument"),
+    pytest.param(ValueError("bad"), False, id="other"),
+  ),
+)
+def test_is_transient(e: Exception, expected: bool) -> None:
+  """Check that is_transient() classifies the errors, the plain ones of chromadb by
+  the HTTP status of their response.
+  """
+
+  assert is_transient(e) is expected
@@ -0,0 +1,56 @@
+import asyncio
+
+from pytest_mock import MockerFixture
+
+from chromio.ie._throttle import ThrottledColl, throttled
+from chromio.ie.limit import AimdLimit
+
+
+async def test_throttled_coll(mocker: MockerFixture) -> None:
+  """Check that ThrottledColl limits the requests in flight with the limit shared
+  by the collections, the rest of attributes unchanged.
+  """
+
+  # (1) arrange
+  requesting, max_requesting = 0, 0
+
+  async def get(**_) -> dict:
+    nonlocal requesting, max_requesting
+
+    requesting += 1
+    max_requesting = max(max_requesting, requesting)
+    await asyncio.sleep(0.01)
+    requesting -= 1
+    return {"ids": []}
+
+  coll1, coll2 = mocker.AsyncMock(), mocker.AsyncMock()
+  coll1.get.side_effect = coll2.get.side_effect = get
+  coll1.name = "one"
+
+  limit = AimdLimit(2)
+  colls = [ThrottledColl(coll1, limit), ThrottledColl(coll2, limit)]
+
+  # (2) act
+  out = await asyncio.gather(*(c.get(limit=i) for c in colls for i in range(3)))
+
+  # (3) assessment
+  assert out == [{"ids": []}] * 6
+  assert max_requesting == 2
+  assert colls[0].name == "one"
+  assert coll1.get.await_count == 3
+
+
+def test_throttled(mocker: MockerFixture) -> None:
+  """Check that throttled() wraps the collections once, and only with a limit."""
+
+  # (1) arrange
+  coll, limit = mocker.AsyncMock(), AimdLimit()
+
+  # (2) act
+  out = throttled(coll, limit)
+
+  # (3) assessment
+  assert isinstance(out, ThrottledColl)
+  assert out.coll is coll
+  assert throttled(out, AimdLimit()) is out
+  assert throttled(coll, None) is coll
@@ -6,6 +6,7 @@ from chromadb.errors import ChromaError
 from pytest_mock import MockerFixture
 
 from chromio.errors import CollAlreadyExistsError, CollNotFoundError
+from chromio.ie.consts import DEFAULT_BATCH_SIZE
 from chromio.tools.db import DbTool
 
 
@@ -16,6 +17,34 @@ def tool(mocker: MockerFixture) -> DbTool:
   return DbTool(db=mocker.AsyncMock(spec=AsyncClientAPI))
 
 
+################
+# batch_size() #
+################
+
+
+@pytest.mark.parametrize(
+  ("cap", "size", "e"),
+  (
+    pytest.param(5461, None, 5461, id="server maximum"),
+    pytest.param(5461, 100, 100, id="requested"),
+    pytest.param(5461, 10_000, 5461, id="requested over maximum"),
+    pytest.param(-1, None, DEFAULT_BATCH_SIZE, id="no maximum"),
+    pytest.param(-1, 300, 300, id="no maximum, requested"),
+  ),
+)
+async def test_batch_size(tool: DbTool, cap: int, size: int | None, e: int) -> None:
+  """Check that batch_size() caps the requested size by the server maximum."""
+
+  # (1) arrange
+  tool.db.get_max_batch_size.return_value = cap  # type: ignore
+
+  # (2) act
+  out = await tool.batch_size(size)
+
+  # (3) assessment
+  assert out == e
+
+
 ###################
 # get_coll_conf() #
 ###################
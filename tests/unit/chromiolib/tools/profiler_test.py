@@ -0,0 +1,118 @@
+import asyncio
+import pstats
+import re
+import time
+from pathlib import Path
+
+import pytest
+
+from chromio.ie.perf import ENCODE, READ, Perf
+from chromio.tools.profiler import (
+  AsyncProfiler,
+  CpuProfiler,
+  MemProfiler,
+  ProfileKind,
+  profiler,
+)
+
+
+async def test_cpu_profiler(tmp_path: Path) -> None:
+  """Check that the CPU profiler writes the pstats of the functions run."""
+
+  # (1) arrange
+  def busy() -> int:
+    return sum(range(10_000))
+
+  async def cmd() -> int:
+    return busy()
+
+  # (2) act
+  out = await CpuProfiler(file := tmp_path / "out.prof").run(cmd())
+
+  # (3) assessment
+  assert out == sum(range(10_000))
+  assert any(f[2] == "busy" for f in pstats.Stats(str(file)).stats)  # type: ignore
+
+
+async def test_mem_profiler(tmp_path: Path) -> None:
+  """Check that the memory profiler snapshots the allocations of every phase,
+  growing again when the memory does.
+  """
+
+  # (1) arrange
+  perf, kept = Perf(), []
+
+  async def cmd() -> None:
+    for size in (1, 0, 4):
+      with perf.phase(READ):
+        kept.append(bytearray(size * 1024**2))
+
+    with perf.phase(ENCODE):
+      kept.append(bytearray(1024**2))
+
+  prof = MemProfiler(file := tmp_path / "out.txt")
+
+  # (2) act
+  await prof.run(cmd())
+
+  # (3) assessment
+  out = file.read_text()
+
+  assert out.startswith("Peak traced memory (MiB): ")
+  sizes = {p: float(s) for p, s in re.findall(r"## Phase (\w+), at ([\d.]+) MiB", out)}
+
+  assert 5 <= sizes["read"] < sizes["encode"]
+  assert "## End" in out
+  assert "profiler_test.py" in out
+
+
+async def test_async_profiler(tmp_path: Path) -> None:
+  """Check that the async profiler logs the callbacks stalling the loop and
+  summarizes the stalls, restoring the loop afterwards.
+  """
+
+  # (1) arrange
+  loop = asyncio.get_running_loop()
+  debug = (loop.get_debug(), loop.slow_callback_duration)
+
+  async def cmd() -> None:
+    await asyncio.sleep(0.02)
+
+    # a CPU-bound callback stalling the loop
+    end = time.perf_counter() + 0.1
+
+    while time.perf_counter() < end:
+      pass
+
+    await asyncio.sleep(0.02)
+
+  # (2) act
+  await AsyncProfiler(file := tmp_path / "out.txt", threshold=0.05).run(cmd())
+
+  # (3) assessment
+  out = file.read_text()
+
+  assert "took 0.1" in out
+  assert "Stalls over 0.05 s: 1, " in out
+  assert (loop.get_debug(), loop.slow_callback_duration) == debug
+
+
+@pytest.mark.parametrize(
+  ("kind", "e_cls", "e_file"),
+  (
+    pytest.param("cpu", CpuProfiler, "chromie.prof", id="cpu"),
+    pytest.param("mem", MemProfiler, "chromie.mem.txt", id="mem"),
+    pytest.param("async", AsyncProfiler, "chromie.async.txt", id="async"),
+  ),
+)
+def test_profiler(kind: ProfileKind, e_cls: type, e_file: str) -> None:
+  """Check that profiler() returns the profiler of every kind, with its default file
+  if no file given.
+  """
+
+  # (1) act
+  out = profiler(kind), profiler(kind, Path("x"))
+
+  # (2) assessment
+  assert all(isinstance(p, e_cls) for p in out)
+  assert [p.file for p in out] == [Path(e_file), Path("x")]
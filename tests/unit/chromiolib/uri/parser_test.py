@@ -27,6 +27,23 @@ def test_parse_valid_path_uri() -> None:
   assert out == ChromioUri(schema="path", path="/tmp/dir")
 
 
+def test_parse_valid_path_uri_with_coll() -> None:
+  """Check that parse_uri() returns the collection after # in a path URI."""
+
+  # (1) act
+  out = parse_uri("path:///tmp/dir#movies")
+
+  # (2) assessment
+  assert out == ChromioUri(schema="path", path="/tmp/dir", coll="movies")
+
+
+def test_parse_path_uri_wo_dir() -> None:
+  """Check that parse_uri() raises ValueError if the path URI has no directory."""
+
+  with pytest.raises(ValueError, match="Expected directory in path URI: 'path://#c'."):
+    parse_uri("path://#c")
+
+
 #############
 # server:// #
 #############
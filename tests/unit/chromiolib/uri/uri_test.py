@@ -1,3 +1,7 @@
+import os
+
+import pytest
+
 from chromio.uri import ChromioUri
 
 
@@ -19,3 +23,38 @@ def test_cloud() -> None:
 
   # (2) assessment
   assert out.schema == "cloud"
+
+
+@pytest.mark.parametrize(
+  ("uri", "coll", "expected"),
+  (
+    pytest.param(
+      ChromioUri.server(host="h", port=1, tenant="t", db="d", coll="c"),
+      None,
+      "server://h:1/t/d/c",
+      id="server",
+    ),
+    pytest.param(
+      ChromioUri.server(),
+      "x",
+      "server://localhost:8000/default_tenant/default_database/x",
+      id="server w/ coll",
+    ),
+    pytest.param(
+      ChromioUri.server(),
+      None,
+      "server://localhost:8000/default_tenant/default_database",
+      id="server w/o coll",
+    ),
+    pytest.param(
+      ChromioUri("cloud", tenant="t", db="d"), "c", "cloud:///t/d/c", id="cloud"
+    ),
+    pytest.param(
+      ChromioUri("path", path="data"), "c", f"path://{os.getcwd()}/data#c", id="path"
+    ),
+  ),
+)
+def test_endpoint(uri: ChromioUri, coll: str | None, expected: str) -> None:
+  """Check that endpoint() returns the canonical URI of the database or collection."""
+
+  assert uri.endpoint(coll) == expected